@@ -0,0 +1,108 @@
+"""
+Compare concurrent read throughput of the sync DRF endpoints (/api/) with
+the async endpoints (/api/async/). Both stacks are driven in-process: the
+sync stack by a thread pool of test clients, the async stack by concurrent
+AsyncClient requests on one event loop.
+
+    python -m benchmarks.async_throughput --vendors 50 --pos 200 --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django, seed
+
+
+def scenario_paths(prefix, vendor_ids, po_ids, count):
+    vendors = itertools.cycle(vendor_ids)
+    pos = itertools.cycle(po_ids)
+    return {
+        'vendor-list': [f'{prefix}vendors/?page_size=50'] * count,
+        'vendor-detail': [f'{prefix}vendors/{next(vendors)}/' for _ in range(count)],
+        'vendor-performance': [f'{prefix}vendors/{next(vendors)}/performance/' for _ in range(count)],
+        'purchaseorder-list': [f'{prefix}purchase_orders/?vendor={next(vendors)}&page_size=50' for _ in range(count)],
+        'purchaseorder-detail': [f'{prefix}purchase_orders/{next(pos)}/' for _ in range(count)],
+    }
+
+
+def run_sync(paths, concurrency):
+    from django.db import connection
+    from django.test import Client
+
+    local = threading.local()
+
+    def fetch(path):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        response = local.client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+
+    def close_connection(_):
+        connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(fetch, paths))
+        list(pool.map(close_connection, range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_async(paths, concurrency):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(path):
+        async with semaphore:
+            response = await client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(path) for path in paths))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vendors', type=int, default=50)
+    parser.add_argument('--pos', type=int, default=200, help='Purchase orders per vendor.')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario and stack.')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--output', help='Write the JSON report to this file as well as stdout.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+
+    vendor_ids, po_ids = seed(args.vendors, args.pos)
+    sync_paths = scenario_paths('/api/', vendor_ids, po_ids, args.requests)
+    async_paths = scenario_paths('/api/async/', vendor_ids, po_ids, args.requests)
+
+    results = []
+    for name in sync_paths:
+        cache.clear()
+        sync_seconds = run_sync(sync_paths[name], args.concurrency)
+        cache.clear()
+        async_seconds = asyncio.run(run_async(async_paths[name], args.concurrency))
+        results.append({
+            'scenario': name,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'sync_rps': round(args.requests / sync_seconds, 1),
+            'async_rps': round(args.requests / async_seconds, 1),
+        })
+
+    report = json.dumps({'vendors': args.vendors, 'pos_per_vendor': args.pos, 'results': results}, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report)
+
+
+if __name__ == '__main__':
+    main()
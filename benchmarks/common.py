@@ -0,0 +1,36 @@
+"""
+Shared setup for the benchmark scripts: configures Django (benchmarks.settings)
+against a throwaway SQLite file and seeds it through the
+``generate_benchmark_data`` management command. Run the scripts from the
+project root, e.g. ``python -m benchmarks.run``.
+"""
+import os
+import tempfile
+
+
+def setup_django(database_path=None, database_options=''):
+    """
+    Point DATABASE_URL at ``database_path`` (a fresh temporary file by
+    default); ``database_options`` is appended as the URL query string, e.g.
+    ``synchronous=FULL``. Subprocesses such as gunicorn inherit it.
+    """
+    database_path = os.path.abspath(database_path or os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3'))
+    os.environ['DATABASE_URL'] = f'sqlite:///{database_path}' + (f'?{database_options}' if database_options else '')
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    django.setup()
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    return database_path
+
+
+def seed(vendors, pos_per_vendor, seed_value=0):
+    from django.core.management import call_command
+    from vendors.models import PurchaseOrder
+
+    call_command('generate_benchmark_data', vendors=vendors, pos=pos_per_vendor, seed=seed_value, clear=True, verbosity=0)
+    orders = PurchaseOrder.objects.order_by('pk')
+    return sorted(set(orders.values_list('vendor_id', flat=True))), list(orders.values_list('pk', flat=True))
@@ -0,0 +1,99 @@
+"""
+Compare the values() read path of the list and detail endpoints
+(ValuesReadMixin, ValuesRowMixin and FastJSONRenderer) with the regular
+ModelSerializer and JSONRenderer path, and check that both produce the same
+bytes.
+
+Each endpoint is requested sequentially through the Django test client with
+either path; the report gives mean and p95 latency per request and the
+speedup.
+
+    python -m benchmarks.read_path --vendors 20 --pos 500 --requests 200 --output read_path.json
+"""
+import argparse
+import contextlib
+import json
+import statistics
+import time
+from unittest import mock
+
+from benchmarks.common import setup_django, seed
+
+
+@contextlib.contextmanager
+def serializer_path():
+    from rest_framework.renderers import JSONRenderer
+    from vendors.renderers import FastJSONRenderer
+    from vendors.serializers import ValuesRowMixin
+
+    with mock.patch.object(ValuesRowMixin, 'values_reader', return_value=None), \
+            mock.patch.object(FastJSONRenderer, 'render', JSONRenderer.render):
+        yield
+
+
+def measure(client, path, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, (path, response.status_code)
+    timings.sort()
+    return {
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'p95_ms': round(timings[max(0, int(len(timings) * 0.95) - 1)] * 1000, 3),
+    }, response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vendors', type=int, default=20)
+    parser.add_argument('--pos', type=int, default=500, help='Purchase orders per vendor.')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and path.')
+    parser.add_argument('--output', help='Write the JSON report to this file as well as stdout.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client
+
+    vendor_ids, po_ids = seed(args.vendors, args.pos)
+    endpoints = {
+        'purchaseorder-list-100': '/api/purchase_orders/?page_size=100',
+        'purchaseorder-list-1000': '/api/purchase_orders/?page_size=1000',
+        'purchaseorder-list-sparse': '/api/purchase_orders/?page_size=1000&fields=id,po_number,status',
+        'purchaseorder-detail': f'/api/purchase_orders/{po_ids[len(po_ids) // 2]}/',
+        'vendor-list': '/api/vendors/?page_size=1000',
+        'vendor-detail': f'/api/vendors/{vendor_ids[0]}/',
+    }
+
+    client = Client()
+    results = []
+    for name, path in endpoints.items():
+        client.get(path)
+        with serializer_path():
+            client.get(path)
+            serializer, serializer_content = measure(client, path, args.requests)
+        values, values_content = measure(client, path, args.requests)
+        results.append({
+            'endpoint': name,
+            'path': path,
+            'serializer': serializer,
+            'values': values,
+            'speedup': round(serializer['mean_ms'] / values['mean_ms'], 2),
+            'identical': serializer_content == values_content,
+        })
+
+    report = json.dumps({
+        'vendors': args.vendors,
+        'pos_per_vendor': args.pos,
+        'requests': args.requests,
+        'results': results,
+    }, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""
+Load-test the vendor and purchase order API and report per-scenario latency
+percentiles, queries per request and throughput as JSON.
+
+Scenarios: purchase order create, purchase order list filtered by vendor,
+vendor performance reads and pending -> completed status transitions. Each
+runs against the Django test client in-process (which also counts queries)
+and against a locally started gunicorn.
+
+    python -m benchmarks.run --vendors 100 --pos 100 --requests 500 --concurrency 8 --output results.json
+    python -m benchmarks.run --targets client --baseline results.json
+"""
+import argparse
+import datetime
+import itertools
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django, seed
+
+SCENARIOS = ('po-create', 'po-list', 'vendor-performance', 'po-transition')
+TARGETS = ('client', 'gunicorn')
+
+
+def build_requests(scenario, count, vendor_ids, pending_ids):
+    """Return ``count`` (method, path, body) tuples for a scenario."""
+    vendors = itertools.cycle(vendor_ids)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if scenario == 'po-create':
+        run = uuid.uuid4().hex[:8]
+        return [
+            ('POST', '/api/purchase_orders/', {
+                'po_number': f'LOAD-{run}-{i}',
+                'vendor': next(vendors),
+                'delivery_date': (now + datetime.timedelta(days=14)).isoformat(),
+                'items': [{'sku': 'SKU-1001', 'description': 'Steel bolts M8', 'quantity': 500, 'unit_price': 0.12}],
+                'quantity': 500,
+            })
+            for i in range(count)
+        ]
+    if scenario == 'po-list':
+        return [('GET', f'/api/purchase_orders/?vendor={next(vendors)}&page_size=50', None) for _ in range(count)]
+    if scenario == 'vendor-performance':
+        return [('GET', f'/api/vendors/{next(vendors)}/performance/', None) for _ in range(count)]
+    if scenario == 'po-transition':
+        orders = itertools.cycle(pending_ids)
+        return [
+            ('PATCH', f'/api/purchase_orders/{next(orders)}/', {
+                'status': 'completed',
+                'delivered_date': now.isoformat(),
+                'quality_rating': 4.0,
+            })
+            for _ in range(count)
+        ]
+    raise ValueError(f'Unknown scenario {scenario!r}')
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile.
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(samples, wall_seconds):
+    latencies = sorted(sample['seconds'] * 1000 for sample in samples)
+    queries = [sample['queries'] for sample in samples if sample['queries'] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if not 200 <= sample['status'] < 300),
+        'throughput_rps': round(len(samples) / wall_seconds, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'queries_per_request': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        } if queries else None,
+    }
+
+
+def run_concurrently(fetch, requests, concurrency, close=None):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        samples = list(pool.map(fetch, requests))
+        if close is not None:
+            # One call per worker thread, to close each thread's own connection.
+            list(pool.map(lambda _: close(), range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def client_target(requests, concurrency):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    local = threading.local()
+
+    def fetch(request):
+        method, path, body = request
+        if not hasattr(local, 'client'):
+            local.client = Client(raise_request_exception=False)
+        kwargs = {'data': json.dumps(body), 'content_type': 'application/json'} if body is not None else {}
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(local.client, method.lower())(path, **kwargs)
+            seconds = time.perf_counter() - start
+        return {'status': response.status_code, 'seconds': seconds, 'queries': len(queries)}
+
+    return run_concurrently(fetch, requests, concurrency, close=lambda: connection.close())
+
+
+def gunicorn_target(base_url):
+    def target(requests, concurrency):
+        def fetch(request):
+            method, path, body = request
+            data = json.dumps(body).encode() if body is not None else None
+            http_request = urllib.request.Request(
+                base_url + path, data=data, method=method, headers={'Content-Type': 'application/json'}
+            )
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(http_request) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            return {'status': status, 'seconds': time.perf_counter() - start, 'queries': None}
+
+        return run_concurrently(fetch, requests, concurrency)
+    return target
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(workers, port, timeout=30):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'vendor_management.wsgi:application',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning'],
+        env=os.environ.copy(),
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with status {process.returncode}')
+        try:
+            urllib.request.urlopen(f'{base_url}/api/vendors/?page_size=1').read()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not start in time')
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = {(r['target'], r['scenario']): r for r in json.load(baseline_file)['results']}
+    for result in results:
+        previous = baseline.get((result['target'], result['scenario']))
+        if previous is None:
+            continue
+        result['baseline'] = {
+            'p95_change_pct': round(
+                (result['latency_ms']['p95'] / previous['latency_ms']['p95'] - 1) * 100, 1
+            ),
+            'throughput_change_pct': round(
+                (result['throughput_rps'] / previous['throughput_rps'] - 1) * 100, 1
+            ),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vendors', type=int, default=100)
+    parser.add_argument('--pos', type=int, default=100, help='Purchase orders per vendor.')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per scenario and target.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--targets', default=','.join(TARGETS))
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes.')
+    parser.add_argument('--database', help='SQLite file to use instead of a temporary one.')
+    parser.add_argument(
+        '--database-options', default='', help='DATABASE_URL query string, e.g. journal_mode=DELETE&synchronous=FULL.'
+    )
+    parser.add_argument('--baseline', help='Earlier JSON report to compare p95 latency and throughput with.')
+    parser.add_argument('--output', help='Write the JSON report to this file as well as stdout.')
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(',')
+    targets = args.targets.split(',')
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f'unknown scenario {name!r}; choose from {", ".join(SCENARIOS)}')
+    for name in targets:
+        if name not in TARGETS:
+            parser.error(f'unknown target {name!r}; choose from {", ".join(TARGETS)}')
+
+    setup_django(args.database, args.database_options)
+    import django
+    from django.conf import settings
+    from django.core.cache import cache
+    from vendors.models import PurchaseOrder
+
+    vendor_ids, _ = seed(args.vendors, args.pos)
+    pending_ids = list(PurchaseOrder.objects.filter(status='pending').order_by('pk').values_list('pk', flat=True))
+    # Each target transitions its own share of the pending orders.
+    pending_shares = {target: pending_ids[i::len(targets)] or pending_ids for i, target in enumerate(targets)}
+
+    results = []
+    for target_name in targets:
+        server = None
+        if target_name == 'gunicorn':
+            server, base_url = start_gunicorn(args.workers, free_port())
+            target = gunicorn_target(base_url)
+        else:
+            target = client_target
+        try:
+            for scenario in scenarios:
+                cache.clear()
+                requests = build_requests(scenario, args.requests, vendor_ids, pending_shares[target_name])
+                samples, wall_seconds = target(requests, args.concurrency)
+                results.append({'target': target_name, 'scenario': scenario, **summarize(samples, wall_seconds)})
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+    report = json.dumps({
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': 'sqlite',
+        'database_options': args.database_options,
+        'conn_max_age': settings.CONN_MAX_AGE,
+        'vendors': args.vendors,
+        'pos_per_vendor': args.pos,
+        'concurrency': args.concurrency,
+        'workers': args.workers if 'gunicorn' in targets else None,
+        'results': results,
+    }, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report)
+
+
+if __name__ == '__main__':
+    main()
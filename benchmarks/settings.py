@@ -0,0 +1,10 @@
+"""
+Settings for benchmark runs: the project settings (database from
+DATABASE_URL, set by benchmarks.common.setup_django) with DEBUG off so query
+logging does not skew timings. Used in-process and by the gunicorn workers
+the harness starts.
+"""
+from vendor_management.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
@@ -0,0 +1,93 @@
+"""
+Measure the write throughput gained from the SQLite tuning in
+vendor_management.sqlite3 (WAL, synchronous=NORMAL, mmap, BEGIN IMMEDIATE)
+and persistent connections, with concurrent gunicorn workers.
+
+Runs benchmarks.run twice on fresh databases, once with SQLite's stock
+settings and per-request connections and once with the project defaults,
+and reports successful writes per second for each.
+
+    python -m benchmarks.sqlite_tuning --workers 4 --concurrency 16 --requests 1000 --output tuning.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROFILES = {
+    'stock': {
+        'database_options': 'journal_mode=DELETE&synchronous=FULL&mmap_size=0&transaction_mode=DEFERRED',
+        'conn_max_age': '0',
+    },
+    'tuned': {
+        'database_options': '',
+        'conn_max_age': '60',
+    },
+}
+
+
+def run_profile(name, profile, args):
+    output = os.path.join(tempfile.mkdtemp(), f'{name}.json')
+    subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.run',
+            '--targets', 'gunicorn',
+            '--scenarios', args.scenarios,
+            '--vendors', str(args.vendors),
+            '--pos', str(args.pos),
+            '--requests', str(args.requests),
+            '--concurrency', str(args.concurrency),
+            '--workers', str(args.workers),
+            '--database-options', profile['database_options'],
+            '--output', output,
+        ],
+        env=dict(os.environ, CONN_MAX_AGE=profile['conn_max_age']),
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    with open(output) as report:
+        return json.load(report)
+
+
+def successful_rps(result):
+    return result['throughput_rps'] * (result['requests'] - result['errors']) / result['requests']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vendors', type=int, default=50)
+    parser.add_argument('--pos', type=int, default=100, help='Purchase orders per vendor.')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario and profile.')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes.')
+    parser.add_argument('--scenarios', default='po-create,po-transition')
+    parser.add_argument('--output', help='Write the JSON report to this file as well as stdout.')
+    args = parser.parse_args()
+
+    reports = {name: run_profile(name, profile, args) for name, profile in PROFILES.items()}
+    summary = []
+    for stock, tuned in zip(reports['stock']['results'], reports['tuned']['results']):
+        stock_rps, tuned_rps = successful_rps(stock), successful_rps(tuned)
+        summary.append({
+            'scenario': stock['scenario'],
+            'stock_successful_rps': round(stock_rps, 1),
+            'tuned_successful_rps': round(tuned_rps, 1),
+            'change_pct': round((tuned_rps / stock_rps - 1) * 100, 1) if stock_rps else None,
+            'stock_errors': stock['errors'],
+            'tuned_errors': tuned['errors'],
+            'stock_p95_ms': stock['latency_ms']['p95'],
+            'tuned_p95_ms': tuned['latency_ms']['p95'],
+        })
+
+    report = json.dumps({'workers': args.workers, 'concurrency': args.concurrency, 'summary': summary,
+                         'profiles': reports}, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report)
+
+
+if __name__ == '__main__':
+    main()
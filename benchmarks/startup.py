@@ -0,0 +1,180 @@
+"""
+Measure gunicorn startup cost before and after the API node setup: time from
+launching gunicorn to the first successful response, the slowest of the
+requests that follow (a worker that has not warmed up pays on its first
+request) and per-worker memory. RSS counts pages shared with the master in
+full; PSS splits them between the processes sharing them, so it shows what
+preloading saves. Memory needs Linux (/proc/<pid>/smaps_rollup).
+
+Configurations: "baseline" starts gunicorn as before, with the full settings
+and no config file; the others use vendor_management.gunicorn_conf with the
+full or API-only settings, with or without preload_app.
+
+    python -m benchmarks.startup --workers 4 --repeat 3 --output startup.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.common import setup_django
+from benchmarks.run import free_port
+
+# name: (settings module, use vendor_management.gunicorn_conf, preload_app)
+CONFIGURATIONS = {
+    'baseline': ('vendor_management.settings', False, False),
+    'full-preload': ('vendor_management.settings', True, True),
+    'api': ('vendor_management.settings_api', True, False),
+    'api-preload': ('vendor_management.settings_api', True, True),
+}
+FIRST_REQUEST_PATH = '/api/vendors/?page_size=1'
+
+
+def memory_kb(pid):
+    """(rss, pss) of ``pid`` in kB; pss is None where smaps_rollup is missing."""
+    rss = pss = None
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                rss = int(line.split()[1])
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as rollup:
+            for line in rollup:
+                if line.startswith('Pss:'):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+def worker_pids(master_pid):
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                # The parent pid follows the parenthesised command name.
+                parent = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == master_pid:
+            pids.append(int(entry))
+    return pids
+
+
+def start_and_measure(settings_module, use_config, preload, workers, warm_requests, timeout=60):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, GUNICORN_PRELOAD='1' if preload else '0')
+    command = [sys.executable, '-m', 'gunicorn']
+    if use_config:
+        command += ['-c', 'python:vendor_management.gunicorn_conf']
+    command += [
+        'vendor_management.wsgi:application',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning',
+    ]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env)
+    try:
+        deadline = start + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'gunicorn exited with status {process.returncode}')
+            try:
+                urllib.request.urlopen(base_url + FIRST_REQUEST_PATH).read()
+                break
+            except OSError:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError('gunicorn did not start in time')
+                time.sleep(0.01)
+        time_to_first_request = time.perf_counter() - start
+
+        # Sequential requests spread over the workers; in the baseline each
+        # worker's first one imports the views and builds the URL resolver.
+        latencies = []
+        for _ in range(warm_requests):
+            request_start = time.perf_counter()
+            urllib.request.urlopen(base_url + FIRST_REQUEST_PATH).read()
+            latencies.append(time.perf_counter() - request_start)
+
+        pids = worker_pids(process.pid)
+        while len(pids) < workers:
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f'Expected {workers} workers, found {len(pids)}')
+            time.sleep(0.05)
+            pids = worker_pids(process.pid)
+        memory = [memory_kb(pid) for pid in pids]
+        master_rss, master_pss = memory_kb(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    pss = [value for _, value in memory if value is not None]
+    return {
+        'time_to_first_request_ms': time_to_first_request * 1000,
+        'max_request_ms': max(latencies) * 1000 if latencies else None,
+        'worker_rss_mb': statistics.mean(rss for rss, _ in memory) / 1024 if memory else None,
+        'worker_pss_mb': statistics.mean(pss) / 1024 if pss else None,
+        'master_rss_mb': master_rss / 1024,
+        'master_pss_mb': master_pss / 1024 if master_pss is not None else None,
+    }
+
+
+def median_run(runs, workers):
+    # Medians per measurement; total_pss_mb is derived from the medians so it
+    # matches the columns it sums.
+    result = {
+        key: round(statistics.median(run[key] for run in runs), 1) if runs[0][key] is not None else None
+        for key in runs[0]
+    }
+    if result['worker_pss_mb'] is not None and result['master_pss_mb'] is not None:
+        result['total_pss_mb'] = round(result['worker_pss_mb'] * workers + result['master_pss_mb'], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration; the median is reported.')
+    parser.add_argument(
+        '--warm-requests', type=int, default=None,
+        help='Requests sent after the first one (default: 4 per worker).',
+    )
+    parser.add_argument('--output', help='Write the JSON report to this file as well as stdout.')
+    args = parser.parse_args()
+    warm_requests = args.warm_requests if args.warm_requests is not None else 4 * args.workers
+
+    # A migrated, empty database shared by every run (DATABASE_URL is inherited).
+    setup_django()
+
+    results = []
+    for name, (settings_module, use_config, preload) in CONFIGURATIONS.items():
+        runs = [
+            start_and_measure(settings_module, use_config, preload, args.workers, warm_requests)
+            for _ in range(args.repeat)
+        ]
+        results.append({'configuration': name, 'settings': settings_module, 'preload': preload, **median_run(runs, args.workers)})
+
+    report = json.dumps({
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'workers': args.workers,
+        'repeat': args.repeat,
+        'warm_requests': warm_requests,
+        'results': results,
+    }, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vendor_management.settings')
+# Persistent connections are not reused across async requests; close them at
+# the end of each request unless CONN_MAX_AGE is set explicitly.
+os.environ.setdefault('CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
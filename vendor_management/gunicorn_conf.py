@@ -0,0 +1,39 @@
+"""
+Gunicorn settings for API nodes:
+
+    gunicorn -c python:vendor_management.gunicorn_conf vendor_management.wsgi
+
+With preload_app (GUNICORN_PRELOAD=1, the default) the master imports
+Django and runs vendor_management.wsgi.warm_up() once; the forked workers
+share those pages copy-on-write and answer their first request warm. With
+GUNICORN_PRELOAD=0 every worker loads and warms the app itself, which is
+what a code reload with HUP needs. Uses the API-only settings unless
+DJANGO_SETTINGS_MODULE is set. Command-line flags override these values.
+"""
+import gc
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vendor_management.settings_api')
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+
+def when_ready(server):
+    # Runs in the master after the preload and before the first fork.
+    if preload_app:
+        from vendor_management.wsgi import warm_up
+
+        warm_up()
+        # Move everything loaded so far out of the collector's generations,
+        # so collections in the workers do not write to (and unshare) it.
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        from vendor_management.wsgi import warm_up
+
+        warm_up()
@@ -0,0 +1,161 @@
+"""
+In-process request metrics collected by RequestMetricsMiddleware and served
+in the Prometheus text format. Every request counts towards the request
+total and duration histogram; DB and serializer timings are only collected
+for the sampled fraction (REQUEST_METRICS_SAMPLE_RATE), since they wrap
+every query and serializer call.
+"""
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+current_sample = contextvars.ContextVar('request_metrics_sample', default=None)
+
+
+class RequestSample:
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.depth = {}
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.duration_seconds = 0.0
+        self.duration_buckets = [0] * len(DURATION_BUCKETS)
+        self.sampled = 0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def clear(self):
+        with self.lock:
+            self.endpoints = {}
+
+    def record(self, endpoint, method, duration, sample=None):
+        with self.lock:
+            stats = self.endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self.endpoints[(endpoint, method)] = EndpointStats()
+            stats.requests += 1
+            stats.duration_seconds += duration
+            bucket = bisect.bisect_left(DURATION_BUCKETS, duration)
+            if bucket < len(DURATION_BUCKETS):
+                stats.duration_buckets[bucket] += 1
+            if sample is not None:
+                stats.sampled += 1
+                stats.db_queries += sample.db_queries
+                stats.db_seconds += sample.db_seconds
+                stats.serializer_seconds += sample.serializer_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {key: vars(stats).copy() for key, stats in sorted(self.endpoints.items())}
+
+
+REGISTRY = MetricsRegistry()
+
+
+def record_query(execute, sql, params, many, context):
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.db_queries += 1
+        sample.db_seconds += time.perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+@contextlib.contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to the sampled request's ``<phase>_seconds``.
+    Nested blocks of the same phase are only counted once.
+    """
+    sample = current_sample.get()
+    if sample is None or sample.depth.get(phase):
+        yield
+        return
+    sample.depth[phase] = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.depth[phase] = 0
+        attribute = f'{phase}_seconds'
+        setattr(sample, attribute, getattr(sample, attribute) + time.perf_counter() - start)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(snapshot, gauges=()):
+    metrics = {
+        'http_requests_total': ('counter', 'Requests handled.', 'requests'),
+        'http_requests_sampled_total': ('counter', 'Requests with DB and serializer timings.', 'sampled'),
+        'http_request_db_queries_total': ('counter', 'DB queries issued by sampled requests.', 'db_queries'),
+        'http_request_db_seconds_total': ('counter', 'Time spent in DB queries by sampled requests.', 'db_seconds'),
+        'http_request_serializer_seconds_total': (
+            'counter', 'Time spent in serializers by sampled requests.', 'serializer_seconds'
+        ),
+    }
+    lines = []
+    for name, (kind, help_text, attribute) in metrics.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for (endpoint, method), stats in snapshot.items():
+            lines.append(f'{name}{{endpoint="{escape_label(endpoint)}",method="{method}"}} {stats[attribute]}')
+
+    name = 'http_request_duration_seconds'
+    lines += [f'# HELP {name} Request duration.', f'# TYPE {name} histogram']
+    for (endpoint, method), stats in snapshot.items():
+        labels = f'endpoint="{escape_label(endpoint)}",method="{method}"'
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, stats['duration_buckets']):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {stats["requests"]}')
+        lines.append(f'{name}_sum{{{labels}}} {stats["duration_seconds"]}')
+        lines.append(f'{name}_count{{{labels}}} {stats["requests"]}')
+
+    for name, help_text, value in gauges:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
+
+
+def prometheus_metrics(request):
+    from vendors.models import VendorMetricsMarker
+
+    queue = VendorMetricsMarker.queue_status()
+    gauges = [
+        ('vendors_metrics_queue_pending_vendors', 'Vendors waiting for metric recomputation.', queue['pending_vendors']),
+        ('vendors_metrics_queue_lag_seconds', 'Age of the oldest queued metric recomputation.', queue['lag_seconds']),
+    ]
+    return HttpResponse(
+        render_prometheus(REGISTRY.snapshot(), gauges), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
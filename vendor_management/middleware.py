@@ -0,0 +1,129 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+from .metrics import REGISTRY, RequestSample, current_sample, install_query_recorder
+from .routers import replica_reads
+
+
+class RequestMetricsMiddleware:
+    """
+    Records duration per resolved URL name and, for a sampled fraction of
+    requests, DB query count, DB time and serializer time. Sampled responses
+    carry them in a Server-Timing header. Put it first in MIDDLEWARE so the
+    duration covers the other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample = self.start_sample()
+        if sample is not None:
+            # Connections opened before this module was imported missed the
+            # connection_created hook.
+            for connection in connections.all():
+                install_query_recorder(connection)
+        token = current_sample.set(sample)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, sample)
+
+    async def __acall__(self, request):
+        sample = self.start_sample()
+        token = current_sample.set(sample)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, sample)
+
+    @staticmethod
+    def start_sample():
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return None
+        return RequestSample()
+
+    @staticmethod
+    def finish(request, response, duration, sample):
+        match = request.resolver_match
+        endpoint = match.view_name if match is not None else 'unmatched'
+        REGISTRY.record(endpoint, request.method, duration, sample)
+        if sample is not None and settings.REQUEST_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'app;dur={duration * 1000:.2f}, '
+                f'db;dur={sample.db_seconds * 1000:.2f};desc="{sample.db_queries} queries", '
+                f'serializer;dur={sample.serializer_seconds * 1000:.2f}'
+            )
+        return response
+
+
+class ReplicaReadMiddleware:
+    """
+    Marks GET/HEAD requests to the views named in REPLICA_READ_VIEWS (by URL
+    name suffix, e.g. "-list") so ReadReplicaRouter may serve their queries
+    from a replica. Replicas lag the primary slightly, so only endpoints
+    where that is acceptable are listed.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = replica_reads.set(False)
+        try:
+            return self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+
+    async def __acall__(self, request):
+        token = replica_reads.set(False)
+        try:
+            return await self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD') and settings.DATABASE_REPLICAS:
+            url_name = request.resolver_match.url_name or ''
+            replica_reads.set(url_name.endswith(tuple(settings.REPLICA_READ_VIEWS)))
+
+
+class CacheControlMiddleware(MiddlewareMixin):
+    """
+    Sets Cache-Control on successful (200/304) GET/HEAD responses of the
+    views named in VENDORS_CACHE_CONTROL (by exact URL name), unless the
+    view set one itself.
+    """
+    def process_response(self, request, response):
+        match = request.resolver_match
+        if (
+            match is None or request.method not in ('GET', 'HEAD')
+            or response.status_code not in (200, 304) or response.has_header('Cache-Control')
+        ):
+            return response
+        value = settings.VENDORS_CACHE_CONTROL.get(match.url_name)
+        if value:
+            response['Cache-Control'] = value
+        return response
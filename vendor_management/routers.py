@@ -0,0 +1,31 @@
+import contextvars
+import random
+
+from django.conf import settings
+
+replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads to a random DATABASE_REPLICAS alias while a request marked
+    by ReplicaReadMiddleware is being handled; everything else, including
+    all writes and migrations, uses the default database.
+    """
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replica_reads.get():
+            return self.choose_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+    def choose_replica(self):
+        return random.choice(settings.DATABASE_REPLICAS)
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
+from .database import parse_database_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +48,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'vendor_management.middleware.RequestMetricsMiddleware',
+    'vendor_management.middleware.ReplicaReadMiddleware',
+    'vendor_management.middleware.CacheControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,11 +83,65 @@ WSGI_APPLICATION = 'vendor_management.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# DATABASE_URL selects the database (URL formats in vendor_management.database);
+# the default is db.sqlite3 next to manage.py. Connections are kept open for
+# CONN_MAX_AGE seconds and health-checked before reuse. DATABASE_REPLICA_URLS
+# optionally lists comma-separated read replicas; ReadReplicaRouter sends
+# list/retrieve/performance reads to them. vendor_management.asgi defaults
+# CONN_MAX_AGE to 0: async requests do not reuse connections between requests,
+# so persistent ones would only pile up.
+
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', '60'))
 
 DATABASES = {
+    'default': parse_database_url(
+        os.environ.get('DATABASE_URL', f'sqlite:///{BASE_DIR / "db.sqlite3"}'),
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=True,
+    ),
+}
+if DATABASES['default']['ENGINE'] == 'vendor_management.sqlite3':
+    # Seconds a writer waits for the write lock before "database is locked".
+    DATABASES['default']['OPTIONS'].setdefault('timeout', 20)
+    # A file rather than SQLite's shared in-memory database, so threaded
+    # tests get real (WAL) locking instead of table-level lock errors. The
+    # process ID keeps concurrent test runs on one host apart; --parallel
+    # workers get their own clones of it.
+    DATABASES['default']['TEST'] = {
+        'NAME': os.path.join(tempfile.gettempdir(), f'test_vendor_management_{os.getpid()}.sqlite3'),
+    }
+
+DATABASE_REPLICAS = []
+for replica_url in filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')):
+    alias = f'replica{len(DATABASE_REPLICAS) + 1}'
+    DATABASES[alias] = parse_database_url(replica_url.strip(), conn_max_age=CONN_MAX_AGE, conn_health_checks=True)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['vendor_management.routers.ReadReplicaRouter']
+REPLICA_READ_VIEWS = ['-list', '-detail', '-performance', '-rankings', '-ranking', '-at-risk', '-spend']
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# DJANGO_CACHE_BACKEND picks 'locmem' (per process, the default), 'file' (shared
+# by every worker on the host) or 'redis' (shared across hosts, needs redis-py).
+# DJANGO_CACHE_LOCATION overrides the directory or server URL.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'vendor-management'),
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(tempfile.gettempdir(), 'vendor_management_cache'),
+    ),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379'),
+}
+CACHE_BACKEND, CACHE_LOCATION = CACHE_BACKENDS[os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')]
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', CACHE_LOCATION),
     }
 }
 
@@ -125,3 +186,83 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'vendors.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
+# Vendors app
+
+# Rows per INSERT statement for the bulk purchase order endpoint; clients may
+# override it per request with ?batch_size=.
+VENDORS_BULK_BATCH_SIZE = 500
+
+# Default and maximum page sizes for the cursor-paginated list endpoints.
+VENDORS_PAGE_SIZE = 100
+VENDORS_MAX_PAGE_SIZE = 1000
+
+# Rows fetched per database round trip by the streaming export endpoints.
+VENDORS_EXPORT_CHUNK_SIZE = 2000
+
+# Seconds a cached vendor performance response may be served; entries are also
+# invalidated whenever the vendor's metrics change.
+VENDORS_PERFORMANCE_CACHE_TIMEOUT = 300
+
+# Cache-Control for GET responses, by URL name. "no-cache" lets clients and
+# proxies store a response but revalidate it each time; list and detail
+# responses carry an ETag, so unchanged ones come back as a 304.
+# Use e.g. "max-age=30" to let clients skip the request entirely.
+VENDORS_CACHE_CONTROL = {
+    'vendor-list': 'no-cache',
+    'vendor-detail': 'no-cache',
+    'vendor-performance': 'no-cache',
+    'purchaseorder-list': 'no-cache',
+    'purchaseorder-detail': 'no-cache',
+}
+
+# Mount the async read-only API (vendors.async_views) under /api/async/. Serve
+# it through vendor_management.asgi with an ASGI server such as uvicorn.
+VENDORS_ASYNC_API = True
+
+# Purchase orders moved per transaction by purge_archived_vendors. Deleting a
+# vendor through the API deletes it at once when it has at most this many
+# purchase orders, and archives it for the purge otherwise.
+VENDORS_PURGE_BATCH_SIZE = 500
+
+# Hours ahead in which a pending purchase order counts as due soon, for the
+# at-risk endpoint and scan_delivery_risk.
+VENDORS_AT_RISK_WINDOW_HOURS = 48
+
+# Purchase order ids below the highest one seen that the next
+# scan_delivery_risk run reads again, for orders whose transaction commits
+# after one with a higher id. Must exceed the ids allocated while the
+# longest purchase order write is open.
+VENDORS_AT_RISK_SCAN_OVERLAP = 1000
+
+# ISO 4217 code that spend analytics report in; orders in other currencies
+# are converted with vendors.models.ExchangeRate. New orders default to it.
+VENDORS_BASE_CURRENCY = 'USD'
+
+# Rankings (VendorRanking) are adjusted vendor by vendor when at most this
+# many vendors' metrics change at once, and rebuilt in full otherwise.
+VENDORS_RANKING_INCREMENTAL_LIMIT = 50
+
+# 'sync' applies metric changes inside the purchase order write. 'deferred'
+# only queues the vendor (VendorMetricsMarker) and leaves the recomputation
+# to `python manage.py run_metrics_worker`.
+VENDORS_METRICS_MODE = os.environ.get('VENDORS_METRICS_MODE', 'sync')
+
+
+# Request metrics (vendor_management.middleware.RequestMetricsMiddleware,
+# served at /metrics/). Every request is counted and timed; DB and serializer
+# timings only cover this fraction of requests. The Server-Timing header on
+# sampled responses exposes those timings to clients, so it is off unless
+# REQUEST_METRICS_SERVER_TIMING=1. To debug one process, run it with
+# REQUEST_METRICS_SAMPLE_RATE=1 REQUEST_METRICS_SERVER_TIMING=1.
+REQUEST_METRICS_SAMPLE_RATE = float(os.environ.get('REQUEST_METRICS_SAMPLE_RATE', '0.01'))
+REQUEST_METRICS_SERVER_TIMING = os.environ.get('REQUEST_METRICS_SERVER_TIMING', '0') == '1'
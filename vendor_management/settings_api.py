@@ -0,0 +1,43 @@
+"""
+API-only settings for nodes that serve just the JSON API:
+
+    DJANGO_SETTINGS_MODULE=vendor_management.settings_api
+
+Same database, cache and vendors settings as vendor_management.settings, minus
+what only the admin and the browsable API use: the admin, sessions, messages,
+static files and the template engine, their middleware, CSRF and session
+authentication. Requests are unauthenticated, as with the default settings;
+add token-style authentication classes here if the API gets them. Run
+migrations and the admin with the full settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+API_EXCLUDED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'rest_framework',
+]
+API_EXCLUDED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_EXCLUDED_APPS]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in API_EXCLUDED_MIDDLEWARE]
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['vendors.renderers.FastJSONRenderer'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    # AnonymousUser lives in django.contrib.auth, which is not installed.
+    'UNAUTHENTICATED_USER': None,
+}
@@ -0,0 +1,52 @@
+"""
+SQLite backend tuned for a multi-process web server.
+
+Transactions start with BEGIN IMMEDIATE (configurable through the
+``transaction_mode`` option, as in Django 5.1+). SQLite ignores
+select_for_update(). With the default deferred BEGIN, a transaction that
+reads before it writes cannot take the write lock while another writer is
+active and fails at once with "database is locked". An immediate BEGIN
+takes the lock up front, so concurrent writers queue on the busy timeout
+instead, which gives row-lock-like serialization.
+
+Each new connection also applies the ``journal_mode``, ``synchronous`` and
+``mmap_size`` options as pragmas: WAL lets readers proceed while a write is
+in progress, and synchronous=NORMAL skips the fsync on every commit (a power
+loss can drop the last transactions but not corrupt the database).
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+PRAGMA_DEFAULTS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_mode = 'IMMEDIATE'
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        mode = params.pop('transaction_mode', self.transaction_mode).upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}.")
+        self.transaction_mode = mode
+        self.pragmas = {name: params.pop(name, default) for name, default in PRAGMA_DEFAULTS.items()}
+        for name, value in self.pragmas.items():
+            if not str(value).isalnum():
+                raise ImproperlyConfigured(f'Invalid value {value!r} for the {name} option.')
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if name == 'journal_mode' and self.is_in_memory_db():
+                continue
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
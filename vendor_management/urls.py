@@ -14,10 +14,22 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
+from .metrics import prometheus_metrics
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/', include('vendors.urls')),
+    path('metrics/', prometheus_metrics, name='prometheus-metrics'),
 ]
+
+# Not installed in the API-only settings (vendor_management.settings_api).
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
+if settings.VENDORS_ASYNC_API:
+    urlpatterns.append(path('api/async/', include('vendors.async_urls')))
+
+urlpatterns.append(path('api/', include('vendors.urls')))
+
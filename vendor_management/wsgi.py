@@ -14,3 +14,25 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vendor_management.settings')
 
 application = get_wsgi_application()
+
+
+def warm_up():
+    """
+    Do the work the first request would otherwise pay for: import the views,
+    serializers and renderers behind the URL conf, build the resolver and
+    reverse maps, and build each API serializer's fields once. Opens no
+    database connection, so the gunicorn master may run it before forking
+    (see vendor_management.gunicorn_conf).
+    """
+    from django.db import connections
+    from django.urls import get_resolver, reverse
+
+    resolver = get_resolver()
+    resolver.url_patterns
+    reverse('vendor-list')
+    from vendors.urls import router
+    for _, viewset, _ in router.registry:
+        viewset.serializer_class().values_reader()
+    for alias in connections:
+        connections[alias]
+    connections.close_all()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Vendor, PurchaseOrder
+from .models import ExchangeRate, Vendor, PurchaseOrder
 
 @admin.register(Vendor)
 class VendorAdmin(admin.ModelAdmin):
@@ -9,5 +9,14 @@ class VendorAdmin(admin.ModelAdmin):
 @admin.register(PurchaseOrder)
 class PurchaseOrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'po_number', 'vendor', 'status', 'order_date', 'delivery_date')
+    list_select_related = ('vendor',)
+    raw_id_fields = ('vendor',)
     search_fields = ('po_number', 'vendor__name')
-    list_filter = ('status',)
\ No newline at end of file
+    list_filter = ('status',)
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    # Saving or deleting a rate here drops the cached spend months it affects.
+    list_display = ('currency', 'valid_from', 'rate')
+    list_filter = ('currency',)
+    ordering = ('currency', '-valid_from')
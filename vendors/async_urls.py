@@ -0,0 +1,10 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('vendors/', async_views.vendor_list, name='async-vendor-list'),
+    path('vendors/<int:pk>/', async_views.vendor_detail, name='async-vendor-detail'),
+    path('vendors/<int:pk>/performance/', async_views.vendor_performance, name='async-vendor-performance'),
+    path('purchase_orders/', async_views.purchase_order_list, name='async-purchaseorder-list'),
+    path('purchase_orders/<int:pk>/', async_views.purchase_order_detail, name='async-purchaseorder-detail'),
+]
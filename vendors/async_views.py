@@ -0,0 +1,117 @@
+"""
+Async, read-only variants of the vendor and purchase order endpoints for
+ASGI deployments. They use the async ORM and render with the same
+serializers and JSON renderer as the DRF viewsets, so payloads match.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import router
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import serializers, status
+
+from .cache import aget_vendor_performance, aset_vendor_performance
+from .filters import PurchaseOrderFilterBackend, parse_performance_window, parse_query_param
+from .models import Vendor, PurchaseOrder, VendorPerformanceDaily
+from .renderers import FastJSONRenderer
+from .serializers import VendorSerializer, PurchaseOrderSerializer, PerformanceMetricsSerializer
+
+renderer = FastJSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(renderer.render(data), content_type='application/json', status=status, headers=headers)
+
+
+def read_only_endpoint(view):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return json_response(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED,
+                headers={'Allow': 'GET, HEAD'},
+            )
+        try:
+            return await view(request, *args, **kwargs)
+        except serializers.ValidationError as exc:
+            return json_response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        except ObjectDoesNotExist:
+            return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return wrapper
+
+
+async def keyset_page(request, queryset, serializer_class):
+    # Same id ordering as IdCursorPagination; the cursor is the last id seen.
+    page_size = parse_query_param(
+        serializers.IntegerField(min_value=1, max_value=settings.VENDORS_MAX_PAGE_SIZE),
+        'page_size',
+        request.GET.get('page_size', settings.VENDORS_PAGE_SIZE),
+    )
+    after = request.GET.get('after')
+    if after is not None:
+        queryset = queryset.filter(pk__gt=parse_query_param(serializers.IntegerField(), 'after', after))
+
+    columns, transform = serializer_class().values_reader()
+    queryset = queryset.order_by('pk').values('pk', *columns)
+    rows = [row async for row in queryset[:page_size + 1].aiterator()]
+    next_url = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        params = request.GET.copy()
+        params['after'] = rows[-1]['pk']
+        next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+    return {'next': next_url, 'results': [transform(row) for row in rows]}
+
+
+@read_only_endpoint
+async def vendor_list(request):
+    return json_response(await keyset_page(request, Vendor.objects.filter(archived_at__isnull=True), VendorSerializer))
+
+
+@read_only_endpoint
+async def vendor_detail(request, pk):
+    vendor = await Vendor.objects.aget(pk=pk, archived_at__isnull=True)
+    return json_response(VendorSerializer(vendor).data)
+
+
+@read_only_endpoint
+async def vendor_performance(request, pk):
+    window = parse_performance_window(request.GET)
+    if window is not None:
+        vendor = await Vendor.objects.only('pk').aget(pk=pk, archived_at__isnull=True)
+        summary = await sync_to_async(VendorPerformanceDaily.summarize)(vendor.pk, **window)
+        return json_response(summary)
+
+    entry = await aget_vendor_performance(pk)
+    if entry is None:
+        # Filled from the primary, as in VendorViewSet.performance.
+        vendor = await Vendor.objects.using(router.db_for_write(Vendor)).aget(pk=pk, archived_at__isnull=True)
+        entry = await aset_vendor_performance(
+            vendor.pk, PerformanceMetricsSerializer(vendor).data, vendor.updated_at
+        )
+    response = json_response(entry['data'], headers={
+        'ETag': entry['etag'],
+        'Last-Modified': http_date(entry['last_modified']),
+    })
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'], response=response
+    )
+
+
+@read_only_endpoint
+async def purchase_order_list(request):
+    queryset = PurchaseOrderFilterBackend().filter_params(
+        PurchaseOrder.objects.filter(vendor__archived_at__isnull=True), request.GET
+    )
+    return json_response(await keyset_page(request, queryset, PurchaseOrderSerializer))
+
+
+@read_only_endpoint
+async def purchase_order_detail(request, pk):
+    purchase_order = await PurchaseOrder.objects.aget(pk=pk, vendor__archived_at__isnull=True)
+    return json_response(PurchaseOrderSerializer(purchase_order).data)
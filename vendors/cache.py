@@ -0,0 +1,49 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import quote_etag
+
+
+def vendor_performance_key(vendor_id):
+    return f'vendors:performance:{vendor_id}'
+
+
+def get_vendor_performance(vendor_id):
+    return cache.get(vendor_performance_key(vendor_id))
+
+
+async def aget_vendor_performance(vendor_id):
+    return await cache.aget(vendor_performance_key(vendor_id))
+
+
+def performance_entry(data, updated_at):
+    # Last-Modified is the vendor's updated_at, which every metric change
+    # advances, so rebuilding the entry does not make it look newer.
+    data = dict(data)
+    digest = hashlib.md5(json.dumps(data, sort_keys=True).encode(), usedforsecurity=False).hexdigest()
+    return {'data': data, 'etag': quote_etag(digest), 'last_modified': int(updated_at.timestamp())}
+
+
+def set_vendor_performance(vendor_id, data, updated_at):
+    entry = performance_entry(data, updated_at)
+    cache.set(vendor_performance_key(vendor_id), entry, settings.VENDORS_PERFORMANCE_CACHE_TIMEOUT)
+    return entry
+
+
+async def aset_vendor_performance(vendor_id, data, updated_at):
+    entry = performance_entry(data, updated_at)
+    await cache.aset(vendor_performance_key(vendor_id), entry, settings.VENDORS_PERFORMANCE_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_vendor_performance(vendor_ids):
+    keys = [vendor_performance_key(vendor_id) for vendor_id in vendor_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # Delete again once the write is visible: a read that ran between the
+    # write and the commit may have cached the old numbers.
+    transaction.on_commit(lambda: cache.delete_many(keys))
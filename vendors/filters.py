@@ -0,0 +1,216 @@
+import datetime
+
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from .models import PurchaseOrder, VendorPerformanceDaily, add_months, month_start
+
+
+def parse_query_param(field, name, value):
+    try:
+        return field.run_validation(value)
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({name: exc.detail})
+
+
+def prefix_range(prefix):
+    # Bounds for a prefix match expressed as a range, which a plain B-tree
+    # index can seek on (LIKE 'x%' cannot use one on SQLite, nor on
+    # PostgreSQL without a pattern_ops index).
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return {'gte': prefix}
+    return {'gte': prefix, 'lt': prefix[:-1] + chr(last + 1)}
+
+
+def parse_performance_window(params):
+    """
+    Parse ?window=30d or ?from=&to= (plus an optional ?interval= for a trend
+    series) into VendorPerformanceDaily.summarize() arguments. Returns None
+    when none are given, meaning lifetime metrics.
+    """
+    if not any(name in params for name in ('window', 'from', 'to', 'interval')):
+        return None
+
+    start = end = None
+    if 'window' in params:
+        if 'from' in params or 'to' in params:
+            raise serializers.ValidationError({'window': ['Use either window or from/to, not both.']})
+        days = parse_query_param(
+            serializers.IntegerField(min_value=1, max_value=3660), 'window', params['window'].rstrip('dD')
+        )
+        end = timezone.localdate()
+        start = end - datetime.timedelta(days=days - 1)
+    if 'from' in params:
+        start = parse_query_param(serializers.DateField(), 'from', params['from'])
+    if 'to' in params:
+        end = parse_query_param(serializers.DateField(), 'to', params['to'])
+    if start is not None and end is not None and start > end:
+        raise serializers.ValidationError({'from': ['Must not be after "to".']})
+
+    interval = params.get('interval')
+    if interval is not None:
+        interval = parse_query_param(
+            serializers.ChoiceField(choices=list(VendorPerformanceDaily.INTERVALS)), 'interval', interval
+        )
+    return {'start': start, 'end': end, 'interval': interval}
+
+
+def parse_month_range(params, default_months=12):
+    """
+    Parse ?from=YYYY-MM&to=YYYY-MM (inclusive; full dates are accepted and
+    taken as their month) into the first days of the first and last month.
+    Defaults to the ``default_months`` months up to the current one.
+    """
+    month_field = serializers.DateField(input_formats=['%Y-%m', 'iso-8601'])
+    end = month_start(timezone.localdate())
+    if 'to' in params:
+        end = month_start(parse_query_param(month_field, 'to', params['to']))
+    start = add_months(end, 1 - default_months)
+    if 'from' in params:
+        start = month_start(parse_query_param(month_field, 'from', params['from']))
+    if start > end:
+        raise serializers.ValidationError({'from': ['Must not be after "to".']})
+    return start, end
+
+
+class RangeFilterMixin:
+    # Maps query parameters to (lookup, serializer field); every lookup is
+    # backed by an index on the model.
+    range_filters = {}
+
+    def range_params(self, params):
+        filters = {}
+        for param, (lookup, field) in self.range_filters.items():
+            value = params.get(param)
+            if value is not None:
+                filters[lookup] = parse_query_param(field, param, value)
+        return filters
+
+
+class PurchaseOrderFilterBackend(RangeFilterMixin, BaseFilterBackend):
+    # Query parameters shared by the purchase order list and export endpoints.
+    range_filters = {
+        'order_date_after': ('order_date__gte', serializers.DateTimeField()),
+        'order_date_before': ('order_date__lte', serializers.DateTimeField()),
+        'issue_date_after': ('issue_date__gte', serializers.DateTimeField()),
+        'issue_date_before': ('issue_date__lte', serializers.DateTimeField()),
+        'delivery_date_after': ('delivery_date__gte', serializers.DateTimeField()),
+        'delivery_date_before': ('delivery_date__lte', serializers.DateTimeField()),
+        'delivered_date_after': ('delivered_date__gte', serializers.DateTimeField()),
+        'delivered_date_before': ('delivered_date__lte', serializers.DateTimeField()),
+        'quality_rating_min': ('quality_rating__gte', serializers.FloatField(min_value=1.0, max_value=5.0)),
+        'quality_rating_max': ('quality_rating__lte', serializers.FloatField(min_value=1.0, max_value=5.0)),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        return self.filter_params(queryset, request.query_params)
+
+    def filter_params(self, queryset, params):
+        filters = self.range_params(params)
+
+        vendor_id = params.get('vendor')
+        if vendor_id is not None:
+            filters['vendor__id'] = parse_query_param(serializers.IntegerField(), 'vendor', vendor_id)
+
+        statuses = params.get('status')
+        if statuses is not None:
+            status_field = serializers.ChoiceField(choices=PurchaseOrder.STATUS_CHOICES)
+            filters['status__in'] = [
+                parse_query_param(status_field, 'status', value) for value in statuses.split(',')
+            ]
+
+        prefix = params.get('po_number_prefix')
+        if prefix:
+            # The range seeks on the po_number unique index; startswith keeps
+            # the match exact under non-binary collations.
+            for bound, value in prefix_range(prefix).items():
+                filters[f'po_number__{bound}'] = value
+            filters['po_number__startswith'] = prefix
+
+        queryset = queryset.filter(**filters)
+        late = params.get('late')
+        if late is not None:
+            # Delivered after the promised date; served by po_late_idx.
+            delivered_late = Q(delivered_date__gt=F('delivery_date'))
+            if parse_query_param(serializers.BooleanField(), 'late', late):
+                queryset = queryset.filter(delivered_late)
+            else:
+                queryset = queryset.exclude(delivered_late)
+        return queryset
+
+
+class PurchaseOrderLineFilterBackend(RangeFilterMixin, BaseFilterBackend):
+    range_filters = {
+        'order_date_after': ('purchase_order__order_date__gte', serializers.DateTimeField()),
+        'order_date_before': ('purchase_order__order_date__lte', serializers.DateTimeField()),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        filters = self.range_params(params)
+        vendor_id = params.get('vendor')
+        if vendor_id is not None:
+            # The line's own vendor column, so the vendor index is used.
+            filters['vendor_id'] = parse_query_param(serializers.IntegerField(), 'vendor', vendor_id)
+        sku = params.get('sku')
+        if sku is not None:
+            filters['sku'] = sku
+        statuses = params.get('status')
+        if statuses is not None:
+            status_field = serializers.ChoiceField(choices=PurchaseOrder.STATUS_CHOICES)
+            filters['purchase_order__status__in'] = [
+                parse_query_param(status_field, 'status', value) for value in statuses.split(',')
+            ]
+        return queryset.filter(**filters)
+
+
+class VendorFilterBackend(RangeFilterMixin, BaseFilterBackend):
+    range_filters = {
+        'on_time_delivery_rate_min': ('on_time_delivery_rate__gte', serializers.FloatField(min_value=0, max_value=100)),
+        'on_time_delivery_rate_max': ('on_time_delivery_rate__lte', serializers.FloatField(min_value=0, max_value=100)),
+        'quality_rating_avg_min': ('quality_rating_avg__gte', serializers.FloatField(min_value=0, max_value=5)),
+        'quality_rating_avg_max': ('quality_rating_avg__lte', serializers.FloatField(min_value=0, max_value=5)),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        queryset = queryset.filter(**self.range_params(params))
+        search = params.get('search', '').strip().lower()
+        if search:
+            # Case-insensitive prefix search on name or vendor code, seeking
+            # on the lower(name) and lower(vendor_code) expression indexes.
+            bounds = prefix_range(search)
+            queryset = queryset.alias(name_lower=Lower('name'), vendor_code_lower=Lower('vendor_code')).filter(
+                Q(**{f'name_lower__{bound}': value for bound, value in bounds.items()})
+                | Q(**{f'vendor_code_lower__{bound}': value for bound, value in bounds.items()})
+            )
+        return queryset
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """
+    ?ordering=field,-other restricted to the view's ``ordering_fields``, which
+    must be indexed and non-null so cursor pagination can seek on the first
+    one. The primary key is appended as a tie-breaker. Unknown fields are a
+    400 rather than silently ignored.
+    """
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param)
+        if not value:
+            return None
+        ordering = [term.strip() for term in value.split(',') if term.strip()]
+        invalid = [term for term in ordering if term.lstrip('-') not in view.ordering_fields]
+        if invalid:
+            raise serializers.ValidationError({self.ordering_param: [
+                f"Cannot order by {', '.join(invalid)}; choose from {', '.join(view.ordering_fields)}."
+            ]})
+        if not any(term.lstrip('-') in ('id', 'pk') for term in ordering):
+            ordering.append('id')
+        return ordering
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        return queryset.order_by(*ordering) if ordering else queryset
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from vendors.models import ChangeLog
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed entries superseded by a newer change to the same row.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Sequence values scanned per transaction.')
+
+    def handle(self, *args, **options):
+        deleted = ChangeLog.compact(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} superseded change log entries.'))
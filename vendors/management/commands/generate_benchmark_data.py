@@ -0,0 +1,93 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from vendors.models import Vendor, PurchaseOrder, PurchaseOrderLine, VendorMonthlySpend, order_total, parse_line_items
+
+VENDOR_CODE_PREFIX = 'BENCH'
+PRODUCTS = [
+    ('Steel bolts M8', 0.12), ('Hex nuts M8', 0.05), ('Copper wire 2.5mm (100m)', 84.0),
+    ('Cardboard boxes 40x30x30', 1.35), ('Pallet wrap 500mm', 14.9), ('Safety gloves (pair)', 3.2),
+    ('LED panel 60x60', 42.5), ('Cable ties 300mm (100)', 6.8), ('Printer paper A4 (ream)', 4.75),
+    ('Hydraulic oil 20L', 96.0), ('Ball bearing 6204', 2.9), ('Aluminium profile 2m', 18.4),
+]
+STATUS_WEIGHTS = [('completed', 70), ('pending', 25), ('canceled', 5)]
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic vendors and purchase orders for load testing and benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=100, help='Vendors to create.')
+        parser.add_argument('--pos', type=int, default=100, help='Purchase orders per vendor.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT statement.')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data first.')
+
+    def handle(self, *args, **options):
+        existing = Vendor.objects.filter(vendor_code__startswith=VENDOR_CODE_PREFIX)
+        if options['clear']:
+            existing.delete()
+        elif existing.exists():
+            raise CommandError('Benchmark data already exists; pass --clear to regenerate it.')
+
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        with transaction.atomic():
+            vendors = Vendor.objects.bulk_create([
+                Vendor(
+                    name=f'Vendor {i}',
+                    contact_details=f'purchasing@vendor{i}.example.com',
+                    address=f'{rng.randint(1, 999)} Supply Street, Unit {i}',
+                    vendor_code=f'{VENDOR_CODE_PREFIX}{i:06}',
+                )
+                for i in range(options['vendors'])
+            ], batch_size=options['batch_size'])
+
+            orders = []
+            for vendor in vendors:
+                for j in range(options['pos']):
+                    orders.append(self.purchase_order(rng, now, vendor, j))
+                    if len(orders) >= options['batch_size']:
+                        self.create_orders(orders, options['batch_size'])
+                        orders = []
+            self.create_orders(orders, options['batch_size'])
+
+            Vendor.rebuild_performance_metrics(
+                Vendor.objects.filter(pk__in=[vendor.pk for vendor in vendors]), batch_size=options['batch_size']
+            )
+
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Generated {len(vendors)} vendor(s) and {len(vendors) * options['pos']} purchase order(s)."
+            ))
+
+    def create_orders(self, orders, batch_size):
+        PurchaseOrder.objects.bulk_create(orders)
+        PurchaseOrderLine.sync(orders, replace=False, batch_size=batch_size)
+        VendorMonthlySpend.invalidate(order.order_date for order in orders)
+
+    def purchase_order(self, rng, now, vendor, number):
+        items = [
+            {'sku': f'SKU-{rng.randint(1000, 9999)}', 'description': name, 'quantity': rng.randint(1, 50),
+             'unit_price': round(price * rng.uniform(0.9, 1.1), 2)}
+            for name, price in rng.sample(PRODUCTS, rng.randint(1, 5))
+        ]
+        status = rng.choices([s for s, _ in STATUS_WEIGHTS], weights=[w for _, w in STATUS_WEIGHTS])[0]
+        ordered = now - timezone.timedelta(days=rng.randint(1, 365), minutes=rng.randint(0, 1439))
+        due = ordered + timezone.timedelta(days=rng.randint(3, 30))
+        completed = status == 'completed'
+        return PurchaseOrder(
+            po_number=f'{VENDOR_CODE_PREFIX}-{vendor.pk}-{number}',
+            vendor=vendor,
+            order_date=ordered,
+            issue_date=ordered + timezone.timedelta(hours=rng.randint(0, 48)),
+            delivery_date=due,
+            delivered_date=min(due + timezone.timedelta(days=rng.randint(-4, 3)), now) if completed else None,
+            items=items,
+            quantity=sum(item['quantity'] for item in items),
+            total_amount=order_total(parse_line_items(items)),
+            status=status,
+            quality_rating=round(rng.uniform(1, 5), 1) if completed and rng.random() < 0.9 else None,
+        )
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from vendors.models import ArchivedPurchaseOrder, PurchaseOrder, Vendor
+
+
+class Command(BaseCommand):
+    help = (
+        'Move the purchase orders of archived vendors to the archive table in bounded batches, '
+        'then delete the vendors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('vendor_ids', nargs='*', type=int, help='Only purge these archived vendors.')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.VENDORS_PURGE_BATCH_SIZE,
+            help='Purchase orders moved per transaction.',
+        )
+        parser.add_argument(
+            '--older-than', type=float, default=0, help='Only purge vendors archived at least this many days ago.',
+        )
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timezone.timedelta(days=options['older_than'])
+        vendors = Vendor.objects.filter(archived_at__lte=cutoff).order_by('pk')
+        if options['vendor_ids']:
+            vendors = vendors.filter(pk__in=options['vendor_ids'])
+
+        purged = 0
+        for vendor in vendors.only('pk', 'vendor_code', 'archived_at'):
+            total = PurchaseOrder.objects.filter(vendor_id=vendor.pk).count()
+
+            def progress(moved):
+                self.stdout.write(f'{vendor.vendor_code}: archived {moved}/{total} purchase order(s).')
+                if options['pause']:
+                    time.sleep(options['pause'])
+
+            moved = ArchivedPurchaseOrder.purge_vendor(vendor, batch_size=options['batch_size'], progress=progress)
+            if moved is None:
+                self.stdout.write(f'{vendor.vendor_code}: restored during the purge; skipped.')
+                continue
+            purged += 1
+            self.stdout.write(f'{vendor.vendor_code}: deleted after archiving {moved} purchase order(s).')
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} archived vendor(s).'))
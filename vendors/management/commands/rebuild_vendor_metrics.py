@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from vendors.models import Vendor
+
+
+class Command(BaseCommand):
+    help = 'Rebuild vendor performance counters, rates, daily rollups and rankings from the purchase order history.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('vendor_ids', nargs='*', type=int, help='Only rebuild these vendors.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Vendors updated per query.')
+
+    def handle(self, *args, **options):
+        vendors = Vendor.objects.all()
+        if options['vendor_ids']:
+            vendors = vendors.filter(pk__in=options['vendor_ids'])
+
+        rebuilt = Vendor.rebuild_performance_metrics(vendors, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt performance metrics for {rebuilt} vendor(s).'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from vendors.models import VendorRanking
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the vendor leaderboard (VendorRanking) from the current vendor metrics.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rankings inserted per query.')
+
+    def handle(self, *args, **options):
+        VendorRanking.rebuild(batch_size=options['batch_size'])
+        ranked = VendorRanking.ranked_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"Ranked {ranked['on_time_delivery_rate']} vendor(s) by on-time delivery "
+            f"and {ranked['quality_rating_avg']} by quality rating."
+        ))
@@ -0,0 +1,51 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from vendors.models import PurchaseOrder, SpendSummaryMonth, VendorMonthlySpend, add_months, month_of
+
+
+class Command(BaseCommand):
+    help = (
+        'Cache spend analytics (VendorMonthlySpend) for closed months that are not cached yet, '
+        'one transaction per month.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help='First month (YYYY-MM); default: the oldest order.')
+        parser.add_argument('--to', dest='end', help='Last month (YYYY-MM); default: the previous month.')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute months that are already cached.')
+
+    def handle(self, *args, **options):
+        closed_before = VendorMonthlySpend.closed_before()
+        end = add_months(closed_before, -1)
+        if options['end']:
+            end = min(self.parse_month(options['end'], '--to'), end)
+        if options['start']:
+            start = self.parse_month(options['start'], '--from')
+        else:
+            oldest = PurchaseOrder.objects.aggregate(oldest=Min('order_date'))['oldest']
+            start = month_of(oldest) if oldest is not None else closed_before
+
+        cached = set()
+        if not options['rebuild']:
+            cached = set(
+                SpendSummaryMonth.objects.filter(currency=settings.VENDORS_BASE_CURRENCY)
+                .values_list('month', flat=True)
+            )
+        refreshed = rows = 0
+        month = start
+        while month <= end:
+            if month not in cached:
+                rows += VendorMonthlySpend.materialize(month)
+                refreshed += 1
+            month = add_months(month, 1)
+        self.stdout.write(self.style.SUCCESS(f'Cached {refreshed} month(s), {rows} vendor row(s).'))
+
+    @staticmethod
+    def parse_month(value, option):
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f'{option} must be a month as YYYY-MM.')
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from vendors.models import VendorMetricsMarker
+
+
+class Command(BaseCommand):
+    help = 'Recompute vendor metrics queued by purchase order writes in deferred metrics mode.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Vendors recomputed per batch.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            if not connection.in_atomic_block:
+                close_old_connections()
+            processed = VendorMetricsMarker.process_batch(options['batch_size'])
+            if processed:
+                status = VendorMetricsMarker.queue_status()
+                self.stdout.write(
+                    f"Recomputed {processed} vendor(s); {status['pending_vendors']} pending, "
+                    f"lag {status['lag_seconds']:.1f}s."
+                )
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Metrics queue drained.'))
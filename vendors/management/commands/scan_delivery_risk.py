@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from vendors.models import DeliveryRiskScan, Vendor
+
+
+class Command(BaseCommand):
+    help = (
+        'Report pending purchase orders that became overdue or due soon since the previous scan, '
+        'per vendor. Run it periodically (e.g. from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--within-hours', type=int, default=settings.VENDORS_AT_RISK_WINDOW_HOURS,
+            help='Hours ahead in which a pending order counts as due soon.',
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Ignore previous scans and report every pending order due within the window.',
+        )
+
+    def handle(self, *args, **options):
+        if options['full']:
+            DeliveryRiskScan.objects.all().delete()
+        scan = DeliveryRiskScan.run(timezone.timedelta(hours=options['within_hours']))
+        codes = dict(Vendor.objects.filter(pk__in=scan.vendor_counts).values_list('pk', 'vendor_code'))
+        for vendor_id, counts in sorted(scan.vendor_counts.items(), key=lambda item: int(item[0])):
+            self.stdout.write(
+                f"{codes.get(int(vendor_id), vendor_id)}: {counts['overdue']} overdue, "
+                f"{counts['due_soon']} due soon."
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{scan.overdue_count} purchase order(s) newly overdue and {scan.due_soon_count} newly due soon.'
+        ))
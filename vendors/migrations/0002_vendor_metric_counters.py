@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:13
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+# Frozen copies of the counters and their aggregates as of this migration;
+# later changes to vendors.models must not change what it writes.
+METRIC_COUNTER_FIELDS = ('completed_po_count', 'on_time_po_count', 'quality_rating_sum', 'quality_rating_count')
+
+
+def backfill_metric_counters(apps, schema_editor):
+    Vendor = apps.get_model('vendors', 'Vendor')
+    completed = Q(purchaseorder__status='completed')
+    on_time = Q(purchaseorder__delivered_date__lte=F('purchaseorder__delivery_date'))
+    aggregates = {
+        'completed_po_count': Count('purchaseorder__id', filter=completed),
+        'on_time_po_count': Count('purchaseorder__id', filter=completed & on_time),
+        'quality_rating_sum': Sum('purchaseorder__quality_rating', filter=completed),
+        'quality_rating_count': Count('purchaseorder__quality_rating', filter=completed),
+    }
+    vendors = Vendor.objects.annotate(**{f'rebuilt_{field}': aggregate for field, aggregate in aggregates.items()})
+    batch = []
+    for vendor in vendors.iterator(chunk_size=500):
+        for field in METRIC_COUNTER_FIELDS:
+            setattr(vendor, field, getattr(vendor, f'rebuilt_{field}') or 0)
+        batch.append(vendor)
+        if len(batch) >= 500:
+            Vendor.objects.bulk_update(batch, METRIC_COUNTER_FIELDS)
+            batch = []
+    Vendor.objects.bulk_update(batch, METRIC_COUNTER_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='completed_po_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='on_time_po_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='quality_rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='quality_rating_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(backfill_metric_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0002_vendor_metric_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['vendor', 'status', 'delivered_date', 'delivery_date', 'quality_rating'], name='po_vendor_metrics_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['order_date'], name='po_order_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['issue_date'], name='po_issue_date_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:20
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+import django.db.models.deletion
+
+# Frozen copies of the counters and their aggregates as of this migration;
+# later changes to vendors.models must not change what it writes.
+METRIC_COUNTER_FIELDS = ('completed_po_count', 'on_time_po_count', 'quality_rating_sum', 'quality_rating_count')
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    PurchaseOrder = apps.get_model('vendors', 'PurchaseOrder')
+    VendorPerformanceDaily = apps.get_model('vendors', 'VendorPerformanceDaily')
+    completed = Q(status='completed')
+    on_time = Q(delivered_date__lte=F('delivery_date'))
+    aggregates = {
+        'completed_po_count': Count('id', filter=completed),
+        'on_time_po_count': Count('id', filter=completed & on_time),
+        'quality_rating_sum': Sum('quality_rating', filter=completed),
+        'quality_rating_count': Count('quality_rating', filter=completed),
+    }
+    rollups = (
+        PurchaseOrder.objects.filter(status='completed')
+        .annotate(day=TruncDate(Coalesce('delivered_date', 'delivery_date')))
+        .values('vendor_id', 'day')
+        .annotate(**aggregates)
+        .order_by()
+    )
+    batch = []
+    for row in rollups.iterator(chunk_size=500):
+        counters = {field: row[field] or 0 for field in METRIC_COUNTER_FIELDS}
+        batch.append(VendorPerformanceDaily(vendor_id=row['vendor_id'], day=row['day'], **counters))
+        if len(batch) >= 500:
+            VendorPerformanceDaily.objects.bulk_create(batch)
+            batch = []
+    VendorPerformanceDaily.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0003_purchaseorder_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorPerformanceDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('completed_po_count', models.PositiveIntegerField(default=0)),
+                ('on_time_po_count', models.PositiveIntegerField(default=0)),
+                ('quality_rating_sum', models.FloatField(default=0.0)),
+                ('quality_rating_count', models.PositiveIntegerField(default=0)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_performance', to='vendors.vendor')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='vendorperformancedaily',
+            constraint=models.UniqueConstraint(fields=('vendor', 'day'), name='vendor_performance_daily_unique'),
+        ),
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0004_vendor_performance_daily'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorMetricsMarker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enqueued_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='vendors.vendor')),
+            ],
+        ),
+    ]
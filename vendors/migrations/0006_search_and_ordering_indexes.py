@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:44
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0005_vendor_metrics_marker'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['delivery_date'], name='po_delivery_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['delivered_date'], name='po_delivered_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['quality_rating'], name='po_quality_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(condition=models.Q(('delivered_date__gt', models.F('delivery_date'))), fields=['delivered_date'], name='po_late_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['name'], name='vendor_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['on_time_delivery_rate'], name='vendor_on_time_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['quality_rating_avg'], name='vendor_quality_avg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='vendor_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(django.db.models.functions.text.Lower('vendor_code'), name='vendor_code_lower_idx'),
+        ),
+    ]
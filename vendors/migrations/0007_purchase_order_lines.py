@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0006_search_and_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line_number', models.PositiveIntegerField()),
+                ('sku', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('quantity', models.IntegerField()),
+                ('unit_price', models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True)),
+                ('purchase_order', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='vendors.purchaseorder')),
+                ('vendor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='vendors.vendor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sku', 'vendor', 'purchase_order', 'quantity', 'unit_price'], name='po_line_sku_idx'), models.Index(fields=['vendor', 'sku', 'purchase_order', 'quantity', 'unit_price'], name='po_line_vendor_sku_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='purchaseorderline',
+            constraint=models.UniqueConstraint(fields=('purchase_order', 'line_number'), name='po_line_number_unique'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:55
+
+from decimal import Decimal
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def parse_line_items(items):
+    # Frozen copy of vendors.models.parse_line_items as of this migration.
+    if isinstance(items, dict):
+        items = [items]
+    if not isinstance(items, list):
+        return []
+    lines = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('sku'), str) or not item['sku'].strip():
+            continue
+        quantity = item.get('quantity', item.get('qty', 1))
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or abs(quantity) >= 2 ** 31:
+            continue
+        try:
+            unit_price = Decimal(str(item['unit_price'])).quantize(Decimal('0.0001'))
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            unit_price = None
+        if unit_price is not None and (not unit_price.is_finite() or abs(unit_price) >= 10 ** 10):
+            unit_price = None
+        lines.append({
+            'line_number': len(lines) + 1,
+            'sku': item['sku'].strip()[:100],
+            'description': str(item.get('description') or ''),
+            'quantity': quantity,
+            'unit_price': unit_price,
+        })
+    return lines
+
+
+def backfill_lines(apps, schema_editor):
+    # Keyset batches, each committed on its own so a large table is neither
+    # loaded at once nor held in one long write transaction. Each batch
+    # replaces the lines it writes, so a rerun after a failure is safe.
+    PurchaseOrder = apps.get_model('vendors', 'PurchaseOrder')
+    PurchaseOrderLine = apps.get_model('vendors', 'PurchaseOrderLine')
+    db_alias = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        orders = list(
+            PurchaseOrder.objects.using(db_alias).filter(pk__gt=last_id).order_by('pk')
+            .values('pk', 'vendor_id', 'items')[:BATCH_SIZE]
+        )
+        if not orders:
+            return
+        with transaction.atomic(using=db_alias):
+            order_ids = [order['pk'] for order in orders]
+            PurchaseOrderLine.objects.using(db_alias).filter(purchase_order__in=order_ids).delete()
+            PurchaseOrderLine.objects.using(db_alias).bulk_create([
+                PurchaseOrderLine(purchase_order_id=order['pk'], vendor_id=order['vendor_id'], **fields)
+                for order in orders
+                for fields in parse_line_items(order['items'])
+            ], batch_size=500)
+        last_id = order_ids[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('vendors', '0007_purchase_order_lines'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_lines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:58
+
+from django.db import migrations, models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.db.models.lookups import GreaterThan
+import django.db.models.deletion
+
+
+def backfill_rankings(apps, schema_editor):
+    # Frozen copy of the window-function rebuild as of this migration: each
+    # metric ranks by rate, then volume, then id; vendors without volume sort
+    # last and are left unranked.
+    Vendor = apps.get_model('vendors', 'Vendor')
+    VendorRanking = apps.get_model('vendors', 'VendorRanking')
+    db_alias = schema_editor.connection.alias
+    metrics = {
+        'on_time_rank': ('on_time_delivery_rate', 'completed_po_count'),
+        'quality_rank': ('quality_rating_avg', 'quality_rating_count'),
+    }
+    ranks = {
+        rank_field: Window(RowNumber(), order_by=[
+            GreaterThan(F(volume), 0).desc(),
+            F(metric).desc(), F(volume).desc(), F('pk').asc(),
+        ])
+        for rank_field, (metric, volume) in metrics.items()
+    }
+    rows = Vendor.objects.using(db_alias).annotate(**ranks).values(
+        'pk', 'completed_po_count', 'quality_rating_count', 'on_time_delivery_rate', 'quality_rating_avg', *ranks
+    )
+    batch = []
+    for row in rows.iterator():
+        for rank_field, (_, volume) in metrics.items():
+            if not row[volume]:
+                row[rank_field] = None
+        batch.append(VendorRanking(vendor_id=row.pop('pk'), **row))
+        if len(batch) >= 500:
+            VendorRanking.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    VendorRanking.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0008_backfill_purchase_order_lines'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorRanking',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='vendors.vendor')),
+                ('completed_po_count', models.PositiveIntegerField(default=0)),
+                ('quality_rating_count', models.PositiveIntegerField(default=0)),
+                ('on_time_delivery_rate', models.FloatField(default=0.0)),
+                ('quality_rating_avg', models.FloatField(default=0.0)),
+                ('on_time_rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('quality_rank', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['on_time_rank', 'completed_po_count'], name='ranking_on_time_idx'), models.Index(fields=['quality_rank', 'quality_rating_count'], name='ranking_quality_idx'), models.Index(fields=['on_time_delivery_rate', 'completed_po_count'], name='ranking_on_time_rate_idx'), models.Index(fields=['quality_rating_avg', 'quality_rating_count'], name='ranking_quality_avg_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rankings, migrations.RunPython.noop),
+    ]
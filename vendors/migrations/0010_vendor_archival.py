@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0009_vendor_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPurchaseOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('po_number', models.CharField(db_index=True, max_length=100)),
+                ('vendor_id', models.BigIntegerField(db_index=True)),
+                ('vendor_code', models.CharField(max_length=100)),
+                ('order_date', models.DateTimeField()),
+                ('delivery_date', models.DateTimeField()),
+                ('items', models.JSONField()),
+                ('quantity', models.IntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('canceled', 'Canceled')], max_length=20)),
+                ('quality_rating', models.FloatField(blank=True, null=True)),
+                ('issue_date', models.DateTimeField()),
+                ('delivered_date', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(condition=models.Q(('archived_at__isnull', False)), fields=['archived_at'], name='vendor_archived_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0010_vendor_archival'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryRiskScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scanned_at', models.DateTimeField()),
+                ('horizon', models.DateTimeField()),
+                ('max_purchase_order_id', models.BigIntegerField()),
+                ('overdue_count', models.PositiveIntegerField(default=0)),
+                ('due_soon_count', models.PositiveIntegerField(default=0)),
+                ('vendor_counts', models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['delivery_date', 'vendor'], name='po_pending_delivery_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+BATCH_SIZE = 1000
+
+
+def backfill_change_log(apps, schema_editor):
+    # One entry per existing row, vendors first, so a client syncing from
+    # ?since=0 receives the whole data set. Archived vendors are hidden from
+    # the API and left out.
+    ChangeLog = apps.get_model('vendors', 'ChangeLog')
+    db_alias = schema_editor.connection.alias
+    sources = (
+        ('vendor', apps.get_model('vendors', 'Vendor').objects.using(db_alias).filter(archived_at__isnull=True)),
+        ('purchase_order', apps.get_model('vendors', 'PurchaseOrder').objects.using(db_alias).all()),
+    )
+    for kind, queryset in sources:
+        last_id = 0
+        while True:
+            ids = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+            if not ids:
+                break
+            ChangeLog.objects.using(db_alias).bulk_create(
+                [ChangeLog(kind=kind, object_id=object_id) for object_id in ids], batch_size=500
+            )
+            last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0011_delivery_risk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('vendor', 'Vendor'), ('purchase_order', 'Purchase order')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'object_id', 'seq'], name='change_log_object_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_change_log, migrations.RunPython.noop),
+    ]
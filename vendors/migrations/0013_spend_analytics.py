@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:32
+
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import vendors.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0012_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code, e.g. "USD".')])),
+                ('valid_from', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=10, max_digits=20, validators=[django.core.validators.MinValueValidator(Decimal('0'))])),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SpendSummaryMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('currency', models.CharField(max_length=3)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedpurchaseorder',
+            name='currency',
+            field=models.CharField(default=vendors.models.default_currency, max_length=3),
+        ),
+        migrations.AddField(
+            model_name='archivedpurchaseorder',
+            name='total_amount',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='currency',
+            field=models.CharField(default=vendors.models.default_currency, max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code, e.g. "USD".')]),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='total_amount',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True),
+        ),
+        migrations.CreateModel(
+            name='VendorMonthlySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('delivered_order_count', models.PositiveIntegerField(default=0)),
+                ('unconverted_order_count', models.PositiveIntegerField(default=0)),
+                ('spend', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('lead_time_total', models.DurationField(blank=True, null=True)),
+                ('vendor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='vendors.vendor')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='exchangerate',
+            constraint=models.UniqueConstraint(fields=('currency', 'valid_from'), name='exchange_rate_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='vendormonthlyspend',
+            index=models.Index(fields=['month'], name='vendor_monthly_spend_month_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='vendormonthlyspend',
+            constraint=models.UniqueConstraint(fields=('vendor', 'month'), name='vendor_monthly_spend_unique'),
+        ),
+    ]
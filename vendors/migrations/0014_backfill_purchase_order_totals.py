@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:34
+
+from decimal import Decimal
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def parse_line_items(items):
+    # Frozen copy of vendors.models.parse_line_items as of this migration.
+    if isinstance(items, dict):
+        items = [items]
+    if not isinstance(items, list):
+        return []
+    lines = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('sku'), str) or not item['sku'].strip():
+            continue
+        quantity = item.get('quantity', item.get('qty', 1))
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or abs(quantity) >= 2 ** 31:
+            continue
+        try:
+            unit_price = Decimal(str(item['unit_price'])).quantize(Decimal('0.0001'))
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            unit_price = None
+        if unit_price is not None and (not unit_price.is_finite() or abs(unit_price) >= 10 ** 10):
+            unit_price = None
+        lines.append({
+            'line_number': len(lines) + 1,
+            'sku': item['sku'].strip()[:100],
+            'description': str(item.get('description') or ''),
+            'quantity': quantity,
+            'unit_price': unit_price,
+        })
+    return lines
+
+
+def order_total(lines):
+    # Frozen copy of vendors.models.order_total as of this migration.
+    prices = [line['quantity'] * line['unit_price'] for line in lines if line['unit_price'] is not None]
+    if not prices:
+        return None
+    total = sum(prices)
+    return total if abs(total) < 10 ** 16 else None
+
+
+def backfill_totals(apps, schema_editor):
+    # Keyset batches, each committed on its own, as in 0008. Existing orders
+    # keep the base currency they were given by 0013.
+    PurchaseOrder = apps.get_model('vendors', 'PurchaseOrder')
+    db_alias = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        orders = list(
+            PurchaseOrder.objects.using(db_alias).filter(pk__gt=last_id).order_by('pk').only('pk', 'items')[:BATCH_SIZE]
+        )
+        if not orders:
+            return
+        for order in orders:
+            order.total_amount = order_total(parse_line_items(order.items))
+        with transaction.atomic(using=db_alias):
+            PurchaseOrder.objects.using(db_alias).bulk_update(orders, ['total_amount'], batch_size=500)
+        last_id = orders[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('vendors', '0013_spend_analytics'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0014_backfill_purchase_order_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionLock',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0015_transaction_lock'),
+    ]
+
+    operations = [
+        # Earlier scans counted every order up to their mark, so the mark
+        # carries over with no recent ids.
+        migrations.RenameField(
+            model_name='deliveryriskscan',
+            old_name='max_purchase_order_id',
+            new_name='settled_purchase_order_id',
+        ),
+        migrations.AddField(
+            model_name='deliveryriskscan',
+            name='recent_purchase_order_ids',
+            field=models.JSONField(default=list),
+        ),
+    ]
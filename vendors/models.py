@@ -1,7 +1,119 @@
-from django.db import models
-from django.db.models import Avg
-from django.core.validators import MinValueValidator, MaxValueValidator
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import NotSupportedError, models, transaction
+from django.db.models import (
+    Case, Count, DecimalField, DurationField, Exists, F, FloatField, Max, Min, OuterRef, Q, Subquery, Sum, Value, When,
+    Window,
+)
+from django.db.models.functions import Cast, Coalesce, Lower, RowNumber, TruncDate, TruncMonth, TruncWeek
+from django.db.models.lookups import GreaterThan
+from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.utils import timezone
+from .cache import invalidate_vendor_performance
+
+METRIC_COUNTER_FIELDS = ('completed_po_count', 'on_time_po_count', 'quality_rating_sum', 'quality_rating_count')
+METRIC_RATE_FIELDS = ('on_time_delivery_rate', 'quality_rating_avg')
+
+
+def metric_counter_aggregates(prefix=''):
+    # Aggregates over purchase orders; ``prefix`` is the lookup path to the PO
+    # relation when aggregating from the vendor side.
+    completed = Q(**{f'{prefix}status': 'completed'})
+    on_time = Q(**{f'{prefix}delivered_date__lte': F(f'{prefix}delivery_date')})
+    return {
+        'completed_po_count': Count(f'{prefix}id', filter=completed),
+        'on_time_po_count': Count(f'{prefix}id', filter=completed & on_time),
+        'quality_rating_sum': Sum(f'{prefix}quality_rating', filter=completed),
+        'quality_rating_count': Count(f'{prefix}quality_rating', filter=completed),
+    }
+
+
+def performance_rates(completed_po_count, on_time_po_count, quality_rating_sum, quality_rating_count):
+    return {
+        'on_time_delivery_rate': (on_time_po_count / completed_po_count) * 100 if completed_po_count > 0 else 0.0,
+        'quality_rating_avg': quality_rating_sum / quality_rating_count if quality_rating_count > 0 else 0.0,
+    }
+
+
+def metrics_deferred():
+    return settings.VENDORS_METRICS_MODE == 'deferred'
+
+
+def apply_metric_deltas(deltas):
+    # ``deltas`` maps (vendor_id, completion day) to counter changes, as
+    # produced by PurchaseOrder.metric_deltas. Returns the ids of the vendors
+    # whose metrics changed; in deferred mode the affected vendors are queued
+    # for the metrics worker instead and none change yet.
+    vendor_deltas = {}
+    for (vendor_id, day), delta in deltas.items():
+        total = vendor_deltas.setdefault(vendor_id, dict.fromkeys(METRIC_COUNTER_FIELDS, 0))
+        for field, amount in delta.items():
+            total[field] += amount
+    if metrics_deferred():
+        VendorMetricsMarker.enqueue(vendor_id for vendor_id, delta in vendor_deltas.items() if any(delta.values()))
+        return []
+    # A change that only moves a contribution between days leaves the vendor
+    # counters alone; still lock the vendor so it serializes with rebuilds.
+    unchanged = [
+        vendor_id for (vendor_id, day), delta in deltas.items()
+        if any(delta.values()) and not any(vendor_deltas[vendor_id].values())
+    ]
+    if unchanged:
+        list(Vendor.objects.select_for_update().filter(pk__in=unchanged).order_by('pk').values_list('pk'))
+    changed = Vendor.apply_metric_deltas(vendor_deltas)
+    VendorPerformanceDaily.apply_metric_deltas(deltas)
+    return changed
+
+
+def advisory_xact_lock(lock_id):
+    # Serializes writers on ``lock_id`` until the transaction ends. SQLite
+    # writers are already serialized (BEGIN IMMEDIATE); PostgreSQL takes a
+    # transaction-scoped advisory lock. MySQL has no transaction-scoped
+    # advisory lock (GET_LOCK outlives a rollback), so it locks the id's
+    # TransactionLock row instead.
+    connection = transaction.get_connection()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [lock_id])
+    elif connection.vendor == 'mysql':
+        locks = TransactionLock.objects.using(connection.alias)
+        locks.get_or_create(pk=lock_id)
+        list(locks.select_for_update().filter(pk=lock_id).values_list('pk', flat=True))
+    elif connection.vendor != 'sqlite':
+        raise NotSupportedError(f'advisory_xact_lock() cannot lock on {connection.vendor}.')
+
+
+class TransactionLock(models.Model):
+    # One row per advisory_xact_lock() id on backends that lock rows instead.
+    id = models.PositiveIntegerField(primary_key=True)
+
+    def __str__(self):
+        return f'{self.pk:#x}'
+
+
+def metric_rate_expressions(completed, on_time, quality_sum, quality_count):
+    return {
+        'on_time_delivery_rate': Case(
+            When(GreaterThan(completed, 0), then=Cast(on_time, FloatField()) / completed * 100),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        'quality_rating_avg': Case(
+            When(GreaterThan(quality_count, 0), then=quality_sum / quality_count),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    }
+
+
+def default_currency():
+    return settings.VENDORS_BASE_CURRENCY
+
+
+currency_code_validator = RegexValidator(r'^[A-Z]{3}\Z', 'Enter a three-letter ISO 4217 currency code, e.g. "USD".')
+
 
 class Vendor(models.Model):
     name = models.CharField(max_length=255)
@@ -10,25 +122,189 @@ class Vendor(models.Model):
     vendor_code = models.CharField(max_length=100, unique=True)
     on_time_delivery_rate = models.FloatField(default=0.0)
     quality_rating_avg = models.FloatField(default=0.0)
+    completed_po_count = models.PositiveIntegerField(default=0)
+    on_time_po_count = models.PositiveIntegerField(default=0)
+    quality_rating_sum = models.FloatField(default=0.0)
+    quality_rating_count = models.PositiveIntegerField(default=0)
+    # Archived vendors are hidden from the API until
+    # `python manage.py purge_archived_vendors` moves their purchase orders to
+    # ArchivedPurchaseOrder and deletes them.
+    archived_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Serve ?ordering= and the score range filters on the vendor list,
+            # and the case-insensitive prefix ?search=.
+            models.Index(fields=['name'], name='vendor_name_idx'),
+            models.Index(fields=['on_time_delivery_rate'], name='vendor_on_time_rate_idx'),
+            models.Index(fields=['quality_rating_avg'], name='vendor_quality_avg_idx'),
+            models.Index(Lower('name'), name='vendor_name_lower_idx'),
+            models.Index(Lower('vendor_code'), name='vendor_code_lower_idx'),
+            # Only archived vendors, for purge_archived_vendors; a handful of rows.
+            models.Index(fields=['archived_at'], condition=Q(archived_at__isnull=False), name='vendor_archived_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Metric columns change through atomic increments and locked
+        # rebuilds only; saving a loaded vendor must not write back its
+        # possibly stale copy of them.
+        if not self._state.adding and not args and not kwargs.get('force_insert'):
+            kwargs.setdefault('update_fields', self.profile_fields())
+        if kwargs.get('update_fields'):
+            # auto_now only applies to the fields being written.
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            ChangeLog.record(vendors=[self.pk])
+        invalidate_vendor_performance([self.pk])
+
+    def delete(self, *args, **kwargs):
+        vendor_id = self.pk
+        with transaction.atomic():
+            # The cascade bypasses PurchaseOrder.delete; tombstone its orders.
+            order_ids = list(PurchaseOrder.objects.filter(vendor_id=vendor_id).values_list('pk', flat=True))
+            VendorRanking.withdraw([vendor_id])
+            result = super().delete(*args, **kwargs)
+            ChangeLog.record(deleted_vendors=[vendor_id], deleted_purchase_orders=order_ids)
+        invalidate_vendor_performance([vendor_id])
+        return result
+
+    @classmethod
+    def profile_fields(cls):
+        metric_fields = METRIC_COUNTER_FIELDS + METRIC_RATE_FIELDS
+        return [
+            field.name for field in cls._meta.concrete_fields
+            if not field.primary_key and field.name not in metric_fields and field.name != 'archived_at'
+        ]
+
+    def has_large_history(self):
+        # Whether deleting would cascade over more purchase orders than one
+        # purge batch; such vendors are archived and purged instead.
+        limit = settings.VENDORS_PURGE_BATCH_SIZE
+        return PurchaseOrder.objects.filter(vendor_id=self.pk).values('pk')[limit:limit + 1].exists()
+
+    def archive(self):
+        self.archived_at = timezone.now()
+        self._set_archived_at()
+
+    def restore(self):
+        self.archived_at = None
+        self._set_archived_at()
+
+    def _set_archived_at(self):
+        self.updated_at = timezone.now()
+        with transaction.atomic():
+            Vendor.objects.filter(pk=self.pk).update(archived_at=self.archived_at, updated_at=self.updated_at)
+            ChangeLog.record(vendors=[self.pk])
+        # Archived vendors are unranked (VendorRanking.refresh skips them).
+        VendorRanking.schedule_refresh([self.pk])
+        invalidate_vendor_performance([self.pk])
+
+    def set_performance_rates(self):
+        counters = {field: getattr(self, field) for field in METRIC_COUNTER_FIELDS}
+        for field, value in performance_rates(**counters).items():
+            setattr(self, field, value)
+
     def update_performance_metrics(self):
-        completed_pos = self.purchaseorder_set.filter(status='completed')
-        total_completed = completed_pos.count()
+        # Locking the vendor row first makes concurrent purchase order writes
+        # for this vendor wait, so the aggregate cannot miss their changes.
+        with transaction.atomic():
+            list(Vendor.objects.select_for_update().filter(pk=self.pk).values_list('pk'))
+            completed_pos = self.purchaseorder_set.filter(status='completed')
+            counters = completed_pos.aggregate(**metric_counter_aggregates())
+            for field, value in counters.items():
+                setattr(self, field, value or 0)
+            self.set_performance_rates()
+            self.save(update_fields=METRIC_COUNTER_FIELDS + METRIC_RATE_FIELDS + ('updated_at',))
+            VendorRanking.schedule_refresh([self.pk])
 
-        if total_completed > 0:
-            on_time = completed_pos.filter(delivered_date__lte=models.F('delivery_date')).count()
-            self.on_time_delivery_rate = (on_time / total_completed) * 100
+    @classmethod
+    def apply_metric_deltas(cls, deltas):
+        # Rates are assigned before the counters so every backend (including
+        # MySQL, which evaluates SET left to right) derives them from the
+        # pre-update counters plus the delta. Returns the changed vendor ids;
+        # the caller records them in the ChangeLog with its own changes.
+        changed = []
+        now = timezone.now()
+        # Ascending ids, so writers touching several vendors lock them in the
+        # same order.
+        for vendor_id, delta in sorted(deltas.items()):
+            if not any(delta.values()):
+                continue
+            counters = {field: F(field) + delta[field] for field in METRIC_COUNTER_FIELDS}
+            updates = metric_rate_expressions(
+                counters['completed_po_count'],
+                counters['on_time_po_count'],
+                counters['quality_rating_sum'],
+                counters['quality_rating_count'],
+            )
+            updates.update(counters, updated_at=now)
+            cls.objects.filter(pk=vendor_id).update(**updates)
+            changed.append(vendor_id)
+        VendorRanking.schedule_refresh(changed)
+        invalidate_vendor_performance(changed)
+        return changed
 
-            average_quality = completed_pos.aggregate(avg_quality=Avg('quality_rating'))['avg_quality'] or 0.0
-            self.quality_rating_avg = average_quality
+    @classmethod
+    def refresh_performance_metrics(cls, vendor_ids):
+        # Recompute now, or leave it to the metrics worker in deferred mode.
+        if metrics_deferred():
+            VendorMetricsMarker.enqueue(vendor_ids)
         else:
-            self.on_time_delivery_rate = 0.0
-            self.quality_rating_avg = 0.0
+            cls.rebuild_performance_metrics(cls.objects.filter(pk__in=vendor_ids))
+
+    @classmethod
+    def rebuild_performance_metrics(cls, queryset=None, batch_size=500):
+        """
+        Recompute counters, rates and daily rollups from the purchase orders,
+        one transaction per ``batch_size`` vendors. Each batch locks its
+        vendor rows before aggregating, so purchase order writes for those
+        vendors wait for it instead of being overwritten by it.
+        """
+        vendors = (cls.objects.all() if queryset is None else queryset).order_by('pk')
+        aggregates = metric_counter_aggregates(prefix='purchaseorder__')
+        rebuilt = []
+        last_pk = None
+        while True:
+            page = vendors if last_pk is None else vendors.filter(pk__gt=last_pk)
+            vendor_ids = list(page.values_list('pk', flat=True)[:batch_size])
+            if not vendor_ids:
+                break
+            last_pk = vendor_ids[-1]
+            with transaction.atomic():
+                list(cls.objects.select_for_update().filter(pk__in=vendor_ids).order_by('pk').values_list('pk'))
+                batch = list(cls.objects.filter(pk__in=vendor_ids).annotate(
+                    **{f'rebuilt_{field}': aggregate for field, aggregate in aggregates.items()}
+                ))
+                changed = []
+                for vendor in batch:
+                    stored = [getattr(vendor, field) for field in METRIC_COUNTER_FIELDS + METRIC_RATE_FIELDS]
+                    for field in METRIC_COUNTER_FIELDS:
+                        setattr(vendor, field, getattr(vendor, f'rebuilt_{field}') or 0)
+                    vendor.set_performance_rates()
+                    if [getattr(vendor, field) for field in METRIC_COUNTER_FIELDS + METRIC_RATE_FIELDS] != stored:
+                        changed.append(vendor)
+                cls._save_rebuilt_metrics(changed)
+                VendorPerformanceDaily.rebuild(cls.objects.filter(pk__in=vendor_ids), batch_size=batch_size)
+            rebuilt.extend(vendor_ids)
+            if len(vendor_ids) < batch_size:
+                break
+        # Once for the whole run: a large rebuild re-ranks every vendor.
+        VendorRanking.schedule_refresh(rebuilt)
+        return len(rebuilt)
 
-        self.save()
+    @classmethod
+    def _save_rebuilt_metrics(cls, vendors):
+        now = timezone.now()
+        for vendor in vendors:
+            vendor.updated_at = now
+        cls.objects.bulk_update(vendors, METRIC_COUNTER_FIELDS + METRIC_RATE_FIELDS + ('updated_at',))
+        ChangeLog.record(vendors=[vendor.pk for vendor in vendors])
+        invalidate_vendor_performance([vendor.pk for vendor in vendors])
 
 
 class PurchaseOrder(models.Model):
@@ -37,6 +313,14 @@ class PurchaseOrder(models.Model):
         ('completed', 'Completed'),
         ('canceled', 'Canceled'),
     ]
+    # Status changes accepted by the bulk transition action. Completing a
+    # completed order again amends its delivery date or rating.
+    STATUS_TRANSITIONS = {
+        'pending': ('completed', 'canceled'),
+        'completed': ('completed',),
+        'canceled': (),
+    }
+    METRIC_SOURCE_FIELDS = ('vendor_id', 'status', 'delivery_date', 'delivered_date', 'quality_rating')
 
     po_number = models.CharField(max_length=100, unique=True)
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE)
@@ -52,10 +336,1111 @@ class PurchaseOrder(models.Model):
     )
     issue_date = models.DateTimeField(default=timezone.now)
     delivered_date = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Currency of the unit prices in items; total_amount is the sum of
+    # quantity x unit_price over the priced lines, kept in sync on save.
+    currency = models.CharField(max_length=3, default=default_currency, validators=[currency_code_validator])
+    total_amount = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Covers the per-vendor status filters and the on-time comparison in
+            # the metric aggregates; its (vendor, status) prefix serves status
+            # filtered lookups for a vendor.
+            models.Index(
+                fields=['vendor', 'status', 'delivered_date', 'delivery_date', 'quality_rating'],
+                name='po_vendor_metrics_idx',
+            ),
+            models.Index(fields=['order_date'], name='po_order_date_idx'),
+            models.Index(fields=['issue_date'], name='po_issue_date_idx'),
+            models.Index(fields=['delivery_date'], name='po_delivery_date_idx'),
+            models.Index(fields=['delivered_date'], name='po_delivered_date_idx'),
+            models.Index(fields=['quality_rating'], name='po_quality_rating_idx'),
+            # Only late deliveries, for ?late=true; a small fraction of rows.
+            models.Index(
+                fields=['delivered_date'],
+                condition=Q(delivered_date__gt=F('delivery_date')),
+                name='po_late_idx',
+            ),
+            # Only open orders, for the overdue and due-soon counts; covers the
+            # per-vendor grouping.
+            models.Index(
+                fields=['delivery_date', 'vendor'],
+                condition=Q(status='pending'),
+                name='po_pending_delivery_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.po_number
 
+    @staticmethod
+    def completion_day(delivery_date, delivered_date):
+        # Completed POs are rolled up on the day they were delivered, falling
+        # back to the promised date when no delivery date was recorded.
+        return timezone.localdate(delivered_date or delivery_date)
+
+    @staticmethod
+    def completion_day_expression():
+        return TruncDate(Coalesce('delivered_date', 'delivery_date'))
+
+    @staticmethod
+    def metric_contribution(vendor_id, status, delivery_date, delivered_date, quality_rating):
+        contribution = dict.fromkeys(METRIC_COUNTER_FIELDS, 0)
+        if status == 'completed':
+            contribution['completed_po_count'] = 1
+            contribution['on_time_po_count'] = int(
+                delivered_date is not None and delivered_date <= delivery_date
+            )
+            if quality_rating is not None:
+                contribution['quality_rating_sum'] = quality_rating
+                contribution['quality_rating_count'] = 1
+        return contribution
+
+    @classmethod
+    def metric_deltas(cls, old_values, new_values):
+        deltas = {}
+        for values, sign in ((old_values, -1), (new_values, 1)):
+            if values is None or values['status'] != 'completed':
+                continue
+            key = (values['vendor_id'], cls.completion_day(values['delivery_date'], values['delivered_date']))
+            delta = deltas.setdefault(key, dict.fromkeys(METRIC_COUNTER_FIELDS, 0))
+            for field, amount in cls.metric_contribution(**values).items():
+                delta[field] += sign * amount
+        return deltas
+
+    @classmethod
+    def at_risk_counts(cls, now, horizon, queryset=None):
+        """
+        Per-vendor counts of pending orders due before ``horizon``: overdue
+        (due before ``now``) and due soon. Reads the po_pending_delivery_idx
+        range only, whatever the size of the table.
+        """
+        queryset = cls.objects.all() if queryset is None else queryset
+        return (
+            queryset.filter(status='pending', delivery_date__lt=horizon)
+            .values('vendor')
+            .annotate(
+                overdue=Count('delivery_date', filter=Q(delivery_date__lt=now)),
+                due_soon=Count('delivery_date', filter=Q(delivery_date__gte=now)),
+            )
+            .order_by('vendor')
+        )
+
+    def _metric_values(self):
+        return {field: getattr(self, field) for field in self.METRIC_SOURCE_FIELDS}
+
+    def _stored_metric_values(self, *extra_fields):
+        if self._state.adding or self.pk is None:
+            return None
+        return (
+            PurchaseOrder.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values(*self.METRIC_SOURCE_FIELDS, *extra_fields)
+            .first()
+        )
+
+    def _sync_lines(self, previous, previous_lines, lines):
+        # Lines mirror the parsed items and carry the vendor; they are only
+        # rewritten when one of those changed.
+        vendor_changed = (
+            previous is not None and 'vendor_id' not in self.get_deferred_fields()
+            and previous['vendor_id'] != self.vendor_id
+        )
+        if lines != previous_lines or (vendor_changed and lines):
+            PurchaseOrderLine.sync([self], replace=bool(previous_lines))
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.vendor.update_performance_metrics()
\ No newline at end of file
+        with transaction.atomic():
+            previous = self._stored_metric_values('items', 'order_date')
+            previous_lines = parse_line_items(previous.pop('items')) if previous else []
+            previous_order_date = previous.pop('order_date') if previous else None
+            deferred = self.get_deferred_fields()
+            lines = previous_lines if 'items' in deferred else parse_line_items(self.items)
+            self.total_amount = order_total(lines)
+            update_fields = kwargs.get('update_fields')
+            if update_fields:
+                derived = {'updated_at', 'total_amount'} if 'items' in update_fields else {'updated_at'}
+                kwargs['update_fields'] = {*update_fields, *derived}
+            super().save(*args, **kwargs)
+            vendor_ids = apply_metric_deltas(self.metric_deltas(previous, self._metric_values()))
+            self._sync_lines(previous, previous_lines, lines)
+            VendorMonthlySpend.invalidate([previous_order_date, None if 'order_date' in deferred else self.order_date])
+            ChangeLog.record(vendors=vendor_ids, purchase_orders=[self.pk])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self._stored_metric_values('order_date')
+            previous_order_date = previous.pop('order_date') if previous else None
+            purchase_order_id = self.pk
+            result = super().delete(*args, **kwargs)
+            vendor_ids = apply_metric_deltas(self.metric_deltas(previous, None))
+            VendorMonthlySpend.invalidate([previous_order_date])
+            ChangeLog.record(vendors=vendor_ids, deleted_purchase_orders=[purchase_order_id])
+        return result
+
+
+def parse_line_items(items):
+    """
+    Line fields from a purchase order's ``items`` JSON: a list of objects
+    with a ``sku`` and optional ``description``, ``quantity`` (or ``qty``,
+    default 1) and ``unit_price``. Entries without a usable sku or quantity
+    are skipped, so free-form items produce no lines.
+    """
+    if isinstance(items, dict):
+        items = [items]
+    if not isinstance(items, list):
+        return []
+    lines = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('sku'), str) or not item['sku'].strip():
+            continue
+        quantity = item.get('quantity', item.get('qty', 1))
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or abs(quantity) >= 2 ** 31:
+            continue
+        try:
+            unit_price = Decimal(str(item['unit_price'])).quantize(Decimal('0.0001'))
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            unit_price = None
+        if unit_price is not None and (not unit_price.is_finite() or abs(unit_price) >= 10 ** 10):
+            unit_price = None
+        lines.append({
+            'line_number': len(lines) + 1,
+            'sku': item['sku'].strip()[:100],
+            'description': str(item.get('description') or ''),
+            'quantity': quantity,
+            'unit_price': unit_price,
+        })
+    return lines
+
+
+def order_total(lines):
+    # quantity x unit_price summed over the priced lines of parse_line_items();
+    # None when no line has a price or the total does not fit total_amount.
+    prices = [line['quantity'] * line['unit_price'] for line in lines if line['unit_price'] is not None]
+    if not prices:
+        return None
+    total = sum(prices)
+    return total if abs(total) < 10 ** 16 else None
+
+
+class PurchaseOrderLine(models.Model):
+    # Relational copy of PurchaseOrder.items, kept in sync on every write
+    # while clients still send items; spend and quantity reports aggregate
+    # it in SQL. vendor is denormalized so per-vendor reports skip the join.
+    # Both foreign keys are served by the leading columns of the indexes below.
+    purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='lines', db_index=False)
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='+', db_index=False)
+    line_number = models.PositiveIntegerField()
+    sku = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    quantity = models.IntegerField()
+    unit_price = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['purchase_order', 'line_number'], name='po_line_number_unique'),
+        ]
+        indexes = [
+            # Covering indexes for the SKU and vendor spend/quantity reports.
+            models.Index(fields=['sku', 'vendor', 'purchase_order', 'quantity', 'unit_price'], name='po_line_sku_idx'),
+            models.Index(
+                fields=['vendor', 'sku', 'purchase_order', 'quantity', 'unit_price'], name='po_line_vendor_sku_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.purchase_order_id} #{self.line_number} {self.sku}'
+
+    @classmethod
+    def sync(cls, orders, replace=True, batch_size=500):
+        """
+        Write the lines of the given saved purchase orders from their items,
+        first deleting their existing lines unless ``replace`` is false (new
+        orders).
+        """
+        orders = list(orders)
+        if replace:
+            order_ids = [order.pk for order in orders]
+            # Chunked to stay under the backend's bound-parameter limit.
+            for start in range(0, len(order_ids), 500):
+                cls.objects.filter(purchase_order__in=order_ids[start:start + 500]).delete()
+        cls.objects.bulk_create([
+            cls(purchase_order_id=order.pk, vendor_id=order.vendor_id, **fields)
+            for order in orders
+            for fields in parse_line_items(order.items)
+        ], batch_size=batch_size)
+
+    @classmethod
+    def summarize(cls, group_by, lines=None):
+        """Quantity and spend per ``group_by`` columns, largest spend first."""
+        lines = cls.objects.all() if lines is None else lines
+        return (
+            lines.values(*group_by)
+            .annotate(
+                line_count=Count('id'),
+                purchase_order_count=Count('purchase_order', distinct=True),
+                total_quantity=Sum('quantity'),
+                spend=Sum(F('quantity') * F('unit_price'), output_field=models.DecimalField(max_digits=20, decimal_places=4)),
+            )
+            .order_by(F('spend').desc(nulls_last=True), *group_by)
+        )
+
+
+class ArchivedPurchaseOrder(models.Model):
+    """
+    Purchase orders of purged vendors, moved out of the live table and its
+    indexes by purge_archived_vendors. Rows keep their original id; the
+    vendor is kept as a plain id and code since the vendor row is deleted.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    po_number = models.CharField(max_length=100, db_index=True)
+    vendor_id = models.BigIntegerField(db_index=True)
+    vendor_code = models.CharField(max_length=100)
+    order_date = models.DateTimeField()
+    delivery_date = models.DateTimeField()
+    items = models.JSONField()
+    quantity = models.IntegerField()
+    status = models.CharField(max_length=20, choices=PurchaseOrder.STATUS_CHOICES)
+    quality_rating = models.FloatField(null=True, blank=True)
+    issue_date = models.DateTimeField()
+    delivered_date = models.DateTimeField(null=True, blank=True)
+    currency = models.CharField(max_length=3, default=default_currency)
+    total_amount = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.po_number
+
+    @classmethod
+    def archive_orders(cls, vendor, batch_size=500):
+        """
+        Move up to ``batch_size`` of an archived vendor's purchase orders (and
+        drop their lines) in one transaction. Returns the number moved, or
+        None when the vendor is gone or no longer archived.
+        """
+        archived_columns = {field.attname for field in cls._meta.concrete_fields}
+        columns = [field.attname for field in PurchaseOrder._meta.concrete_fields if field.attname in archived_columns]
+        with transaction.atomic():
+            if not Vendor.objects.select_for_update().filter(pk=vendor.pk, archived_at__isnull=False).exists():
+                return None
+            rows = list(
+                PurchaseOrder.objects.select_for_update().filter(vendor_id=vendor.pk)
+                .order_by('pk').values(*columns)[:batch_size]
+            )
+            ids = [row['id'] for row in rows]
+            cls.objects.bulk_create([cls(vendor_code=vendor.vendor_code, **row) for row in rows])
+            PurchaseOrderLine.objects.filter(purchase_order_id__in=ids).delete()
+            PurchaseOrder.objects.filter(pk__in=ids).delete()
+            VendorMonthlySpend.invalidate(row['order_date'] for row in rows)
+            ChangeLog.record(deleted_purchase_orders=ids)
+        return len(ids)
+
+    @classmethod
+    def purge_vendor(cls, vendor, batch_size=500, progress=None):
+        """
+        Archive all of an archived vendor's purchase orders batch by batch,
+        calling ``progress(moved)`` after each, then delete the vendor.
+        Returns the number of orders moved, or None if the vendor was restored
+        (or deleted) meanwhile.
+        """
+        moved = 0
+        while True:
+            count = cls.archive_orders(vendor, batch_size)
+            if count is None:
+                return None
+            if not count:
+                break
+            moved += count
+            if progress is not None:
+                progress(moved)
+        with transaction.atomic():
+            locked = Vendor.objects.select_for_update().filter(pk=vendor.pk, archived_at__isnull=False).first()
+            if locked is None:
+                return None
+            # Orders written after the last batch are few; the cascade takes them.
+            locked.delete()
+        return moved
+
+
+class DeliveryRiskScan(models.Model):
+    """
+    One run of scan_delivery_risk. The latest run is the high-water mark the
+    next one starts from: orders that existed then (id up to
+    ``settled_purchase_order_id``, or listed in ``recent_purchase_order_ids``)
+    only need their delivery dates checked in the window that opened since,
+    and other orders are read by id.
+
+    Ids are allocated before commit, so an order can become visible after a
+    higher id was scanned. The mark therefore stays
+    ``VENDORS_AT_RISK_SCAN_OVERLAP`` ids below the highest id seen, and the
+    pending orders above it that a run counted are recorded so the next run
+    does not count them again.
+    """
+    scanned_at = models.DateTimeField()
+    horizon = models.DateTimeField()
+    settled_purchase_order_id = models.BigIntegerField()
+    recent_purchase_order_ids = models.JSONField(default=list)
+    overdue_count = models.PositiveIntegerField(default=0)
+    due_soon_count = models.PositiveIntegerField(default=0)
+    # {vendor id: {"overdue": n, "due_soon": n}} for the orders newly flagged.
+    vendor_counts = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f'{self.scanned_at}: {self.overdue_count} overdue, {self.due_soon_count} due soon'
+
+    @classmethod
+    def run(cls, window, now=None):
+        """
+        Count the pending orders that became overdue, or due within
+        ``window``, since the previous run, per vendor, and record the run.
+        The first run counts every pending order due within the window.
+        """
+        now = now or timezone.now()
+        horizon = now + window
+        with transaction.atomic():
+            previous = cls.objects.select_for_update().order_by('-pk').first()
+            max_id = PurchaseOrder.objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+            pending = PurchaseOrder.objects.filter(status='pending')
+            if previous is None:
+                since = max(max_id - settings.VENDORS_AT_RISK_SCAN_OVERLAP, 0)
+                seen = set()
+                known = pending.filter(pk__lte=since)
+            else:
+                since = previous.settled_purchase_order_id
+                seen = set(previous.recent_purchase_order_ids)
+                # Orders seen last time: overdue since then, or newly inside
+                # the window; both are delivery_date ranges on the partial index.
+                known = pending.filter(
+                    Q(pk__lte=since) | Q(pk__in=seen),
+                    delivery_date__gte=previous.scanned_at,
+                    delivery_date__lt=horizon,
+                ).exclude(delivery_date__gte=now, delivery_date__lt=previous.horizon)
+            settled = max(since, max_id - settings.VENDORS_AT_RISK_SCAN_OVERLAP)
+
+            vendor_counts = {}
+
+            def add(vendor_id, overdue, due_soon):
+                counts = vendor_counts.setdefault(str(vendor_id), {'overdue': 0, 'due_soon': 0})
+                counts['overdue'] += overdue
+                counts['due_soon'] += due_soon
+
+            for row in PurchaseOrder.at_risk_counts(now, horizon, known):
+                add(row['vendor'], row['overdue'], row['due_soon'])
+            # Orders above the mark: new since the previous run, or within the
+            # overlap. One read, so the counted and recorded ids agree.
+            recent = []
+            created = pending.filter(pk__gt=since).order_by('pk').values_list('pk', 'vendor_id', 'delivery_date')
+            for pk, vendor_id, delivery_date in created:
+                if pk > settled:
+                    recent.append(pk)
+                if pk not in seen and delivery_date < horizon:
+                    add(vendor_id, int(delivery_date < now), int(delivery_date >= now))
+            return cls.objects.create(
+                scanned_at=now,
+                horizon=horizon,
+                settled_purchase_order_id=settled,
+                recent_purchase_order_ids=recent,
+                overdue_count=sum(counts['overdue'] for counts in vendor_counts.values()),
+                due_soon_count=sum(counts['due_soon'] for counts in vendor_counts.values()),
+                vendor_counts=vendor_counts,
+            )
+
+
+class VendorPerformanceDaily(models.Model):
+    # Per vendor, per completion day counters, maintained incrementally
+    # alongside the vendor's lifetime counters so windowed metrics are sums
+    # over at most one row per day.
+    INTERVALS = {
+        'day': F('day'),
+        'week': TruncWeek('day'),
+        'month': TruncMonth('day'),
+    }
+
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='daily_performance')
+    day = models.DateField()
+    completed_po_count = models.PositiveIntegerField(default=0)
+    on_time_po_count = models.PositiveIntegerField(default=0)
+    quality_rating_sum = models.FloatField(default=0.0)
+    quality_rating_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['vendor', 'day'], name='vendor_performance_daily_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.vendor_id} @ {self.day}'
+
+    @classmethod
+    def apply_metric_deltas(cls, deltas):
+        for (vendor_id, day), delta in sorted(deltas.items()):
+            if not any(delta.values()):
+                continue
+            cls.objects.bulk_create([cls(vendor_id=vendor_id, day=day)], ignore_conflicts=True)
+            rollup = cls.objects.filter(vendor_id=vendor_id, day=day)
+            rollup.update(**{field: F(field) + delta[field] for field in METRIC_COUNTER_FIELDS})
+            if delta['completed_po_count'] < 0:
+                # The day's last completion moved away; drop the empty row
+                # rather than report a period with no orders.
+                rollup.filter(completed_po_count=0).delete()
+
+    @classmethod
+    def rebuild(cls, vendors, batch_size=500):
+        vendor_ids = vendors.values('pk')
+        cls.objects.filter(vendor__in=vendor_ids).delete()
+        rollups = (
+            PurchaseOrder.objects.filter(vendor__in=vendor_ids, status='completed')
+            .annotate(day=PurchaseOrder.completion_day_expression())
+            .values('vendor_id', 'day')
+            .annotate(**metric_counter_aggregates())
+            .order_by()
+        )
+        batch = []
+        for row in rollups.iterator(chunk_size=batch_size):
+            counters = {field: row[field] or 0 for field in METRIC_COUNTER_FIELDS}
+            batch.append(cls(vendor_id=row['vendor_id'], day=row['day'], **counters))
+            if len(batch) >= batch_size:
+                cls.objects.bulk_create(batch)
+                batch = []
+        cls.objects.bulk_create(batch)
+
+    @classmethod
+    def summarize(cls, vendor_id, start=None, end=None, interval=None):
+        rollups = cls.objects.filter(vendor_id=vendor_id)
+        if start is not None:
+            rollups = rollups.filter(day__gte=start)
+        if end is not None:
+            rollups = rollups.filter(day__lte=end)
+        sums = {field: Sum(field) for field in METRIC_COUNTER_FIELDS}
+
+        totals = {field: value or 0 for field, value in rollups.aggregate(**sums).items()}
+        summary = {'from': start, 'to': end, 'completed_po_count': totals['completed_po_count']}
+        summary.update(performance_rates(**totals))
+
+        if interval is not None:
+            periods = rollups.annotate(period=cls.INTERVALS[interval]).values('period').annotate(**sums)
+            summary['series'] = [
+                {
+                    'period': period['period'],
+                    'completed_po_count': period['completed_po_count'],
+                    **performance_rates(**{field: period[field] or 0 for field in METRIC_COUNTER_FIELDS}),
+                }
+                for period in periods.order_by('period')
+            ]
+        return summary
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    month_index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def month_of(value):
+    # First day of the month of a datetime, in the current time zone.
+    return month_start(timezone.localdate(value) if timezone.is_aware(value) else value.date())
+
+
+def month_bounds(month):
+    # [start, end) datetimes of a month, for order_date range filters.
+    start = datetime.datetime.combine(month, datetime.time.min)
+    end = datetime.datetime.combine(add_months(month, 1), datetime.time.min)
+    if settings.USE_TZ:
+        start, end = timezone.make_aware(start), timezone.make_aware(end)
+    return start, end
+
+
+class ExchangeRate(models.Model):
+    """
+    Local FX table: ``rate`` units of the base currency
+    (settings.VENDORS_BASE_CURRENCY) per unit of ``currency``, from
+    ``valid_from`` until the currency's next rate. Spend analytics convert
+    each order at the rate in force on its order date. Saving or deleting a
+    rate drops the cached spend months it affects; queryset updates and
+    deletes bypass that, so refresh_spend_summary --rebuild after them.
+    """
+    currency = models.CharField(max_length=3, validators=[currency_code_validator])
+    valid_from = models.DateField()
+    rate = models.DecimalField(max_digits=20, decimal_places=10, validators=[MinValueValidator(Decimal(0))])
+
+    class Meta:
+        constraints = [
+            # Serves the latest-rate-on-or-before lookup per order.
+            models.UniqueConstraint(fields=['currency', 'valid_from'], name='exchange_rate_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.currency} @ {self.valid_from}: {self.rate}'
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk is not None:
+                previous = ExchangeRate.objects.filter(pk=self.pk).values_list('valid_from', flat=True).first()
+            super().save(*args, **kwargs)
+            VendorMonthlySpend.invalidate(since=min(filter(None, [previous, self.valid_from])))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            VendorMonthlySpend.invalidate(since=self.valid_from)
+        return result
+
+    @classmethod
+    def rate_expression(cls):
+        """
+        The rate converting an order's total_amount to the base currency: 1
+        for orders in the base currency, else the latest rate on or before
+        its order day, or NULL when the table has none. Expects the orders
+        to be annotated with ``order_day``.
+        """
+        latest = (
+            cls.objects.filter(currency=OuterRef('currency'), valid_from__lte=OuterRef('order_day'))
+            .order_by('-valid_from')
+            .values('rate')[:1]
+        )
+        return Case(
+            When(currency=settings.VENDORS_BASE_CURRENCY, then=Value(Decimal(1))),
+            default=Subquery(latest),
+            output_field=DecimalField(max_digits=20, decimal_places=10),
+        )
+
+
+SPEND_SUMMARY_LOCK_ID = 0x5350454e
+SPEND_SUM_FIELDS = ('order_count', 'delivered_order_count', 'unconverted_order_count', 'spend', 'lead_time_total')
+SPEND_GROUP_BY = ('vendor', 'month')
+SPEND_ORDERING = ('month', 'vendor')
+
+
+class SpendSummaryMonth(models.Model):
+    # A month whose VendorMonthlySpend rows are complete, in ``currency``
+    # (the base currency when they were computed).
+    month = models.DateField(unique=True)
+    currency = models.CharField(max_length=3)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.month:%Y-%m} ({self.currency})'
+
+
+class VendorMonthlySpend(models.Model):
+    """
+    Cached spend analytics for closed months, one row per vendor with orders
+    in the month, written by refresh_spend_summary. A month is only read from
+    here when it has a SpendSummaryMonth; any write to one of its orders (or
+    to an exchange rate in force during it) drops both, and the month is
+    aggregated from purchase orders again until the next refresh. The current
+    month is never cached, so ordinary writes cost nothing.
+    """
+    # Reads are served by the unique (vendor, month) and the month index.
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='+', db_index=False)
+    month = models.DateField()
+    order_count = models.PositiveIntegerField(default=0)
+    delivered_order_count = models.PositiveIntegerField(default=0)
+    unconverted_order_count = models.PositiveIntegerField(default=0)
+    spend = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    lead_time_total = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['vendor', 'month'], name='vendor_monthly_spend_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['month'], name='vendor_monthly_spend_month_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.vendor_id} @ {self.month:%Y-%m}'
+
+    @staticmethod
+    def aggregate_orders(orders, group_by):
+        """
+        Spend (converted to the base currency), order counts and the summed
+        lead time (delivered_date - order_date) of ``orders`` per
+        ``group_by`` columns, in one SQL query. Canceled orders are left out;
+        priced orders in a currency without a rate count as unconverted and
+        add no spend.
+        """
+        return (
+            orders.exclude(status='canceled')
+            .annotate(
+                month=TruncMonth('order_date', output_field=models.DateField()),
+                order_day=TruncDate('order_date'),
+            )
+            .annotate(fx_rate=ExchangeRate.rate_expression())
+            .values(*group_by)
+            .annotate(
+                order_count=Count('id'),
+                delivered_order_count=Count('delivered_date'),
+                unconverted_order_count=Count('id', filter=Q(total_amount__isnull=False, fx_rate__isnull=True)),
+                spend=Sum(F('total_amount') * F('fx_rate'), output_field=DecimalField(max_digits=20, decimal_places=4)),
+                lead_time_total=Sum(F('delivered_date') - F('order_date'), output_field=DurationField()),
+            )
+            .order_by()
+        )
+
+    @classmethod
+    def closed_before(cls):
+        # Months before this one are complete and may be cached.
+        return month_start(timezone.localdate())
+
+    @classmethod
+    def invalidate(cls, dates=(), since=None):
+        """
+        Drop the cached months holding any of the order ``dates``, or every
+        cached month from the one holding ``since`` (a date) on. Touches the
+        database only when one of them is a closed month.
+        """
+        closed_before = cls.closed_before()
+        if since is not None:
+            since = month_start(since)
+            if since >= closed_before:
+                return
+            months = Q(month__gte=since)
+        else:
+            affected = {month_of(value) for value in dates if value is not None}
+            affected = sorted(month for month in affected if month < closed_before)
+            if not affected:
+                return
+            months = Q(month__in=affected)
+        advisory_xact_lock(SPEND_SUMMARY_LOCK_ID)
+        SpendSummaryMonth.objects.filter(months).delete()
+        cls.objects.filter(months).delete()
+
+    @classmethod
+    def materialize(cls, month):
+        """Recompute and cache a closed month; returns the number of vendor rows."""
+        if month >= cls.closed_before():
+            raise ValueError(f'{month:%Y-%m} is not a closed month.')
+        start, end = month_bounds(month)
+        with transaction.atomic():
+            advisory_xact_lock(SPEND_SUMMARY_LOCK_ID)
+            SpendSummaryMonth.objects.filter(month=month).delete()
+            cls.objects.filter(month=month).delete()
+            orders = PurchaseOrder.objects.filter(order_date__gte=start, order_date__lt=end)
+            rows = cls.objects.bulk_create([
+                cls(vendor_id=row['vendor'], month=month, **{field: row[field] for field in SPEND_SUM_FIELDS})
+                for row in cls.aggregate_orders(orders, ['vendor'])
+            ], batch_size=500)
+            SpendSummaryMonth.objects.create(month=month, currency=settings.VENDORS_BASE_CURRENCY)
+        return len(rows)
+
+    @classmethod
+    def summarize(cls, start, end, group_by, vendor_id=None, after=None, limit=None):
+        """
+        Spend analytics per ``group_by`` (a subset of SPEND_GROUP_BY) for the
+        months ``start`` to ``end`` (first days, inclusive), over the orders
+        of one vendor or of every vendor not archived, as rows of summed
+        SPEND_SUM_FIELDS (spend_summary() gives the API's shape). Cached
+        months are read from this table and the rest aggregated from
+        purchase orders, one query each; a group spanning both adds up its
+        two partial rows.
+
+        Rows are ordered by month, then vendor (spend_position()). ``after``
+        is a position to continue from and ``limit`` caps the rows; both are
+        applied in each query, so a page costs its own size, not the range's.
+        """
+        columns = [column for column in SPEND_ORDERING if column in group_by]
+        after_rows = Q()
+        if after is not None:
+            if 'month' in group_by:
+                start = max(start, after[0])
+            for index, column in enumerate(columns):
+                after_rows |= Q(**dict(zip(columns[:index], after[:index])), **{f'{column}__gt': after[index]})
+        if start > end:
+            return []
+
+        cached = list(
+            SpendSummaryMonth.objects.filter(
+                month__gte=start, month__lte=end, currency=settings.VENDORS_BASE_CURRENCY
+            ).values_list('month', flat=True)
+        )
+        sources = []
+        if cached:
+            rows = cls.objects.filter(month__in=cached)
+            rows = rows.filter(vendor_id=vendor_id) if vendor_id is not None else rows.filter(
+                vendor__archived_at__isnull=True
+            )
+            sources.append(rows.values(*group_by).annotate(**{field: Sum(field) for field in SPEND_SUM_FIELDS}))
+
+        ranges = cls.uncached_ranges(start, end, set(cached))
+        if ranges:
+            orders = PurchaseOrder.objects.filter(ranges)
+            orders = orders.filter(vendor_id=vendor_id) if vendor_id is not None else orders.filter(
+                vendor__archived_at__isnull=True
+            )
+            sources.append(cls.aggregate_orders(orders, group_by))
+
+        # Each source holds a group at most once, so the first ``limit``
+        # groups overall are among the first ``limit`` of every source.
+        groups = {}
+        for rows in sources:
+            rows = rows.filter(after_rows).order_by(*columns)
+            for row in (rows[:limit] if limit is not None else rows):
+                key = tuple(row[column] for column in group_by)
+                total = groups.setdefault(key, {
+                    **dict(zip(group_by, key)), **dict.fromkeys(SPEND_SUM_FIELDS),
+                })
+                add_spend(total, row)
+        rows = sorted(groups.values(), key=lambda row: spend_position(row, group_by))
+        return rows[:limit] if limit is not None else rows
+
+    @staticmethod
+    def uncached_ranges(start, end, cached):
+        # order_date ranges covering the months not in ``cached``, merging
+        # consecutive months so each range is one index seek.
+        ranges = Q()
+        month, first = start, None
+        while month <= end:
+            if month not in cached and first is None:
+                first = month
+            if first is not None and (month in cached or month == end):
+                last = month if month not in cached else add_months(month, -1)
+                ranges |= Q(order_date__gte=month_bounds(first)[0], order_date__lt=month_bounds(last)[1])
+                first = None
+            month = add_months(month, 1)
+        return ranges
+
+
+def spend_position(row, group_by):
+    # Sort key and keyset position of a VendorMonthlySpend.summarize() row.
+    return tuple(row[column] for column in SPEND_ORDERING if column in group_by)
+
+
+def add_spend(total, row):
+    for field in SPEND_SUM_FIELDS:
+        if row[field] is not None:
+            total[field] = row[field] if total[field] is None else total[field] + row[field]
+
+
+def spend_summary(total):
+    # Summed spend fields to the API's shape: counts default to 0 and the
+    # lead time becomes a mean in days over the delivered orders.
+    summary = {key: value for key, value in total.items() if key not in SPEND_SUM_FIELDS}
+    for field in ('order_count', 'delivered_order_count', 'unconverted_order_count'):
+        summary[field] = total[field] or 0
+    summary['spend'] = total['spend']
+    summary['avg_lead_time_days'] = (
+        total['lead_time_total'] / datetime.timedelta(days=1) / summary['delivered_order_count']
+        if summary['delivered_order_count'] and total['lead_time_total'] is not None else None
+    )
+    return summary
+
+
+class VendorMetricsMarker(models.Model):
+    # Append-only "vendor is dirty" queue used in deferred metrics mode.
+    # Writers only insert, so concurrent PO saves never contend on the vendor
+    # row; the worker coalesces duplicate markers per vendor.
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='+')
+    enqueued_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f'{self.vendor_id} @ {self.enqueued_at}'
+
+    @classmethod
+    def enqueue(cls, vendor_ids):
+        now = timezone.now()
+        cls.objects.bulk_create([cls(vendor_id=vendor_id, enqueued_at=now) for vendor_id in set(vendor_ids)])
+
+    @classmethod
+    def process_batch(cls, batch_size=100):
+        """
+        Recompute metrics for up to ``batch_size`` of the longest waiting
+        vendors and drop the markers that were visible before recomputing.
+        Markers that arrive meanwhile stay queued for the next batch.
+        """
+        vendor_ids = list(
+            cls.objects.values('vendor_id')
+            .annotate(first_marker=Min('id'))
+            .order_by('first_marker')
+            .values_list('vendor_id', flat=True)[:batch_size]
+        )
+        if not vendor_ids:
+            return 0
+        marker_ids = list(cls.objects.filter(vendor_id__in=vendor_ids).values_list('id', flat=True))
+        with transaction.atomic():
+            Vendor.rebuild_performance_metrics(Vendor.objects.filter(pk__in=vendor_ids))
+            for start in range(0, len(marker_ids), 500):
+                cls.objects.filter(pk__in=marker_ids[start:start + 500]).delete()
+        return len(vendor_ids)
+
+    @classmethod
+    def queue_status(cls):
+        status = cls.objects.aggregate(
+            pending_markers=Count('id'),
+            pending_vendors=Count('vendor_id', distinct=True),
+            oldest_enqueued_at=Min('enqueued_at'),
+        )
+        oldest = status['oldest_enqueued_at']
+        status['lag_seconds'] = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+        status['mode'] = settings.VENDORS_METRICS_MODE
+        return status
+
+
+CHANGE_LOG_LOCK_ID = 0x43484c47
+
+
+class ChangeLog(models.Model):
+    """
+    Append-only change feed for incremental sync: one entry per created,
+    updated or deleted vendor or purchase order, written in the same
+    transaction as the change. ``seq`` is the sync token; entries are
+    appended under a lock held to commit, so they become visible in ``seq``
+    order and a reader that has seen ``seq`` N can never later find an
+    entry below N. compact_change_log drops entries superseded by a newer
+    one for the same row.
+    """
+    VENDOR = 'vendor'
+    PURCHASE_ORDER = 'purchase_order'
+    KIND_CHOICES = [
+        (VENDOR, 'Vendor'),
+        (PURCHASE_ORDER, 'Purchase order'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Finding newer entries for the same row, for compaction.
+            models.Index(fields=['kind', 'object_id', 'seq'], name='change_log_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.seq} {self.kind} {self.object_id}{" deleted" if self.deleted else ""}'
+
+    @classmethod
+    def record(cls, vendors=(), purchase_orders=(), deleted_vendors=(), deleted_purchase_orders=(), batch_size=500):
+        # Vendors first, so a reader applying the feed in order sees a vendor
+        # before the purchase orders written with it.
+        now = timezone.now()
+        entries = [
+            cls(kind=kind, object_id=object_id, deleted=deleted, changed_at=now)
+            for kind, object_ids, deleted in (
+                (cls.VENDOR, vendors, False),
+                (cls.VENDOR, deleted_vendors, True),
+                (cls.PURCHASE_ORDER, purchase_orders, False),
+                (cls.PURCHASE_ORDER, deleted_purchase_orders, True),
+            )
+            for object_id in dict.fromkeys(object_ids)
+        ]
+        if entries:
+            # Held to commit, so sequence values commit in order; appends
+            # come last in each write to keep the hold short.
+            advisory_xact_lock(CHANGE_LOG_LOCK_ID)
+            cls.objects.bulk_create(entries, batch_size=batch_size)
+
+    @classmethod
+    def changes(cls, since, limit, kind=None):
+        """
+        Up to ``limit`` entries after ``since`` in sequence order, with only
+        the latest entry kept per row. Returns ``(entries, last_seq, more)``.
+        """
+        queryset = cls.objects.filter(seq__gt=since)
+        if kind is not None:
+            queryset = queryset.filter(kind=kind)
+        rows = list(queryset.order_by('seq').values('seq', 'kind', 'object_id', 'deleted')[:limit + 1])
+        more = len(rows) > limit
+        rows = rows[:limit]
+        latest = {(row['kind'], row['object_id']): row for row in rows}
+        entries = sorted(latest.values(), key=lambda row: row['seq'])
+        return entries, rows[-1]['seq'] if rows else since, more
+
+    @classmethod
+    def compact(cls, batch_size=5000):
+        """
+        Delete entries superseded by a newer entry for the same row, one
+        transaction per ``batch_size`` sequence values. Returns the number
+        deleted.
+        """
+        deleted = 0
+        bounds = cls.objects.aggregate(first=Min('seq'), last=Max('seq'))
+        if bounds['first'] is None:
+            return 0
+        newer = cls.objects.filter(kind=OuterRef('kind'), object_id=OuterRef('object_id'), seq__gt=OuterRef('seq'))
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            with transaction.atomic():
+                count, _ = cls.objects.filter(
+                    Exists(newer), seq__gte=start, seq__lt=start + batch_size
+                ).delete()
+            deleted += count
+        return deleted
+
+
+RANKING_SOURCE_FIELDS = ('completed_po_count', 'quality_rating_count') + METRIC_RATE_FIELDS
+# Ranked metric: (rank column, volume column). Vendors are ranked by the
+# metric, then by volume, then by id, so every rank is unique; vendors with
+# no volume are unranked.
+RANKING_METRICS = {
+    'on_time_delivery_rate': ('on_time_rank', 'completed_po_count'),
+    'quality_rating_avg': ('quality_rank', 'quality_rating_count'),
+}
+RANKING_LOCK_ID = 0x56524e4b
+
+
+def build_vendor_rankings(vendors, ranking_model, batch_size=500):
+    # Full rebuild with window functions over the ``vendors`` queryset.
+    ranking_model.objects.all().delete()
+    # Vendors without volume sort last, so the row numbers of ranked vendors
+    # are 1..N.
+    ranks = {
+        rank_field: Window(RowNumber(), order_by=[
+            GreaterThan(F(volume), 0).desc(),
+            F(metric).desc(), F(volume).desc(), F('pk').asc(),
+        ])
+        for metric, (rank_field, volume) in RANKING_METRICS.items()
+    }
+    batch = []
+    for row in vendors.annotate(**ranks).values('pk', *RANKING_SOURCE_FIELDS, *ranks).iterator():
+        for rank_field, volume in RANKING_METRICS.values():
+            if not row[volume]:
+                row[rank_field] = None
+        batch.append(ranking_model(vendor_id=row.pop('pk'), **row))
+        if len(batch) >= batch_size:
+            ranking_model.objects.bulk_create(batch)
+            batch = []
+    ranking_model.objects.bulk_create(batch)
+
+
+class VendorRanking(models.Model):
+    """
+    Materialized vendor leaderboard: each vendor's metrics with its rank per
+    metric. Ranks are maintained incrementally as metrics change: moving a
+    vendor only shifts the vendors ranked between its old and new position.
+    Top-K reads are index scans on the rank columns. Percentiles are derived
+    from the rank and the number of ranked vendors (the highest rank).
+    """
+    vendor = models.OneToOneField(Vendor, on_delete=models.CASCADE, primary_key=True, related_name='ranking')
+    completed_po_count = models.PositiveIntegerField(default=0)
+    quality_rating_count = models.PositiveIntegerField(default=0)
+    on_time_delivery_rate = models.FloatField(default=0.0)
+    quality_rating_avg = models.FloatField(default=0.0)
+    on_time_rank = models.PositiveIntegerField(null=True, blank=True)
+    quality_rank = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Leaderboards: rank order with the minimum-volume filter applied
+            # from the index.
+            models.Index(fields=['on_time_rank', 'completed_po_count'], name='ranking_on_time_idx'),
+            models.Index(fields=['quality_rank', 'quality_rating_count'], name='ranking_quality_idx'),
+            # Counting the vendors ahead of a moved vendor.
+            models.Index(fields=['on_time_delivery_rate', 'completed_po_count'], name='ranking_on_time_rate_idx'),
+            models.Index(fields=['quality_rating_avg', 'quality_rating_count'], name='ranking_quality_avg_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.vendor_id}: #{self.on_time_rank} on time, #{self.quality_rank} quality'
+
+    @classmethod
+    def lock(cls):
+        # Moving one vendor shifts the ranks of others, so rank maintenance
+        # must not interleave.
+        advisory_xact_lock(RANKING_LOCK_ID)
+
+    @classmethod
+    def rebuild(cls, batch_size=500):
+        with transaction.atomic():
+            cls.lock()
+            build_vendor_rankings(Vendor.objects.filter(archived_at__isnull=True), cls, batch_size=batch_size)
+
+    @classmethod
+    def schedule_refresh(cls, vendor_ids):
+        # After the metric write commits, in its own transaction: the ranking
+        # lock and the rank shifts stay out of the (hot) metric write, and a
+        # failure leaves the committed metrics alone (rebuild_vendor_rankings
+        # repairs the board).
+        vendor_ids = list(vendor_ids)
+        if vendor_ids:
+            transaction.on_commit(lambda: cls.refresh(vendor_ids), robust=True)
+
+    @classmethod
+    def refresh(cls, vendor_ids):
+        """Re-rank the given vendors from their current metrics."""
+        vendor_ids = sorted(set(vendor_ids))
+        if len(vendor_ids) > settings.VENDORS_RANKING_INCREMENTAL_LIMIT:
+            cls.rebuild()
+            return
+        if not vendor_ids:
+            return
+        with transaction.atomic():
+            cls.lock()
+            current = {
+                row.pop('pk'): row
+                for row in Vendor.objects.filter(pk__in=vendor_ids, archived_at__isnull=True)
+                .values('pk', *RANKING_SOURCE_FIELDS)
+            }
+            for vendor_id in vendor_ids:
+                # Read one at a time: each move shifts the ranks of others.
+                cls._move(vendor_id, cls.objects.filter(pk=vendor_id).first(), current.get(vendor_id))
+
+    @classmethod
+    def withdraw(cls, vendor_ids):
+        """Drop the given vendors from the rankings, e.g. before deleting them."""
+        with transaction.atomic():
+            cls.lock()
+            for vendor_id in vendor_ids:
+                cls._move(vendor_id, cls.objects.filter(pk=vendor_id).first(), None)
+
+    @classmethod
+    def _move(cls, vendor_id, stored, values):
+        if values is not None and stored is not None and all(
+            getattr(stored, field) == values[field] for field in RANKING_SOURCE_FIELDS
+        ):
+            return
+        ranking = stored or cls(vendor_id=vendor_id)
+        others = cls.objects.exclude(vendor_id=vendor_id)
+        for metric, (rank_field, volume) in RANKING_METRICS.items():
+            old_rank = getattr(stored, rank_field, None)
+            new_rank = None
+            if values is not None and values[volume]:
+                ahead = (
+                    Q(**{f'{metric}__gt': values[metric]})
+                    | Q(**{metric: values[metric], f'{volume}__gt': values[volume]})
+                    | Q(**{metric: values[metric], volume: values[volume], 'vendor_id__lt': vendor_id})
+                )
+                new_rank = others.filter(ahead, **{f'{rank_field}__isnull': False}).count() + 1
+            if old_rank is not None and new_rank is not None:
+                if new_rank < old_rank:
+                    others.filter(**{f'{rank_field}__range': (new_rank, old_rank - 1)}).update(
+                        **{rank_field: F(rank_field) + 1}
+                    )
+                elif new_rank > old_rank:
+                    others.filter(**{f'{rank_field}__range': (old_rank + 1, new_rank)}).update(
+                        **{rank_field: F(rank_field) - 1}
+                    )
+            elif old_rank is not None:
+                others.filter(**{f'{rank_field}__gt': old_rank}).update(**{rank_field: F(rank_field) - 1})
+            elif new_rank is not None:
+                others.filter(**{f'{rank_field}__gte': new_rank}).update(**{rank_field: F(rank_field) + 1})
+            setattr(ranking, rank_field, new_rank)
+
+        if values is None:
+            if stored is not None:
+                stored.delete()
+            return
+        for field in RANKING_SOURCE_FIELDS:
+            setattr(ranking, field, values[field])
+        ranking.save()
+
+    @classmethod
+    def ranked_counts(cls):
+        # Ranks are dense, so the highest rank is the number of ranked vendors.
+        counts = cls.objects.aggregate(**{
+            metric: Max(rank_field) for metric, (rank_field, _) in RANKING_METRICS.items()
+        })
+        return {metric: count or 0 for metric, count in counts.items()}
+
+    @staticmethod
+    def percentile(rank, ranked):
+        # Share of the other ranked vendors this one is ahead of.
+        if rank is None:
+            return None
+        return 100.0 if ranked <= 1 else round((ranked - rank) / (ranked - 1) * 100, 2)
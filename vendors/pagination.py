@@ -0,0 +1,11 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    # Keyset pagination on the primary key: pages stay stable while new rows
+    # are inserted and each page is a bounded index range scan.
+    ordering = 'id'
+    page_size = settings.VENDORS_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.VENDORS_MAX_PAGE_SIZE
@@ -1,24 +1,489 @@
-from rest_framework import serializers
-from .models import Vendor, PurchaseOrder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+from vendor_management.metrics import timed
+from .models import (
+    ChangeLog, Vendor, PurchaseOrder, PurchaseOrderLine, VendorMonthlySpend, METRIC_COUNTER_FIELDS, apply_metric_deltas,
+    order_total, parse_line_items,
+)
 
-class VendorSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    # Serializes only the fields listed in ?fields=a,b on read requests.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.requested_fields(self.context.get('request'))
+        if requested is None:
+            return
+        unknown = requested - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+        for name in set(self.fields) - requested:
+            self.fields.pop(name)
+
+    @staticmethod
+    def requested_fields(request):
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return None
+        value = request.query_params.get('fields')
+        if not value:
+            return None
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+class TimedSerializerMixin:
+    # Reports serialization and validation time to the request metrics.
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
+    def run_validation(self, data=serializers.empty):
+        with timed('serializer'):
+            return super().run_validation(data)
+
+class ValuesRowMixin:
+    """
+    Read fast path: serializes rows of ``queryset.values(*columns)`` with a
+    transformer compiled once from this serializer's fields, skipping DRF's
+    per-row, per-field dispatch. The output equals to_representation() of
+    the model instance; when a field cannot be reproduced from a plain
+    column value, values_reader() returns None and callers use the regular
+    path.
+    """
+    value_converters = (
+        (serializers.BooleanField, bool),
+        (serializers.IntegerField, int),
+        (serializers.FloatField, float),
+        (serializers.CharField, str),
+    )
+
+    def values_reader(self):
+        """Returns ``(columns, transform)``, or None if a field needs the instance."""
+        plan = []
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            convert = self.value_converter(field)
+            if convert is False or field.source == '*' or '.' in field.source:
+                return None
+            plan.append((name, field.source, convert))
+
+        def transform(row):
+            out = {}
+            for name, column, convert in plan:
+                value = row[column]
+                out[name] = value if value is None or convert is None else convert(value)
+            return out
+        return [column for _, column, _ in plan], transform
+
+    def value_converter(self, field):
+        # None means the column value is already the representation; False
+        # means the field needs the model instance.
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None if field.pk_field is None else field.pk_field.to_representation
+        if isinstance(field, (serializers.RelatedField, serializers.BaseSerializer, serializers.SerializerMethodField)):
+            return False
+        if isinstance(field, serializers.JSONField) and not field.binary:
+            return None
+        if type(field) is serializers.ChoiceField and all(
+            key == value for key, value in field.choice_strings_to_values.items()
+        ):
+            return None
+        if type(field) is serializers.DateTimeField:
+            return self.datetime_converter(field)
+        for field_class, convert in self.value_converters:
+            if type(field) is field_class:
+                return convert
+        return field.to_representation
+
+    @staticmethod
+    def datetime_converter(field):
+        # DateTimeField.to_representation() with the format and time zone
+        # looked up once per compile instead of once per value.
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if isinstance(value, str) or value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+class VendorSerializer(ValuesRowMixin, TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Vendor
-        fields = '__all__'
+        exclude = METRIC_COUNTER_FIELDS + ('archived_at',)
         read_only_fields = ['on_time_delivery_rate', 'quality_rating_avg']
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PrefetchedVendorField(serializers.PrimaryKeyRelatedField):
+    # Resolves vendors from the map a bulk list serializer loads up front,
+    # instead of issuing one lookup per row.
+    def to_internal_value(self, data):
+        vendors = self.context.get('prefetched_vendors')
+        if vendors is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return vendors[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+class PurchaseOrderListSerializer(serializers.ListSerializer):
+
+    def validate_rows(self, upsert=False):
+        """
+        Validate every row on its own so one bad row does not reject the batch.
+        Returns (index, data) pairs for the valid rows and a list of per-row
+        errors.
+        """
+        rows = self.initial_data
+        po_number_field = self.child.fields['po_number']
+        po_number_field.validators = [
+            validator for validator in po_number_field.validators
+            if not isinstance(validator, UniqueValidator)
+        ]
+        self._context['prefetched_vendors'] = (
+            Vendor.objects.filter(archived_at__isnull=True).in_bulk(self._vendor_ids(rows))
+        )
+
+        validated, errors, seen = [], [], set()
+        for index, row in enumerate(rows):
+            try:
+                data = self.child.run_validation(row)
+            except serializers.ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+                continue
+            if data['po_number'] in seen:
+                errors.append({'index': index, 'errors': {'po_number': ['Duplicate po_number in this batch.']}})
+                continue
+            seen.add(data['po_number'])
+            validated.append((index, data))
+
+        existing = self._existing_orders(seen)
+        self.existing_vendor_ids = {po_number: vendor_id for po_number, (vendor_id, _, _) in existing.items()}
+        self.existing_order_dates = {po_number: order_date for po_number, (_, order_date, _) in existing.items()}
+        accepted = []
+        for index, data in validated:
+            if data['po_number'] not in existing:
+                accepted.append((index, data))
+            elif not upsert:
+                errors.append({
+                    'index': index,
+                    'errors': {'po_number': ['purchase order with this po number already exists.']},
+                })
+            elif existing[data['po_number']][2]:
+                # Orders of archived vendors are read-only until purged.
+                errors.append({
+                    'index': index,
+                    'errors': {'po_number': ['purchase order belongs to an archived vendor.']},
+                })
+            else:
+                accepted.append((index, data))
+        validated = accepted
+
+        errors.sort(key=lambda error: error['index'])
+        return validated, errors
+
+    def save_rows(self, rows, upsert=False, batch_size=None):
+        """
+        Insert (or upsert on po_number) the validated (index, data) rows with
+        bulk_create and refresh metrics once for every vendor whose purchase
+        orders changed. Returns the created and updated counts and per-row
+        errors for orders another request inserted after validation.
+        """
+        errors = []
+        while rows:
+            try:
+                created, updated = self._save_rows([data for _, data in rows], upsert, batch_size)
+                return created, updated, errors
+            except IntegrityError:
+                # Upserts resolve conflicts in the database; a plain insert
+                # loses the race to a concurrent one and retries without the
+                # rows that now exist.
+                taken = {} if upsert else self._existing_orders(data['po_number'] for _, data in rows)
+                if not taken:
+                    raise
+                errors.extend(
+                    {'index': index, 'errors': {'po_number': ['purchase order with this po number already exists.']}}
+                    for index, data in rows if data['po_number'] in taken
+                )
+                rows = [(index, data) for index, data in rows if data['po_number'] not in taken]
+        return 0, 0, errors
+
+    def _save_rows(self, rows, upsert, batch_size):
+        objs = [PurchaseOrder(**data) for data in rows]
+        for obj in objs:
+            obj.total_amount = order_total(parse_line_items(obj.items))
+
+        affected_vendor_ids = {obj.vendor_id for obj in objs}
+        updated = 0
+        for obj in objs:
+            if obj.po_number in self.existing_vendor_ids:
+                affected_vendor_ids.add(self.existing_vendor_ids[obj.po_number])
+                updated += 1
+
+        with transaction.atomic():
+            if upsert:
+                # Like a PATCH, an existing order only takes the fields its row
+                # was sent with; one statement per distinct set of fields.
+                groups = {}
+                for obj, data in zip(objs, rows):
+                    groups.setdefault(frozenset(data), []).append(obj)
+                for submitted, group in groups.items():
+                    PurchaseOrder.objects.bulk_create(
+                        group, batch_size=batch_size, update_conflicts=True, unique_fields=['po_number'],
+                        update_fields=self._upsert_fields(submitted),
+                    )
+            else:
+                PurchaseOrder.objects.bulk_create(objs, batch_size=batch_size)
+            self._set_missing_pks(objs)
+            PurchaseOrderLine.sync(objs, replace=updated > 0, batch_size=batch_size or 500)
+            Vendor.refresh_performance_metrics(affected_vendor_ids)
+            VendorMonthlySpend.invalidate([obj.order_date for obj in objs] + [
+                self.existing_order_dates[obj.po_number] for obj in objs if obj.po_number in self.existing_order_dates
+            ])
+            ChangeLog.record(purchase_orders=[obj.pk for obj in objs], batch_size=batch_size or 500)
+        return len(objs) - updated, updated
+
+    @staticmethod
+    def _upsert_fields(submitted):
+        derived = {'updated_at'} | ({'total_amount'} if 'items' in submitted else set())
+        return [
+            field.name for field in PurchaseOrder._meta.concrete_fields
+            if field.name != 'po_number' and (field.name in submitted or field.name in derived)
+        ]
+
+    def _set_missing_pks(self, objs):
+        # Upserts do not return primary keys on every backend.
+        missing = [obj for obj in objs if obj.pk is None]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            pks = dict(
+                PurchaseOrder.objects.filter(po_number__in=[obj.po_number for obj in chunk])
+                .values_list('po_number', 'pk')
+            )
+            for obj in chunk:
+                obj.pk = pks[obj.po_number]
+
+    def _vendor_ids(self, rows):
+        vendor_ids = set()
+        for row in rows:
+            try:
+                vendor_ids.add(int(row['vendor']))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return vendor_ids
+
+    def _existing_orders(self, po_numbers):
+        # {po_number: (vendor_id, order_date, vendor archived)} of the orders
+        # already stored.
+        po_numbers = list(po_numbers)
+        existing = {}
+        # Chunked to stay under the backend's bound-parameter limit.
+        for start in range(0, len(po_numbers), 500):
+            existing.update(
+                (po_number, (vendor_id, order_date, archived_at is not None))
+                for po_number, vendor_id, order_date, archived_at in
+                PurchaseOrder.objects.filter(po_number__in=po_numbers[start:start + 500])
+                .values_list('po_number', 'vendor_id', 'order_date', 'vendor__archived_at')
+            )
+        return existing
+
+class PurchaseOrderSerializer(ValuesRowMixin, TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    # Archived vendors take no new orders.
+    vendor = PrefetchedVendorField(queryset=Vendor.objects.filter(archived_at__isnull=True))
+
     class Meta:
         model = PurchaseOrder
         fields = '__all__'
-        read_only_fields = []
+        read_only_fields = ['total_amount']
+        list_serializer_class = PurchaseOrderListSerializer
 
     def validate_quality_rating(self, value):
         if value is not None and (value < 1.0 or value > 5.0):
             raise serializers.ValidationError("Quality rating must be between 1 and 5.")
         return value
 
-class PerformanceMetricsSerializer(serializers.ModelSerializer):
+class PurchaseOrderTransitionListSerializer(serializers.ListSerializer):
+    # Lookups and row locks are chunked to stay under the backend's
+    # bound-parameter limit.
+    lookup_chunk_size = 500
+
+    def validate_rows(self):
+        """
+        Validate every row on its own so one bad row does not reject the batch.
+        Returns (index, data) pairs for the valid rows and a list of per-row
+        errors.
+        """
+        validated, errors, seen = [], [], set()
+        for index, row in enumerate(self.initial_data):
+            try:
+                data = self.child.run_validation(row)
+            except serializers.ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+                continue
+            key = self._reference(data)
+            if key in seen:
+                errors.append({'index': index, 'errors': {key[0]: ['Duplicate purchase order in this batch.']}})
+                continue
+            seen.add(key)
+            validated.append((index, data))
+        return validated, errors
+
+    def save_rows(self, rows, batch_size=None):
+        """
+        Apply the transitions that are legal from each order's current status
+        with bulk_update, then apply the metric changes once per vendor.
+        Returns the number of updated orders and the per-row errors.
+        """
+        errors = []
+        with transaction.atomic():
+            pks = self._resolve_pks(rows)
+            orders = self._lock_orders(set(pks.values()))
+            changed, deltas, claimed = [], {}, set()
+            for index, data in rows:
+                field, value = self._reference(data)
+                order = orders.get(pks.get((field, value)))
+                if order is None:
+                    errors.append({'index': index, 'errors': {field: [f'Purchase order {value} does not exist.']}})
+                    continue
+                if order.pk in claimed:
+                    errors.append({'index': index, 'errors': {field: ['Duplicate purchase order in this batch.']}})
+                    continue
+                if data['status'] not in PurchaseOrder.STATUS_TRANSITIONS[order.status]:
+                    errors.append({'index': index, 'errors': {'status': [
+                        f"Cannot change a {order.status} purchase order to {data['status']}."
+                    ]}})
+                    continue
+                claimed.add(order.pk)
+                previous = order._metric_values()
+                self._apply(order, data)
+                for key, delta in PurchaseOrder.metric_deltas(previous, order._metric_values()).items():
+                    total = deltas.setdefault(key, dict.fromkeys(METRIC_COUNTER_FIELDS, 0))
+                    for field, amount in delta.items():
+                        total[field] += amount
+                changed.append(order)
+
+            PurchaseOrder.objects.bulk_update(
+                changed, ['status', 'delivered_date', 'quality_rating', 'updated_at'], batch_size=batch_size
+            )
+            vendor_ids = apply_metric_deltas(deltas)
+            VendorMonthlySpend.invalidate(order.order_date for order in changed)
+            ChangeLog.record(
+                vendors=vendor_ids, purchase_orders=[order.pk for order in changed], batch_size=batch_size or 500
+            )
+        errors.sort(key=lambda error: error['index'])
+        return len(changed), errors
+
+    def _apply(self, order, data):
+        order.status = data['status']
+        order.updated_at = timezone.now()
+        if order.status == 'completed':
+            order.delivered_date = data.get('delivered_date', order.delivered_date or timezone.now())
+            order.quality_rating = data.get('quality_rating', order.quality_rating)
+
+    @staticmethod
+    def _reference(data):
+        return ('id', data['id']) if 'id' in data else ('po_number', data['po_number'])
+
+    def _resolve_pks(self, rows):
+        references = [self._reference(data) for _, data in rows]
+        pks = {reference: reference[1] for reference in references if reference[0] == 'id'}
+        po_numbers = [value for field, value in references if field == 'po_number']
+        for start in range(0, len(po_numbers), self.lookup_chunk_size):
+            found = PurchaseOrder.objects.filter(
+                po_number__in=po_numbers[start:start + self.lookup_chunk_size]
+            ).values_list('po_number', 'pk')
+            pks.update((('po_number', po_number), pk) for po_number, pk in found)
+        return pks
+
+    def _lock_orders(self, pks):
+        # Locked in id order so concurrent transitions cannot deadlock; items
+        # are never read. Orders of archived vendors are left out, so they
+        # report as missing, as they do on the detail endpoint.
+        pks = sorted(pks)
+        orders = {}
+        for start in range(0, len(pks), self.lookup_chunk_size):
+            orders.update(
+                (order.pk, order) for order in PurchaseOrder.objects.select_for_update(of=('self',))
+                .filter(pk__in=pks[start:start + self.lookup_chunk_size], vendor__archived_at__isnull=True)
+                .order_by('pk')
+                .only('pk', 'po_number', 'order_date', *PurchaseOrder.METRIC_SOURCE_FIELDS)
+            )
+        return orders
+
+class PurchaseOrderTransitionSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False)
+    po_number = serializers.CharField(max_length=100, required=False)
+    status = serializers.ChoiceField(choices=PurchaseOrder.STATUS_CHOICES)
+    delivered_date = serializers.DateTimeField(required=False)
+    quality_rating = serializers.FloatField(required=False, allow_null=True, min_value=1.0, max_value=5.0)
+
+    class Meta:
+        list_serializer_class = PurchaseOrderTransitionListSerializer
+
+    def validate(self, attrs):
+        if ('id' in attrs) == ('po_number' in attrs):
+            raise serializers.ValidationError('Provide either id or po_number.')
+        if attrs['status'] != 'completed' and ('delivered_date' in attrs or 'quality_rating' in attrs):
+            raise serializers.ValidationError('Only completed purchase orders take a delivered_date or quality_rating.')
+        return attrs
+
+class PerformanceMetricsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Vendor
-        fields = ['on_time_delivery_rate', 'quality_rating_avg']
\ No newline at end of file
+        fields = ['on_time_delivery_rate', 'quality_rating_avg']
+
+class LineItemSummarySerializer(serializers.Serializer):
+    # Rows of PurchaseOrderLine.summarize(); vendor and sku are present when
+    # grouped by.
+    vendor = serializers.IntegerField(required=False)
+    sku = serializers.CharField(required=False)
+    line_count = serializers.IntegerField()
+    purchase_order_count = serializers.IntegerField()
+    total_quantity = serializers.IntegerField()
+    spend = serializers.DecimalField(max_digits=20, decimal_places=2, allow_null=True)
+
+class VendorRankingSerializer(serializers.Serializer):
+    # Leaderboard rows built from VendorRanking. rank and percentile are over
+    # all ranked vendors; position is within the (volume-filtered) board.
+    position = serializers.IntegerField()
+    vendor = serializers.IntegerField()
+    name = serializers.CharField()
+    vendor_code = serializers.CharField()
+    value = serializers.FloatField()
+    volume = serializers.IntegerField()
+    rank = serializers.IntegerField()
+    percentile = serializers.FloatField()
+
+class AtRiskVendorSerializer(serializers.Serializer):
+    # Rows of PurchaseOrder.at_risk_counts().
+    vendor = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    due_soon = serializers.IntegerField()
+
+class SpendSummarySerializer(serializers.Serializer):
+    # Rows of VendorMonthlySpend.summarize(); vendor and month are present
+    # when grouped by. spend is in the base currency.
+    vendor = serializers.IntegerField(required=False)
+    month = serializers.DateField(required=False, format='%Y-%m')
+    order_count = serializers.IntegerField()
+    delivered_order_count = serializers.IntegerField()
+    unconverted_order_count = serializers.IntegerField()
+    spend = serializers.DecimalField(max_digits=20, decimal_places=2, allow_null=True)
+    avg_lead_time_days = serializers.FloatField(allow_null=True)
+
+class ChangeSerializer(serializers.Serializer):
+    # Entries of the change feed; data is the row as the list endpoint
+    # serializes it, or null for deletions.
+    seq = serializers.IntegerField()
+    kind = serializers.CharField()
+    id = serializers.IntegerField()
+    deleted = serializers.BooleanField()
+    data = serializers.JSONField(allow_null=True)
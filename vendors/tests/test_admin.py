@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from vendors.models import Vendor, PurchaseOrder
+
+class PurchaseOrderAdminQueryTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.user)
+        self.created = 0
+
+    def create_orders(self, count):
+        # One vendor per order, so a per-row vendor lookup would show up as
+        # extra queries.
+        vendors = Vendor.objects.bulk_create([
+            Vendor(
+                name=f"Vendor {self.created + i}",
+                contact_details="123 Test Street",
+                address="456 Vendor Avenue",
+                vendor_code=f"VEND{self.created + i}"
+            )
+            for i in range(count)
+        ])
+        PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                po_number=f"PO{self.created + i:04}",
+                vendor=vendor,
+                delivery_date=timezone.now(),
+                items={"item": "Test Item"},
+                quantity=1
+            )
+            for i, vendor in enumerate(vendors)
+        ])
+        self.created += count
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_constant_queries(self, url, params=None):
+        self.create_orders(3)
+        self.count_queries(url, params)
+        small = self.count_queries(url, params)
+        self.create_orders(30)
+        self.assertEqual(self.count_queries(url, params), small)
+
+    def test_changelist_query_count_is_constant(self):
+        self.assert_constant_queries(reverse('admin:vendors_purchaseorder_changelist'))
+
+    def test_vendor_name_search_query_count_is_constant(self):
+        self.assert_constant_queries(reverse('admin:vendors_purchaseorder_changelist'), {"q": "Vendor"})
+
+    def test_change_form_does_not_list_every_vendor(self):
+        self.create_orders(3)
+        url = reverse('admin:vendors_purchaseorder_change', args=[PurchaseOrder.objects.first().pk])
+        self.count_queries(url)
+        small = self.count_queries(url)
+        self.create_orders(30)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(queries), small)
+        self.assertNotContains(response, "Vendor 32")
@@ -0,0 +1,80 @@
+import json
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from vendors.models import Vendor, PurchaseOrder
+
+class AsyncReadAPITest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        now = timezone.now()
+        for i, vendor in enumerate([self.vendor, self.vendor, self.other_vendor]):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=vendor,
+                delivery_date=now,
+                delivered_date=now - timezone.timedelta(hours=1),
+                items={"item": f"Item {i}"},
+                quantity=i + 1,
+                status="completed",
+                quality_rating=4.0
+            )
+        self.po = PurchaseOrder.objects.get(po_number="PO000")
+
+    async def test_vendor_list_pages_by_id(self):
+        response = await self.async_client.get(reverse('async-vendor-list'), {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = json.loads(response.content)
+        self.assertEqual([vendor['vendor_code'] for vendor in body['results']], ["VEND123"])
+        response = await self.async_client.get(body['next'])
+        body = json.loads(response.content)
+        self.assertEqual([vendor['vendor_code'] for vendor in body['results']], ["VEND456"])
+        self.assertIsNone(body['next'])
+
+    async def test_payloads_match_sync_api(self):
+        pairs = [
+            (reverse('async-vendor-detail', args=[self.vendor.id]), reverse('vendor-detail', args=[self.vendor.id])),
+            (reverse('async-purchaseorder-detail', args=[self.po.id]), reverse('purchaseorder-detail', args=[self.po.id])),
+            (reverse('async-vendor-performance', args=[self.vendor.id]),
+             reverse('vendor-performance', args=[self.vendor.id])),
+        ]
+        for async_url, sync_url in pairs:
+            async_response = await self.async_client.get(async_url)
+            sync_response = await self.async_client.get(sync_url, headers={'Accept': 'application/json'})
+            self.assertEqual(async_response.content, sync_response.content)
+
+    async def test_purchase_order_list_filters(self):
+        response = await self.async_client.get(reverse('async-purchaseorder-list'), {'vendor': self.other_vendor.id})
+        body = json.loads(response.content)
+        self.assertEqual([po['po_number'] for po in body['results']], ["PO002"])
+        response = await self.async_client.get(reverse('async-purchaseorder-list'), {'status': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_performance_windows_and_conditional_get(self):
+        url = reverse('async-vendor-performance', args=[self.vendor.id])
+        response = await self.async_client.get(url, {'window': '30d'})
+        self.assertEqual(json.loads(response.content)['completed_po_count'], 2)
+        response = await self.async_client.get(url)
+        response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_missing_objects_and_writes(self):
+        response = await self.async_client.get(reverse('async-vendor-detail', args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.delete(reverse('async-vendor-detail', args=[self.vendor.id]))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
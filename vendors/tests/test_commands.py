@@ -0,0 +1,282 @@
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from vendors.models import (
+    ArchivedPurchaseOrder, ChangeLog, DeliveryRiskScan, SpendSummaryMonth, Vendor, PurchaseOrder, VendorMetricsMarker,
+    VendorMonthlySpend, VendorRanking,
+)
+
+class RebuildVendorMetricsCommandTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        now = timezone.now()
+        PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            delivery_date=now,
+            delivered_date=now - timezone.timedelta(hours=1),
+            items={"item": "Test Item"},
+            quantity=10,
+            status="completed",
+            quality_rating=4.0
+        )
+        PurchaseOrder.objects.create(
+            po_number="PO002",
+            vendor=self.vendor,
+            delivery_date=now,
+            delivered_date=now + timezone.timedelta(days=1),
+            items={"item": "Test Item 2"},
+            quantity=5,
+            status="completed",
+            quality_rating=2.0
+        )
+
+    def test_rebuild_repairs_drifted_counters(self):
+        Vendor.objects.filter(pk=self.vendor.pk).update(
+            completed_po_count=7, on_time_po_count=0, quality_rating_sum=1.0,
+            quality_rating_count=7, on_time_delivery_rate=0.0, quality_rating_avg=1.0
+        )
+        out = StringIO()
+        call_command('rebuild_vendor_metrics', stdout=out)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 2)
+        self.assertEqual(self.vendor.on_time_po_count, 1)
+        self.assertEqual(self.vendor.quality_rating_count, 2)
+        self.assertEqual(self.vendor.on_time_delivery_rate, 50.0)
+        self.assertEqual(self.vendor.quality_rating_avg, 3.0)
+        self.assertIn("1 vendor(s)", out.getvalue())
+
+    def test_rebuild_selected_vendors_only(self):
+        other = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456",
+            completed_po_count=3
+        )
+        call_command('rebuild_vendor_metrics', str(self.vendor.pk), stdout=StringIO())
+        other.refresh_from_db()
+        self.assertEqual(other.completed_po_count, 3)
+
+    def test_rebuild_rankings(self):
+        VendorRanking.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_vendor_rankings', stdout=out)
+        ranking = VendorRanking.objects.get(vendor=self.vendor)
+        self.assertEqual((ranking.on_time_rank, ranking.quality_rank), (1, 1))
+        self.assertIn("Ranked 1 vendor(s)", out.getvalue())
+
+
+@override_settings(VENDORS_METRICS_MODE='deferred')
+class RunMetricsWorkerCommandTest(TestCase):
+
+    def test_once_drains_queue_in_batches(self):
+        vendors = [
+            Vendor.objects.create(
+                name=f"Vendor {i}",
+                contact_details="123 Test Street",
+                address="456 Vendor Avenue",
+                vendor_code=f"VEND{i}"
+            )
+            for i in range(3)
+        ]
+        for i, vendor in enumerate(vendors):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=vendor,
+                delivery_date=timezone.now(),
+                delivered_date=timezone.now() - timezone.timedelta(hours=1),
+                items={"item": "Queued"},
+                quantity=1,
+                status="completed",
+                quality_rating=5.0
+            )
+        out = StringIO()
+        call_command('run_metrics_worker', '--once', '--batch-size', '2', stdout=out)
+        self.assertIn("Recomputed 2 vendor(s); 1 pending", out.getvalue())
+        self.assertIn("Recomputed 1 vendor(s); 0 pending", out.getvalue())
+        self.assertFalse(VendorMetricsMarker.objects.exists())
+        for vendor in vendors:
+            vendor.refresh_from_db()
+            self.assertEqual(vendor.on_time_delivery_rate, 100.0)
+
+
+class PurgeArchivedVendorsCommandTest(TestCase):
+
+    def setUp(self):
+        self.vendors = [
+            Vendor.objects.create(
+                name=f"Vendor {i}",
+                contact_details="123 Test Street",
+                address="456 Vendor Avenue",
+                vendor_code=f"VEND{i}"
+            )
+            for i in range(2)
+        ]
+        for vendor in self.vendors:
+            for i in range(3):
+                PurchaseOrder.objects.create(
+                    po_number=f"{vendor.vendor_code}-{i}",
+                    vendor=vendor,
+                    delivery_date=timezone.now(),
+                    items={"item": "Test Item"},
+                    quantity=1
+                )
+
+    def test_purges_archived_vendors_in_batches(self):
+        archived, live = self.vendors
+        archived.archive()
+        out = StringIO()
+        call_command('purge_archived_vendors', '--batch-size', '2', stdout=out)
+        self.assertIn("VEND0: archived 2/3 purchase order(s).", out.getvalue())
+        self.assertIn("VEND0: archived 3/3 purchase order(s).", out.getvalue())
+        self.assertIn("Purged 1 archived vendor(s).", out.getvalue())
+        self.assertFalse(Vendor.objects.filter(pk=archived.pk).exists())
+        self.assertEqual(ArchivedPurchaseOrder.objects.filter(vendor_id=archived.pk).count(), 3)
+        self.assertEqual(PurchaseOrder.objects.filter(vendor=live).count(), 3)
+
+    def test_older_than_skips_recent_archives(self):
+        self.vendors[0].archive()
+        out = StringIO()
+        call_command('purge_archived_vendors', '--older-than', '7', stdout=out)
+        self.assertIn("Purged 0 archived vendor(s).", out.getvalue())
+        Vendor.objects.filter(pk=self.vendors[0].pk).update(archived_at=timezone.now() - timezone.timedelta(days=8))
+        call_command('purge_archived_vendors', '--older-than', '7', stdout=StringIO())
+        self.assertFalse(Vendor.objects.filter(pk=self.vendors[0].pk).exists())
+
+
+class ScanDeliveryRiskCommandTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        for i, hours in enumerate([-10, 5, 500]):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=self.vendor,
+                delivery_date=timezone.now() + timezone.timedelta(hours=hours),
+                items={"item": "Test Item"},
+                quantity=1
+            )
+
+    def test_scan_reports_new_candidates_once(self):
+        out = StringIO()
+        call_command('scan_delivery_risk', stdout=out)
+        self.assertIn("VEND123: 1 overdue, 1 due soon.", out.getvalue())
+        self.assertIn("1 purchase order(s) newly overdue and 1 newly due soon.", out.getvalue())
+        out = StringIO()
+        call_command('scan_delivery_risk', stdout=out)
+        self.assertIn("0 purchase order(s) newly overdue and 0 newly due soon.", out.getvalue())
+        self.assertEqual(DeliveryRiskScan.objects.count(), 2)
+
+    def test_full_rescan_and_window(self):
+        call_command('scan_delivery_risk', stdout=StringIO())
+        out = StringIO()
+        call_command('scan_delivery_risk', '--full', '--within-hours', '1000', stdout=out)
+        self.assertIn("VEND123: 1 overdue, 2 due soon.", out.getvalue())
+        self.assertEqual(DeliveryRiskScan.objects.count(), 1)
+
+
+class CompactChangeLogCommandTest(TestCase):
+
+    def test_compacts_superseded_entries(self):
+        vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        vendor.save()
+        vendor.save()
+        out = StringIO()
+        call_command('compact_change_log', '--batch-size', '1', stdout=out)
+        self.assertIn("Deleted 2 superseded change log entries.", out.getvalue())
+        self.assertEqual(ChangeLog.objects.count(), 1)
+
+
+class RefreshSpendSummaryCommandTest(TestCase):
+
+    def setUp(self):
+        vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        for i, order_date in enumerate([
+            timezone.datetime(2025, 1, 20, tzinfo=timezone.utc),
+            timezone.datetime(2025, 3, 2, tzinfo=timezone.utc),
+            timezone.now(),
+        ]):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=vendor,
+                order_date=order_date,
+                delivery_date=order_date,
+                items=[{"sku": "SKU-1", "quantity": 1, "unit_price": 10}],
+                quantity=1
+            )
+
+    def test_caches_closed_months_once(self):
+        out = StringIO()
+        call_command('refresh_spend_summary', '--to', '2025-04', stdout=out)
+        self.assertIn("Cached 4 month(s), 2 vendor row(s).", out.getvalue())
+        self.assertEqual(
+            list(VendorMonthlySpend.objects.order_by('month').values_list('month__month', 'order_count')),
+            [(1, 1), (3, 1)],
+        )
+        out = StringIO()
+        call_command('refresh_spend_summary', '--to', '2025-04', stdout=out)
+        self.assertIn("Cached 0 month(s)", out.getvalue())
+        call_command('refresh_spend_summary', '--from', '2025-03', '--to', '2025-03', '--rebuild', stdout=out)
+        self.assertIn("Cached 1 month(s), 1 vendor row(s).", out.getvalue())
+
+    def test_leaves_the_current_month_and_rejects_bad_months(self):
+        call_command('refresh_spend_summary', stdout=StringIO())
+        current = timezone.localdate().replace(day=1)
+        self.assertFalse(SpendSummaryMonth.objects.filter(month__gte=current).exists())
+        with self.assertRaises(CommandError):
+            call_command('refresh_spend_summary', '--from', 'March', stdout=StringIO())
+
+
+class GenerateBenchmarkDataCommandTest(TestCase):
+
+    def test_generates_vendors_orders_and_metrics(self):
+        out = StringIO()
+        call_command('generate_benchmark_data', '--vendors', '3', '--pos', '20', '--batch-size', '7', stdout=out)
+        self.assertIn("3 vendor(s) and 60 purchase order(s)", out.getvalue())
+        self.assertEqual(Vendor.objects.count(), 3)
+        self.assertEqual(PurchaseOrder.objects.count(), 60)
+
+        po = PurchaseOrder.objects.first()
+        self.assertTrue(po.items)
+        self.assertEqual(set(po.items[0]), {"sku", "description", "quantity", "unit_price"})
+        self.assertEqual(po.quantity, sum(item["quantity"] for item in po.items))
+
+        completed = PurchaseOrder.objects.filter(status="completed")
+        self.assertTrue(completed.exists())
+        self.assertFalse(completed.filter(delivered_date__isnull=True).exists())
+        for vendor in Vendor.objects.all():
+            self.assertEqual(vendor.completed_po_count, completed.filter(vendor=vendor).count())
+
+    def test_is_reproducible_and_requires_clear(self):
+        call_command('generate_benchmark_data', '--vendors', '2', '--pos', '5', stdout=StringIO())
+        first = list(PurchaseOrder.objects.order_by("po_number").values_list("status", "quantity"))
+        with self.assertRaises(CommandError):
+            call_command('generate_benchmark_data', '--vendors', '2', '--pos', '5', stdout=StringIO())
+
+        call_command('generate_benchmark_data', '--vendors', '2', '--pos', '5', '--clear', stdout=StringIO())
+        self.assertEqual(Vendor.objects.count(), 2)
+        second = list(PurchaseOrder.objects.order_by("po_number").values_list("status", "quantity"))
+        self.assertEqual(first, second)
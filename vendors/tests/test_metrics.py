@@ -0,0 +1,97 @@
+import re
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from vendor_management.metrics import REGISTRY
+from vendors.models import Vendor, PurchaseOrder
+
+@override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0, REQUEST_METRICS_SERVER_TIMING=True)
+class RequestMetricsMiddlewareTest(APITestCase):
+
+    def setUp(self):
+        REGISTRY.clear()
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.po = PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            delivery_date=timezone.now(),
+            items={"item": "Test Item"},
+            quantity=10,
+            status="pending"
+        )
+
+    def test_sampled_request_records_db_and_serializer_time(self):
+        response = self.client.get(reverse('vendor-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'app;dur=[\d.]+')
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="1 queries"')
+        self.assertRegex(timing, r'serializer;dur=[\d.]+')
+
+        stats = REGISTRY.snapshot()[('vendor-list', 'GET')]
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['sampled'], 1)
+        self.assertEqual(stats['db_queries'], 1)
+        self.assertGreater(stats['serializer_seconds'], 0)
+
+    def test_records_per_url_name(self):
+        self.client.patch(
+            reverse('purchaseorder-detail', args=[self.po.id]), {"status": "canceled"}, format='json'
+        )
+        self.client.get(reverse('vendor-performance', args=[self.vendor.id]))
+        self.client.get(reverse('vendor-performance', args=[self.vendor.id]))
+        snapshot = REGISTRY.snapshot()
+        self.assertEqual(snapshot[('purchaseorder-detail', 'PATCH')]['requests'], 1)
+        self.assertGreater(snapshot[('purchaseorder-detail', 'PATCH')]['db_queries'], 1)
+        self.assertEqual(snapshot[('vendor-performance', 'GET')]['requests'], 2)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request_is_only_counted(self):
+        response = self.client.get(reverse('vendor-list'))
+        self.assertNotIn('Server-Timing', response)
+        stats = REGISTRY.snapshot()[('vendor-list', 'GET')]
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['sampled'], 0)
+        self.assertEqual(stats['db_queries'], 0)
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_server_timing_is_opt_in(self):
+        response = self.client.get(reverse('vendor-list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(REGISTRY.snapshot()[('vendor-list', 'GET')]['sampled'], 1)
+
+    def test_unmatched_path(self):
+        self.client.get('/no/such/path/')
+        self.assertIn(('unmatched', 'GET'), REGISTRY.snapshot())
+
+    def test_prometheus_endpoint(self):
+        self.client.get(reverse('vendor-list'))
+        response = self.client.get(reverse('prometheus-metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_requests_total{endpoint="vendor-list",method="GET"} 1', body)
+        self.assertIn('http_request_db_queries_total{endpoint="vendor-list",method="GET"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{endpoint="vendor-list",method="GET",le="+Inf"} 1', body)
+        self.assertIn('vendors_metrics_queue_pending_vendors 0', body)
+        self.assertTrue(re.search(r'^vendors_metrics_queue_lag_seconds [\d.]+$', body, re.M))
+
+@override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0, REQUEST_METRICS_SERVER_TIMING=True)
+class AsyncRequestMetricsTest(TestCase):
+
+    def setUp(self):
+        REGISTRY.clear()
+
+    async def test_async_endpoint_is_recorded(self):
+        response = await self.async_client.get(reverse('async-vendor-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Server-Timing', response)
+        self.assertEqual(REGISTRY.snapshot()[('async-vendor-list', 'GET')]['requests'], 1)
@@ -1,6 +1,24 @@
-from django.test import TestCase
+import importlib
+import random
+import threading
+from decimal import Decimal
+from unittest import mock
+from unittest import skipUnless
+from django.apps import apps
+from django.db import NotSupportedError, connection, transaction
+from django.db.models import F, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from vendors.models import Vendor, PurchaseOrder
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from vendors.filters import PurchaseOrderFilterBackend, VendorFilterBackend
+from vendors.models import (
+    CHANGE_LOG_LOCK_ID, RANKING_LOCK_ID, SPEND_SUMMARY_LOCK_ID, RANKING_METRICS, ArchivedPurchaseOrder, ChangeLog, DeliveryRiskScan,
+    ExchangeRate, SpendSummaryMonth, TransactionLock, Vendor, PurchaseOrder, PurchaseOrderLine, VendorMonthlySpend,
+    VendorPerformanceDaily, VendorMetricsMarker, VendorRanking, advisory_xact_lock, metric_counter_aggregates,
+    order_total, parse_line_items, spend_summary,
+)
 
 class VendorModelTest(TestCase):
 
@@ -54,6 +72,14 @@ class VendorModelTest(TestCase):
         self.assertEqual(self.vendor.on_time_delivery_rate, 50.0)  # 1 on-time out of 2
         self.assertEqual(self.vendor.quality_rating_avg, 4.0)  # Average of 4.5 and 3.5
 
+    def test_save_with_update_fields_advances_updated_at(self):
+        updated_at = self.vendor.updated_at
+        self.vendor.name = "Renamed Vendor"
+        self.vendor.save(update_fields=["name"])
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.name, "Renamed Vendor")
+        self.assertGreater(self.vendor.updated_at, updated_at)
+
 class PurchaseOrderModelTest(TestCase):
 
     def setUp(self):
@@ -96,4 +122,1143 @@ class PurchaseOrderModelTest(TestCase):
         )
         self.vendor.refresh_from_db()
         self.assertEqual(self.vendor.on_time_delivery_rate, 100.0)
-        self.assertEqual(self.vendor.quality_rating_avg, 5.0)
\ No newline at end of file
+        self.assertEqual(self.vendor.quality_rating_avg, 5.0)
+
+    def test_save_with_update_fields_advances_updated_at(self):
+        po = PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            order_date=timezone.now(),
+            delivery_date=timezone.now(),
+            items={"item": "Test Item"},
+            quantity=10,
+            status="pending",
+            issue_date=timezone.now()
+        )
+        updated_at = po.updated_at
+        po.status = "canceled"
+        po.save(update_fields=["status"])
+        po.refresh_from_db()
+        self.assertEqual(po.status, "canceled")
+        self.assertGreater(po.updated_at, updated_at)
+
+class VendorMetricCounterTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.now = timezone.now()
+        self.po = PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            order_date=self.now,
+            delivery_date=self.now + timezone.timedelta(days=5),
+            items={"item": "Test Item"},
+            quantity=10,
+            status="pending",
+            issue_date=self.now
+        )
+
+    def complete(self, po, rating, days_late=0):
+        po.status = "completed"
+        po.quality_rating = rating
+        po.delivered_date = po.delivery_date + timezone.timedelta(days=days_late)
+        po.save()
+
+    def test_completion_updates_counters(self):
+        self.complete(self.po, 4.0)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 1)
+        self.assertEqual(self.vendor.on_time_po_count, 1)
+        self.assertEqual(self.vendor.quality_rating_sum, 4.0)
+        self.assertEqual(self.vendor.quality_rating_count, 1)
+        self.assertEqual(self.vendor.on_time_delivery_rate, 100.0)
+        self.assertEqual(self.vendor.quality_rating_avg, 4.0)
+
+    def test_rating_change_applies_delta(self):
+        self.complete(self.po, 4.0)
+        late_po = PurchaseOrder.objects.create(
+            po_number="PO002",
+            vendor=self.vendor,
+            delivery_date=self.now,
+            items={"item": "Late Item"},
+            quantity=1,
+        )
+        self.complete(late_po, 2.0, days_late=1)
+        self.po.quality_rating = 5.0
+        self.po.save()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 2)
+        self.assertEqual(self.vendor.on_time_delivery_rate, 50.0)
+        self.assertEqual(self.vendor.quality_rating_avg, 3.5)
+
+    def test_reopening_and_deleting_remove_contribution(self):
+        self.complete(self.po, 4.0)
+        self.po.status = "canceled"
+        self.po.save()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 0)
+        self.assertEqual(self.vendor.on_time_delivery_rate, 0.0)
+        self.assertEqual(self.vendor.quality_rating_avg, 0.0)
+
+        self.complete(self.po, 3.0)
+        self.po.delete()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 0)
+        self.assertEqual(self.vendor.quality_rating_count, 0)
+
+    def test_moving_po_between_vendors(self):
+        other = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.complete(self.po, 4.0)
+        self.po.vendor = other
+        self.po.save()
+        self.vendor.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 0)
+        self.assertEqual(other.completed_po_count, 1)
+        self.assertEqual(other.quality_rating_avg, 4.0)
+
+    def test_non_metric_change_does_not_touch_vendor(self):
+        self.po.items = {"item": "Renamed Item"}
+        # Locking read of the previous row, savepoint, PO update, change log
+        # insert, release.
+        with self.assertNumQueries(5):
+            self.po.save()
+
+    def test_metric_update_cost_is_independent_of_history(self):
+        for i in range(20):
+            po = PurchaseOrder.objects.create(
+                po_number=f"HIST{i}",
+                vendor=self.vendor,
+                delivery_date=self.now,
+                items={"item": "History"},
+                quantity=1,
+            )
+            self.complete(po, 3.0)
+        self.po.status = "completed"
+        self.po.quality_rating = 5.0
+        self.po.delivered_date = self.now
+        # Locking read, savepoint, PO update, vendor counter update, daily
+        # rollup insert-if-missing and increment, change log insert, release.
+        with self.assertNumQueries(8):
+            self.po.save()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 21)
+        self.assertAlmostEqual(self.vendor.quality_rating_avg, 65.0 / 21)
+
+    def test_save_with_vendor_id_only_does_not_load_vendor(self):
+        po = PurchaseOrder(
+            po_number="PO_IDONLY",
+            vendor_id=self.vendor.id,
+            delivery_date=self.now,
+            delivered_date=self.now,
+            items={"item": "Id Only"},
+            quantity=1,
+            status="completed",
+            quality_rating=4.0
+        )
+        with CaptureQueriesContext(connection) as queries:
+            po.save()
+            po.status = "canceled"
+            po.save()
+            po.delete()
+        vendor_selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "vendors_vendor"' in query['sql']
+        ]
+        self.assertEqual(vendor_selects, [])
+        self.assertFalse(PurchaseOrder.vendor.is_cached(po))
+
+    def test_saving_stale_vendor_keeps_metric_counters(self):
+        stale = Vendor.objects.get(pk=self.vendor.pk)
+        self.complete(self.po, 4.0)
+        stale.name = "Renamed Vendor"
+        stale.save()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.name, "Renamed Vendor")
+        self.assertEqual(self.vendor.completed_po_count, 1)
+        self.assertEqual(self.vendor.quality_rating_avg, 4.0)
+
+    def test_full_recompute_writes_only_metric_columns(self):
+        stale = Vendor.objects.get(pk=self.vendor.pk)
+        Vendor.objects.filter(pk=self.vendor.pk).update(name="Renamed Vendor")
+        self.complete(self.po, 4.0)
+        stale.update_performance_metrics()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.name, "Renamed Vendor")
+        self.assertEqual(self.vendor.completed_po_count, 1)
+
+    def test_counters_match_full_recompute(self):
+        self.complete(self.po, 4.5)
+        PurchaseOrder.objects.create(
+            po_number="PO002",
+            vendor=self.vendor,
+            delivery_date=self.now,
+            delivered_date=self.now + timezone.timedelta(days=1),
+            items={"item": "Late Item"},
+            quantity=1,
+            status="completed",
+        )
+        self.vendor.refresh_from_db()
+        incremental = (self.vendor.on_time_delivery_rate, self.vendor.quality_rating_avg)
+        self.vendor.update_performance_metrics()
+        self.vendor.refresh_from_db()
+        self.assertEqual(incremental, (self.vendor.on_time_delivery_rate, self.vendor.quality_rating_avg))
+        self.assertEqual(incremental, (50.0, 4.5))
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN output format is SQLite specific")
+class PurchaseOrderIndexTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_vendor_status_filter_uses_composite_index(self):
+        queryset = PurchaseOrder.objects.filter(vendor=self.vendor, status='completed')
+        self.assertUsesIndex(queryset, 'po_vendor_metrics_idx')
+
+    def test_on_time_filter_uses_composite_index(self):
+        queryset = PurchaseOrder.objects.filter(
+            vendor=self.vendor, status='completed', delivered_date__lte=F('delivery_date')
+        ).values('id')
+        self.assertUsesIndex(queryset, 'po_vendor_metrics_idx')
+
+    def test_metric_aggregate_is_index_only(self):
+        queryset = self.vendor.purchaseorder_set.filter(status='completed')
+        queryset = queryset.values('vendor').annotate(**metric_counter_aggregates())
+        self.assertUsesIndex(queryset, 'COVERING INDEX po_vendor_metrics_idx')
+
+    def test_date_range_filters_use_indexes(self):
+        start = timezone.now() - timezone.timedelta(days=30)
+        self.assertUsesIndex(PurchaseOrder.objects.filter(order_date__gte=start), 'po_order_date_idx')
+        self.assertUsesIndex(PurchaseOrder.objects.filter(issue_date__range=(start, timezone.now())), 'po_issue_date_idx')
+        self.assertUsesIndex(PurchaseOrder.objects.filter(delivery_date__gte=start), 'po_delivery_date_idx')
+        self.assertUsesIndex(PurchaseOrder.objects.filter(delivered_date__lte=start), 'po_delivered_date_idx')
+
+    def test_list_filters_use_indexes(self):
+        params = {'late': 'true', 'quality_rating_min': '3', 'po_number_prefix': 'PO'}
+        for param, index_name in [('late', 'po_late_idx'), ('quality_rating_min', 'po_quality_rating_idx'),
+                                  ('po_number_prefix', 'po_number')]:
+            queryset = PurchaseOrderFilterBackend().filter_params(PurchaseOrder.objects.all(), {param: params[param]})
+            self.assertUsesIndex(queryset, index_name)
+
+    def test_ordering_uses_index(self):
+        plan = PurchaseOrder.objects.order_by('-delivery_date', 'id')[:100].explain()
+        self.assertIn('po_delivery_date_idx', plan)
+        plan = Vendor.objects.order_by('-quality_rating_avg', 'id')[:100].explain()
+        self.assertIn('vendor_quality_avg_idx', plan)
+
+    def test_at_risk_counts_use_pending_index(self):
+        now = timezone.now()
+        known = PurchaseOrder.objects.filter(pk__lte=10, delivery_date__gte=now - timezone.timedelta(hours=1))
+        self.assertUsesIndex(PurchaseOrder.at_risk_counts(now, now, known), 'po_pending_delivery_idx')
+        # Without statistics SQLite prefers scanning an index already in
+        # vendor order for the grouping; with them it sees how few orders are
+        # pending.
+        PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                po_number=f"PO{i:04}", vendor=self.vendor, delivery_date=now, items={}, quantity=1,
+                status="pending" if i % 50 == 0 else "completed",
+            )
+            for i in range(1000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertUsesIndex(PurchaseOrder.at_risk_counts(now, now), 'po_pending_delivery_idx')
+
+    def test_vendor_search_uses_expression_indexes(self):
+        request = APIRequestFactory().get('/', {'search': 'Acme'})
+        queryset = VendorFilterBackend().filter_queryset(Request(request), Vendor.objects.all(), None)
+        self.assertUsesIndex(queryset, 'vendor_name_lower_idx')
+        self.assertUsesIndex(queryset, 'vendor_code_lower_idx')
+
+
+
+class PurchaseOrderLineTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.items = [
+            {"sku": "BOLT-8", "description": "Steel bolts", "quantity": 100, "unit_price": 0.12},
+            {"sku": "NUT-8", "quantity": 50, "unit_price": "0.05"},
+        ]
+
+    def create_po(self, po_number="PO001", items=None, **fields):
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            vendor=fields.pop('vendor', self.vendor),
+            delivery_date=timezone.now(),
+            items=self.items if items is None else items,
+            quantity=150,
+            **fields
+        )
+
+    def lines(self, po):
+        return list(po.lines.order_by('line_number').values_list('vendor_id', 'sku', 'quantity', 'unit_price'))
+
+    def test_parse_line_items(self):
+        lines = parse_line_items([
+            {"sku": " A-1 ", "qty": 2, "unit_price": 1.005},
+            {"sku": "B-2"},
+            {"description": "no sku"},
+            {"sku": "C-3", "quantity": "3"},
+            {"sku": "D-4", "quantity": 1, "unit_price": "NaN"},
+            "free text",
+        ])
+        self.assertEqual([(line['sku'], line['quantity'], line['unit_price']) for line in lines], [
+            ("A-1", 2, Decimal("1.0050")), ("B-2", 1, None), ("D-4", 1, None),
+        ])
+        self.assertEqual([line['line_number'] for line in lines], [1, 2, 3])
+        self.assertEqual(parse_line_items({"item": "Free-form"}), [])
+        self.assertEqual(parse_line_items("text"), [])
+
+    def test_create_writes_lines(self):
+        po = self.create_po()
+        self.assertEqual(self.lines(po), [
+            (self.vendor.id, "BOLT-8", 100, Decimal("0.1200")),
+            (self.vendor.id, "NUT-8", 50, Decimal("0.0500")),
+        ])
+
+    def test_item_and_vendor_changes_rewrite_lines(self):
+        po = self.create_po()
+        po.items = [{"sku": "WIRE", "quantity": 1, "unit_price": 84}]
+        po.save()
+        self.assertEqual(self.lines(po), [(self.vendor.id, "WIRE", 1, Decimal("84.0000"))])
+        po.vendor = self.other_vendor
+        po.save()
+        self.assertEqual(self.lines(po), [(self.other_vendor.id, "WIRE", 1, Decimal("84.0000"))])
+        po.items = {"item": "Free-form"}
+        po.save()
+        self.assertEqual(self.lines(po), [])
+
+    def test_unrelated_change_does_not_touch_lines(self):
+        po = self.create_po()
+        po.status = "canceled"
+        with CaptureQueriesContext(connection) as queries:
+            po.save()
+        self.assertFalse(any('purchaseorderline' in query['sql'] for query in queries.captured_queries))
+
+    def test_deleting_order_deletes_lines(self):
+        po = self.create_po()
+        po.delete()
+        self.assertFalse(PurchaseOrderLine.objects.exists())
+
+    def test_backfill_migration(self):
+        po = self.create_po()
+        self.create_po("PO002", items={"item": "Free-form"})
+        PurchaseOrderLine.objects.all().delete()
+        PurchaseOrderLine.objects.create(purchase_order=po, vendor=self.vendor, line_number=1, sku="STALE", quantity=1)
+        migration = importlib.import_module('vendors.migrations.0008_backfill_purchase_order_lines')
+        with mock.patch.object(migration, 'BATCH_SIZE', 1):
+            migration.backfill_lines(apps, mock.Mock(connection=connection))
+        self.assertEqual([line[1] for line in self.lines(po)], ["BOLT-8", "NUT-8"])
+        self.assertEqual(PurchaseOrderLine.objects.count(), 2)
+
+    def test_summarize_spend_and_quantity(self):
+        self.create_po()
+        self.create_po("PO002", items=[{"sku": "BOLT-8", "quantity": 10, "unit_price": 0.15}], vendor=self.other_vendor)
+        rows = list(PurchaseOrderLine.summarize(['sku']))
+        self.assertEqual([(row['sku'], row['total_quantity'], row['purchase_order_count']) for row in rows], [
+            ("BOLT-8", 110, 2), ("NUT-8", 50, 1),
+        ])
+        self.assertEqual(rows[0]['spend'], Decimal("13.5000"))
+
+    def test_summaries_use_covering_indexes(self):
+        plan = PurchaseOrderLine.summarize(['vendor'], PurchaseOrderLine.objects.filter(sku="BOLT-8")).explain()
+        self.assertIn('COVERING INDEX po_line_sku_idx', plan)
+        plan = PurchaseOrderLine.summarize(['sku'], PurchaseOrderLine.objects.filter(vendor=self.vendor)).explain()
+        self.assertIn('COVERING INDEX po_line_vendor_sku_idx', plan)
+
+
+class VendorRankingTest(TestCase):
+
+    def setUp(self):
+        self.vendors = [
+            Vendor.objects.create(
+                name=f"Vendor {i}",
+                contact_details="123 Test Street",
+                address="456 Vendor Avenue",
+                vendor_code=f"VEND{i}"
+            )
+            for i in range(12)
+        ]
+
+    def set_metrics(self, vendor, rate, completed, avg, rated):
+        Vendor.objects.filter(pk=vendor.pk).update(
+            on_time_delivery_rate=rate, completed_po_count=completed,
+            quality_rating_avg=avg, quality_rating_count=rated,
+        )
+
+    def expected_ranks(self):
+        expected = {}
+        for metric, (rank_field, volume) in RANKING_METRICS.items():
+            rows = Vendor.objects.filter(**{f'{volume}__gt': 0}).values('pk', metric, volume)
+            ordered = sorted(rows, key=lambda row: (-row[metric], -row[volume], row['pk']))
+            expected[rank_field] = {row['pk']: rank for rank, row in enumerate(ordered, start=1)}
+        return expected
+
+    def stored_ranks(self):
+        stored = {}
+        for rank_field, _ in RANKING_METRICS.values():
+            rows = VendorRanking.objects.filter(**{f'{rank_field}__isnull': False}).values_list('pk', rank_field)
+            stored[rank_field] = dict(rows)
+        return stored
+
+    def test_incremental_refresh_matches_full_ranking(self):
+        rng = random.Random(18)
+        for _ in range(40):
+            changed = rng.sample(self.vendors, rng.randint(1, 3))
+            for vendor in changed:
+                # Few distinct values so ties on the metric and volume occur.
+                self.set_metrics(
+                    vendor, rng.choice([0.0, 50.0, 100.0]), rng.choice([0, 2, 4]),
+                    rng.choice([3.0, 4.5]), rng.choice([0, 1, 3]),
+                )
+            VendorRanking.refresh([vendor.pk for vendor in changed])
+            self.assertEqual(self.stored_ranks(), self.expected_ranks())
+
+        self.vendors[3].delete()
+        self.assertEqual(self.stored_ranks(), self.expected_ranks())
+        VendorRanking.rebuild()
+        self.assertEqual(self.stored_ranks(), self.expected_ranks())
+
+    def test_ties_break_on_volume_then_id(self):
+        first, second, third = self.vendors[:3]
+        self.set_metrics(third, 90.0, 10, 4.0, 10)
+        self.set_metrics(second, 90.0, 10, 4.0, 10)
+        self.set_metrics(first, 90.0, 5, 4.0, 20)
+        VendorRanking.refresh([first.pk, second.pk, third.pk])
+        ranks = self.stored_ranks()
+        self.assertEqual(ranks['on_time_rank'], {second.pk: 1, third.pk: 2, first.pk: 3})
+        self.assertEqual(ranks['quality_rank'], {first.pk: 1, second.pk: 2, third.pk: 3})
+
+    def test_percentile(self):
+        self.assertEqual(VendorRanking.percentile(1, 5), 100.0)
+        self.assertEqual(VendorRanking.percentile(5, 5), 0.0)
+        self.assertEqual(VendorRanking.percentile(2, 3), 50.0)
+        self.assertEqual(VendorRanking.percentile(1, 1), 100.0)
+        self.assertIsNone(VendorRanking.percentile(None, 3))
+
+    def test_metric_update_refreshes_ranking_after_commit(self):
+        leader, vendor = self.vendors[:2]
+        self.set_metrics(leader, 50.0, 2, 4.0, 2)
+        VendorRanking.refresh([leader.pk])
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            PurchaseOrder.objects.create(
+                po_number="PO_RANK",
+                vendor=vendor,
+                delivery_date=now,
+                delivered_date=now - timezone.timedelta(hours=1),
+                items={"item": "Ranked"},
+                quantity=1,
+                status="completed",
+                quality_rating=5.0
+            )
+        ranking = VendorRanking.objects.get(vendor=vendor)
+        self.assertEqual((ranking.on_time_rank, ranking.quality_rank), (1, 1))
+        self.assertEqual(VendorRanking.objects.get(vendor=leader).on_time_rank, 2)
+
+    @override_settings(VENDORS_RANKING_INCREMENTAL_LIMIT=2)
+    def test_large_refresh_rebuilds(self):
+        with mock.patch.object(VendorRanking, 'rebuild') as rebuild:
+            VendorRanking.refresh([vendor.pk for vendor in self.vendors[:3]])
+        rebuild.assert_called_once_with()
+
+    def test_top_k_uses_rank_index(self):
+        for rank_field, volume in RANKING_METRICS.values():
+            plan = VendorRanking.objects.filter(
+                **{f'{rank_field}__isnull': False, f'{volume}__gte': 5}
+            ).order_by(rank_field)[:10].explain()
+            self.assertIn(f'ranking_{rank_field.replace("_rank", "")}_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+class VendorArchivalTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        now = timezone.now()
+        self.orders = [
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=self.vendor,
+                delivery_date=now,
+                delivered_date=now,
+                items=[{"sku": "BOLT-8", "quantity": 10, "unit_price": 0.12}],
+                quantity=10,
+                status="completed",
+                quality_rating=4.0
+            )
+            for i in range(5)
+        ]
+
+    def test_archive_orders_moves_one_batch(self):
+        self.vendor.archive()
+        self.assertEqual(ArchivedPurchaseOrder.archive_orders(self.vendor, batch_size=2), 2)
+        archived = ArchivedPurchaseOrder.objects.order_by("id")
+        self.assertEqual([order.id for order in archived], [order.id for order in self.orders[:2]])
+        self.assertEqual(archived[0].po_number, "PO000")
+        self.assertEqual(archived[0].vendor_id, self.vendor.id)
+        self.assertEqual(archived[0].vendor_code, "VEND123")
+        self.assertEqual(archived[0].items, self.orders[0].items)
+        self.assertEqual(PurchaseOrder.objects.count(), 3)
+        self.assertEqual(PurchaseOrderLine.objects.count(), 3)
+
+    def test_archive_orders_requires_archived_vendor(self):
+        self.assertIsNone(ArchivedPurchaseOrder.archive_orders(self.vendor))
+        self.assertEqual(PurchaseOrder.objects.count(), 5)
+
+    def test_batch_cost_does_not_grow_with_batch_size(self):
+        self.vendor.archive()
+        with CaptureQueriesContext(connection) as small:
+            ArchivedPurchaseOrder.archive_orders(self.vendor, batch_size=1)
+        with CaptureQueriesContext(connection) as large:
+            ArchivedPurchaseOrder.archive_orders(self.vendor, batch_size=4)
+        self.assertEqual(len(small), len(large))
+
+    def test_purge_vendor_reports_progress_and_deletes_vendor(self):
+        self.vendor.archive()
+        progress = []
+        moved = ArchivedPurchaseOrder.purge_vendor(self.vendor, batch_size=2, progress=progress.append)
+        self.assertEqual(moved, 5)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertFalse(Vendor.objects.filter(pk=self.vendor.pk).exists())
+        self.assertFalse(VendorPerformanceDaily.objects.exists())
+        self.assertEqual(ArchivedPurchaseOrder.objects.count(), 5)
+
+    def test_restored_vendor_is_not_purged(self):
+        self.vendor.archive()
+        self.vendor.restore()
+        self.assertIsNone(ArchivedPurchaseOrder.purge_vendor(self.vendor))
+        self.assertTrue(Vendor.objects.filter(pk=self.vendor.pk).exists())
+
+    def test_archived_vendor_leaves_rankings(self):
+        VendorRanking.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendor.archive()
+        self.assertFalse(VendorRanking.objects.filter(vendor=self.vendor).exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendor.restore()
+        self.assertEqual(VendorRanking.objects.get(vendor=self.vendor).on_time_rank, 1)
+
+    def test_large_history(self):
+        with override_settings(VENDORS_PURGE_BATCH_SIZE=5):
+            self.assertFalse(self.vendor.has_large_history())
+        with override_settings(VENDORS_PURGE_BATCH_SIZE=4):
+            self.assertTrue(self.vendor.has_large_history())
+
+class DeliveryRiskScanTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.now = timezone.now()
+        self.window = timezone.timedelta(hours=48)
+        self.count = 0
+
+    def create(self, hours, vendor=None, status="pending"):
+        self.count += 1
+        return PurchaseOrder.objects.create(
+            po_number=f"PO{self.count:03}",
+            vendor=vendor or self.vendor,
+            delivery_date=self.now + timezone.timedelta(hours=hours),
+            items={"item": "Test Item"},
+            quantity=1,
+            status=status
+        )
+
+    def scan(self, hours):
+        return DeliveryRiskScan.run(self.window, now=self.now + timezone.timedelta(hours=hours))
+
+    def test_first_scan_counts_every_pending_order_in_window(self):
+        self.create(-100)
+        self.create(-1, vendor=self.other_vendor)
+        self.create(10)
+        self.create(100)
+        self.create(-5, status="completed")
+        self.create(-5, status="canceled")
+        scan = self.scan(0)
+        self.assertEqual((scan.overdue_count, scan.due_soon_count), (2, 1))
+        self.assertEqual(scan.vendor_counts, {
+            str(self.vendor.id): {"overdue": 1, "due_soon": 1},
+            str(self.other_vendor.id): {"overdue": 1, "due_soon": 0},
+        })
+
+    def test_later_scans_only_report_new_candidates(self):
+        self.create(-100)
+        self.create(10)
+        self.create(60)
+        self.scan(0)
+        scan = self.scan(1)
+        self.assertEqual((scan.overdue_count, scan.due_soon_count), (0, 0))
+        # Twelve hours on: the order due at +10h is now overdue and the one
+        # due at +60h entered the window.
+        scan = self.scan(13)
+        self.assertEqual((scan.overdue_count, scan.due_soon_count), (1, 1))
+        self.assertEqual((self.scan(14).overdue_count, self.scan(14).due_soon_count), (0, 0))
+
+    def test_new_orders_are_read_by_id(self):
+        self.scan(0)
+        self.create(-30)
+        self.create(5)
+        self.create(-30, status="completed")
+        scan = self.scan(1)
+        self.assertEqual((scan.overdue_count, scan.due_soon_count), (1, 1))
+        self.assertEqual(self.scan(2).overdue_count, 0)
+
+    def test_orders_committed_behind_a_higher_id_are_counted(self):
+        self.create(-30)
+        late = self.create(5)
+        self.create(5)
+        PurchaseOrder.objects.filter(pk=late.pk).delete()
+        self.scan(0)
+        # An order whose id was allocated before the last scan but which
+        # committed after it.
+        late.save(force_insert=True)
+        scan = self.scan(1)
+        self.assertEqual((scan.overdue_count, scan.due_soon_count), (0, 1))
+        self.assertEqual((self.scan(2).overdue_count, self.scan(2).due_soon_count), (0, 0))
+
+    @override_settings(VENDORS_AT_RISK_SCAN_OVERLAP=1)
+    def test_mark_trails_the_highest_id_by_the_overlap(self):
+        first = self.create(10)
+        second = self.create(60)
+        scan = self.scan(0)
+        self.assertEqual((scan.settled_purchase_order_id, scan.recent_purchase_order_ids), (first.pk, [second.pk]))
+        third = self.create(100)
+        scan = self.scan(1)
+        self.assertEqual((scan.settled_purchase_order_id, scan.recent_purchase_order_ids), (second.pk, [third.pk]))
+        # Both earlier orders are now behind the mark and cross a boundary.
+        scan = self.scan(13)
+        self.assertEqual((scan.overdue_count, scan.due_soon_count), (1, 1))
+
+    def test_completed_orders_drop_out(self):
+        po = self.create(10)
+        self.scan(0)
+        po.status = "completed"
+        po.delivered_date = self.now
+        po.save()
+        self.assertEqual(self.scan(13).overdue_count, 0)
+
+class AdvisoryLockTest(TestCase):
+
+    def test_mysql_locks_a_row_per_lock_id(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'), transaction.atomic():
+            advisory_xact_lock(RANKING_LOCK_ID)
+            advisory_xact_lock(RANKING_LOCK_ID)
+            advisory_xact_lock(CHANGE_LOG_LOCK_ID)
+        self.assertEqual(
+            sorted(TransactionLock.objects.values_list('pk', flat=True)), sorted([RANKING_LOCK_ID, CHANGE_LOG_LOCK_ID])
+        )
+
+    def test_backends_without_a_lock_are_refused(self):
+        with mock.patch.object(connection, 'vendor', 'oracle'), transaction.atomic():
+            with self.assertRaises(NotSupportedError):
+                advisory_xact_lock(RANKING_LOCK_ID)
+
+class ChangeLogTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.now = timezone.now()
+
+    def create_po(self, po_number, **fields):
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            vendor=self.vendor,
+            delivery_date=self.now,
+            items={"item": "Test Item"},
+            quantity=1,
+            **fields
+        )
+
+    def entries(self, since=0):
+        return list(
+            ChangeLog.objects.filter(seq__gt=since).order_by('seq').values_list('kind', 'object_id', 'deleted')
+        )
+
+    def last_seq(self):
+        return ChangeLog.objects.order_by('-seq').values_list('seq', flat=True).first()
+
+    def test_appends_hold_the_log_lock_on_mysql(self):
+        # Without a lock held to commit, MySQL could commit a lower seq after
+        # a consumer has read past it.
+        with mock.patch.object(connection, 'vendor', 'mysql'), transaction.atomic():
+            ChangeLog.record(vendors=[self.vendor.pk])
+        self.assertTrue(TransactionLock.objects.filter(pk=CHANGE_LOG_LOCK_ID).exists())
+
+    def test_writes_append_entries_in_order(self):
+        self.assertEqual(self.entries(), [('vendor', self.vendor.id, False)])
+        po = self.create_po("PO001")
+        mark = self.last_seq()
+        po.status = "completed"
+        po.delivered_date = self.now
+        po.save()
+        # Completing the order changed the vendor's metrics as well.
+        self.assertEqual(self.entries(mark), [('vendor', self.vendor.id, False), ('purchase_order', po.id, False)])
+        mark = self.last_seq()
+        po_id = po.id
+        po.delete()
+        self.assertEqual(self.entries(mark), [('vendor', self.vendor.id, False), ('purchase_order', po_id, True)])
+
+    def test_updated_at_follows_changes(self):
+        po = self.create_po("PO001")
+        first = po.updated_at
+        po.quantity = 2
+        po.save()
+        self.assertGreater(po.updated_at, first)
+        before = Vendor.objects.get(pk=self.vendor.pk).updated_at
+        po.status = "completed"
+        po.delivered_date = self.now
+        po.save()
+        self.assertGreater(Vendor.objects.get(pk=self.vendor.pk).updated_at, before)
+
+    def test_vendor_delete_tombstones_cascaded_orders(self):
+        po = self.create_po("PO001")
+        mark = self.last_seq()
+        vendor_id = self.vendor.id
+        self.vendor.delete()
+        self.assertEqual(self.entries(mark), [('vendor', vendor_id, True), ('purchase_order', po.id, True)])
+
+    def test_archive_and_purge_are_recorded(self):
+        po = self.create_po("PO001")
+        mark = self.last_seq()
+        self.vendor.archive()
+        ArchivedPurchaseOrder.archive_orders(self.vendor)
+        self.assertEqual(self.entries(mark), [('vendor', self.vendor.id, False), ('purchase_order', po.id, True)])
+
+    def test_unchanged_rebuild_records_nothing(self):
+        po = self.create_po("PO001", status="completed", delivered_date=self.now, quality_rating=4.0)
+        mark = self.last_seq()
+        Vendor.rebuild_performance_metrics()
+        self.assertEqual(self.entries(mark), [])
+        PurchaseOrder.objects.filter(pk=po.pk).update(quality_rating=2.0)
+        Vendor.rebuild_performance_metrics()
+        self.assertEqual(self.entries(mark), [('vendor', self.vendor.id, False)])
+
+    def test_changes_keep_latest_entry_per_row(self):
+        po = self.create_po("PO001")
+        po.save()
+        po.save()
+        entries, token, more = ChangeLog.changes(0, 10)
+        self.assertEqual([(entry['kind'], entry['object_id']) for entry in entries], [
+            ('vendor', self.vendor.id), ('purchase_order', po.id),
+        ])
+        self.assertEqual(token, self.last_seq())
+        self.assertFalse(more)
+        entries, token, more = ChangeLog.changes(0, 1)
+        self.assertEqual(len(entries), 1)
+        self.assertTrue(more)
+
+    def test_compact_drops_superseded_entries(self):
+        po = self.create_po("PO001")
+        po.save()
+        po.save()
+        other = self.create_po("PO002")
+        other_id = other.id
+        other.delete()
+        self.assertEqual(ChangeLog.compact(batch_size=2), 3)
+        self.assertEqual(self.entries(), [
+            ('vendor', self.vendor.id, False), ('purchase_order', po.id, False), ('purchase_order', other_id, True),
+        ])
+
+class SpendAnalyticsTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.march = timezone.datetime(2025, 3, 10, 12, tzinfo=timezone.utc)
+        self.april = timezone.datetime(2025, 4, 5, 12, tzinfo=timezone.utc)
+
+    def create_po(self, po_number, order_date, quantity=2, unit_price="5.00", **fields):
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            vendor=self.vendor,
+            order_date=order_date,
+            delivery_date=order_date + timezone.timedelta(days=7),
+            items=[{"sku": "SKU-1", "quantity": quantity, "unit_price": unit_price}],
+            quantity=quantity,
+            **fields
+        )
+
+    def summarize(self, group_by=("month",)):
+        rows = VendorMonthlySpend.summarize(
+            timezone.datetime(2025, 3, 1).date(), timezone.datetime(2025, 4, 1).date(), list(group_by)
+        )
+        return sorted((spend_summary(row) for row in rows), key=lambda row: row.get("month") or 0)
+
+    def test_total_amount_follows_items(self):
+        po = self.create_po("PO001", self.march, quantity=3, unit_price="2.50")
+        self.assertEqual(po.total_amount, Decimal("7.5"))
+        po.items = [{"sku": "SKU-1", "quantity": 1, "unit_price": 4}, {"sku": "SKU-2", "quantity": 2}]
+        po.save(update_fields=["items"])
+        po.refresh_from_db()
+        self.assertEqual(po.total_amount, Decimal("4"))
+        po.items = {"item": "Free-form item"}
+        po.save()
+        po.refresh_from_db()
+        self.assertIsNone(po.total_amount)
+        self.assertIsNone(order_total([]))
+
+    def test_aggregates_spend_orders_and_lead_time_in_base_currency(self):
+        self.create_po("PO001", self.march, status="completed", delivered_date=self.march + timezone.timedelta(days=2))
+        self.create_po("PO002", self.march, status="completed", delivered_date=self.march + timezone.timedelta(days=4))
+        self.create_po("PO003", self.march, currency="EUR")
+        self.create_po("PO004", self.april, currency="EUR")
+        self.create_po("PO005", self.april, currency="GBP")
+        self.create_po("PO006", self.april, status="canceled")
+        ExchangeRate.objects.create(currency="EUR", valid_from=self.april.date(), rate=Decimal("1.5"))
+
+        march, april = self.summarize()
+        # The EUR order in March predates the first EUR rate.
+        self.assertEqual(march["month"], self.march.date().replace(day=1))
+        self.assertEqual((march["order_count"], march["delivered_order_count"]), (3, 2))
+        self.assertEqual(march["unconverted_order_count"], 1)
+        self.assertEqual(march["spend"], Decimal("20"))
+        self.assertEqual(march["avg_lead_time_days"], 3.0)
+        self.assertEqual((april["order_count"], april["unconverted_order_count"]), (2, 1))
+        self.assertEqual(april["spend"], Decimal("15"))
+        self.assertIsNone(april["avg_lead_time_days"])
+
+    def test_reads_cached_months_and_aggregates_the_rest(self):
+        self.create_po("PO001", self.march)
+        self.create_po("PO002", self.april)
+        self.assertEqual(VendorMonthlySpend.materialize(self.march.date().replace(day=1)), 1)
+        VendorMonthlySpend.objects.update(order_count=5)
+
+        march, april = self.summarize()
+        self.assertEqual(march["order_count"], 5)
+        self.assertEqual(april["order_count"], 1)
+        [total] = self.summarize(["vendor"])
+        self.assertEqual((total["vendor"], total["order_count"], total["spend"]), (self.vendor.pk, 6, Decimal("20")))
+
+    def test_writes_drop_cached_months(self):
+        po = self.create_po("PO001", self.march)
+        march = self.march.date().replace(day=1)
+        VendorMonthlySpend.materialize(march)
+        po.order_date = self.april
+        po.save()
+        self.assertFalse(SpendSummaryMonth.objects.exists())
+        self.assertFalse(VendorMonthlySpend.objects.exists())
+
+        VendorMonthlySpend.materialize(march)
+        ExchangeRate.objects.create(currency="EUR", valid_from=self.april.date(), rate=Decimal("1.5"))
+        self.assertTrue(SpendSummaryMonth.objects.filter(month=march).exists())
+        ExchangeRate.objects.create(currency="EUR", valid_from=self.march.date(), rate=Decimal("1.5"))
+        self.assertFalse(SpendSummaryMonth.objects.exists())
+
+    def test_cache_writes_hold_the_summary_lock_on_mysql(self):
+        # A materialize interleaved with an invalidate would store a stale
+        # month; both take the same lock.
+        self.create_po("PO001", self.march)
+        march = self.march.date().replace(day=1)
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            VendorMonthlySpend.materialize(march)
+            self.assertTrue(TransactionLock.objects.filter(pk=SPEND_SUMMARY_LOCK_ID).exists())
+            TransactionLock.objects.all().delete()
+            with transaction.atomic():
+                VendorMonthlySpend.invalidate([self.march])
+            self.assertTrue(TransactionLock.objects.filter(pk=SPEND_SUMMARY_LOCK_ID).exists())
+        self.assertFalse(SpendSummaryMonth.objects.exists())
+
+    def test_current_month_writes_skip_invalidation(self):
+        with self.assertRaises(ValueError):
+            VendorMonthlySpend.materialize(timezone.localdate().replace(day=1))
+        po = self.create_po("PO001", timezone.now())
+        with CaptureQueriesContext(connection) as queries:
+            po.delete()
+        self.assertFalse(any("vendormonthlyspend" in query["sql"] for query in queries))
+
+
+class VendorPerformanceDailyTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.today = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+
+    def create_completed(self, po_number, days_ago, rating, late=False):
+        delivered = self.today - timezone.timedelta(days=days_ago)
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            vendor=self.vendor,
+            delivery_date=delivered - timezone.timedelta(hours=1) if late else delivered,
+            delivered_date=delivered,
+            items={"item": "Rolled up"},
+            quantity=1,
+            status="completed",
+            quality_rating=rating
+        )
+
+    def rollups(self):
+        return {
+            row.day: (row.completed_po_count, row.on_time_po_count, row.quality_rating_sum, row.quality_rating_count)
+            for row in VendorPerformanceDaily.objects.filter(vendor=self.vendor)
+        }
+
+    def test_completion_is_rolled_up_on_delivery_day(self):
+        self.create_completed("PO001", 0, 4.0)
+        self.create_completed("PO002", 0, 2.0, late=True)
+        self.create_completed("PO003", 40, 5.0)
+        self.assertEqual(self.rollups(), {
+            self.today.date(): (2, 1, 6.0, 2),
+            (self.today - timezone.timedelta(days=40)).date(): (1, 1, 5.0, 1),
+        })
+
+    def test_changing_delivery_day_moves_contribution(self):
+        po = self.create_completed("PO001", 0, 4.0)
+        po.delivered_date = self.today - timezone.timedelta(days=3)
+        po.save()
+        self.assertEqual(self.rollups(), {(self.today - timezone.timedelta(days=3)).date(): (1, 1, 4.0, 1)})
+        po.status = "canceled"
+        po.save()
+        self.assertFalse(VendorPerformanceDaily.objects.exists())
+
+    def test_moved_contributions_leave_no_empty_periods(self):
+        self.create_completed("PO001", 0, 4.0)
+        po = self.create_completed("PO002", 3, 2.0)
+        po.delivered_date = self.today
+        po.save()
+        self.assertEqual(self.rollups(), {self.today.date(): (2, 1, 6.0, 2)})
+        summary = VendorPerformanceDaily.summarize(self.vendor.pk, interval='day')
+        self.assertEqual([point['period'] for point in summary['series']], [self.today.date()])
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.create_completed("PO001", 0, 4.0)
+        self.create_completed("PO002", 10, 3.0, late=True)
+        incremental = self.rollups()
+        VendorPerformanceDaily.objects.all().delete()
+        Vendor.rebuild_performance_metrics()
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_summarize_window_and_series(self):
+        self.create_completed("PO001", 0, 4.0)
+        self.create_completed("PO002", 5, 2.0, late=True)
+        self.create_completed("PO003", 100, 5.0)
+        today = self.today.date()
+        summary = VendorPerformanceDaily.summarize(self.vendor.pk, today - timezone.timedelta(days=29), today, 'day')
+        self.assertEqual(summary['completed_po_count'], 2)
+        self.assertEqual(summary['on_time_delivery_rate'], 50.0)
+        self.assertEqual(summary['quality_rating_avg'], 3.0)
+        self.assertEqual([point['period'] for point in summary['series']], [
+            today - timezone.timedelta(days=5), today
+        ])
+        lifetime = VendorPerformanceDaily.summarize(self.vendor.pk)
+        self.assertEqual(lifetime['completed_po_count'], 3)
+        self.assertNotIn('series', lifetime)
+
+
+
+@override_settings(VENDORS_METRICS_MODE='deferred')
+class DeferredMetricsTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.now = timezone.now()
+
+    def create_completed(self, po_number, rating):
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            vendor=self.vendor,
+            delivery_date=self.now,
+            delivered_date=self.now,
+            items={"item": "Deferred"},
+            quantity=1,
+            status="completed",
+            quality_rating=rating
+        )
+
+    def test_save_enqueues_marker_without_touching_vendor(self):
+        self.create_completed("PO001", 4.0)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 0)
+        self.assertEqual(VendorMetricsMarker.objects.filter(vendor=self.vendor).count(), 1)
+        self.assertFalse(VendorPerformanceDaily.objects.exists())
+
+    def test_non_metric_change_is_not_queued(self):
+        po = self.create_completed("PO001", 4.0)
+        VendorMetricsMarker.objects.all().delete()
+        po.items = {"item": "Renamed"}
+        po.save()
+        self.assertFalse(VendorMetricsMarker.objects.exists())
+
+    def test_worker_coalesces_markers(self):
+        for i in range(3):
+            self.create_completed(f"PO{i:03}", 2.0 + i)
+        self.assertEqual(VendorMetricsMarker.objects.count(), 3)
+        self.assertEqual(VendorMetricsMarker.process_batch(), 1)
+        self.assertFalse(VendorMetricsMarker.objects.exists())
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 3)
+        self.assertEqual(self.vendor.quality_rating_avg, 3.0)
+        self.assertEqual(VendorPerformanceDaily.objects.get(vendor=self.vendor).completed_po_count, 3)
+        self.assertEqual(VendorMetricsMarker.process_batch(), 0)
+
+    def test_queue_status_reports_lag(self):
+        self.create_completed("PO001", 4.0)
+        VendorMetricsMarker.objects.update(enqueued_at=self.now - timezone.timedelta(minutes=5))
+        status = VendorMetricsMarker.queue_status()
+        self.assertEqual(status['pending_markers'], 1)
+        self.assertEqual(status['pending_vendors'], 1)
+        self.assertEqual(status['mode'], 'deferred')
+        self.assertGreaterEqual(status['lag_seconds'], 300)
+
+
+class ConcurrentMetricUpdateTest(TransactionTestCase):
+    """
+    Hammers a few vendors with parallel purchase order updates, vendor edits
+    and full rebuilds, then checks the incrementally maintained counters and
+    rollups against a recompute from scratch. On SQLite (in WAL mode)
+    writers queue on BEGIN IMMEDIATE; on PostgreSQL the row locks are
+    exercised directly.
+    """
+    threads = 8
+    updates_per_thread = 250
+
+    def setUp(self):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode=WAL")
+        self.vendors = [
+            Vendor.objects.create(
+                name=f"Vendor {i}",
+                contact_details="123 Test Street",
+                address="456 Vendor Avenue",
+                vendor_code=f"VEND{i}"
+            )
+            for i in range(3)
+        ]
+        self.now = timezone.now()
+        self.po_ids = [
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=self.vendors[i % 3],
+                delivery_date=self.now,
+                items={"item": "Stress"},
+                quantity=1,
+            ).pk
+            for i in range(30)
+        ]
+
+    def update_purchase_orders(self, seed, errors):
+        rng = random.Random(seed)
+        try:
+            for _ in range(self.updates_per_thread):
+                po = PurchaseOrder.objects.get(pk=rng.choice(self.po_ids))
+                po.vendor_id = rng.choice(self.vendors).pk
+                po.status = rng.choice(["pending", "completed", "completed", "canceled"])
+                po.delivered_date = self.now + timezone.timedelta(days=rng.randint(-3, 2))
+                po.quality_rating = rng.choice([None, 1.0, 2.5, 4.0, 5.0])
+                po.save()
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def edit_and_rebuild_vendors(self, stop, errors):
+        rng = random.Random(-1)
+        try:
+            while not stop.is_set():
+                vendor = Vendor.objects.get(pk=rng.choice(self.vendors).pk)
+                vendor.address = f"{rng.randint(1, 999)} Vendor Avenue"
+                vendor.save()
+                Vendor.rebuild_performance_metrics(batch_size=2)
+                stop.wait(0.05)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_parallel_updates_keep_metrics_exact(self):
+        errors = []
+        stop = threading.Event()
+        maintenance = threading.Thread(target=self.edit_and_rebuild_vendors, args=(stop, errors))
+        writers = [
+            threading.Thread(target=self.update_purchase_orders, args=(seed, errors))
+            for seed in range(self.threads)
+        ]
+        maintenance.start()
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        stop.set()
+        maintenance.join()
+        self.assertEqual(errors, [])
+
+        for vendor in Vendor.objects.all():
+            expected = PurchaseOrder.objects.filter(vendor=vendor).aggregate(**metric_counter_aggregates())
+            for field, value in expected.items():
+                self.assertAlmostEqual(getattr(vendor, field), value or 0, msg=field)
+            daily = VendorPerformanceDaily.objects.filter(vendor=vendor).aggregate(
+                completed=Sum("completed_po_count"), on_time=Sum("on_time_po_count")
+            )
+            self.assertEqual(daily["completed"] or 0, expected["completed_po_count"])
+            self.assertEqual(daily["on_time"] or 0, expected["on_time_po_count"])
+            expected_rate = (
+                expected["on_time_po_count"] / expected["completed_po_count"] * 100
+                if expected["completed_po_count"] else 0.0
+            )
+            self.assertAlmostEqual(vendor.on_time_delivery_rate, expected_rate)
@@ -1,6 +1,9 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from vendors.models import Vendor, PurchaseOrder
+from vendors.renderers import FastJSONRenderer
 from vendors.serializers import VendorSerializer, PurchaseOrderSerializer, PerformanceMetricsSerializer
 from django.utils import timezone
 
@@ -19,7 +22,7 @@ class VendorSerializerTest(TestCase):
         data = serializer.data
         self.assertEqual(set(data.keys()), {
             'id', 'name', 'contact_details', 'address',
-            'vendor_code', 'on_time_delivery_rate', 'quality_rating_avg'
+            'vendor_code', 'on_time_delivery_rate', 'quality_rating_avg', 'updated_at'
         })
 
 class PurchaseOrderSerializerTest(TestCase):
@@ -57,6 +60,21 @@ class PurchaseOrderSerializerTest(TestCase):
         self.assertFalse(serializer.is_valid())
         self.assertIn('quality_rating', serializer.errors)
 
+    def test_purchase_order_serializer_currency_and_total(self):
+        data = {
+            **self.valid_data,
+            "items": [{"sku": "SKU-1", "quantity": 4, "unit_price": "2.50"}],
+            "total_amount": "1.00",
+        }
+        serializer = PurchaseOrderSerializer(data={**data, "currency": "usd"})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('currency', serializer.errors)
+        serializer = PurchaseOrderSerializer(data={**data, "currency": "EUR"})
+        self.assertTrue(serializer.is_valid())
+        po = serializer.save()
+        self.assertEqual(PurchaseOrderSerializer(po).data['total_amount'], "10.0000")
+        self.assertEqual(PurchaseOrderSerializer(po).data['currency'], "EUR")
+
 class PerformanceMetricsSerializerTest(TestCase):
 
     def setUp(self):
@@ -76,4 +94,81 @@ class PerformanceMetricsSerializerTest(TestCase):
             'on_time_delivery_rate', 'quality_rating_avg'
         })
         self.assertEqual(data['on_time_delivery_rate'], 95.0)
-        self.assertEqual(data['quality_rating_avg'], 4.5)
\ No newline at end of file
+        self.assertEqual(data['quality_rating_avg'], 4.5)
+
+class ValuesRowContractTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Vendör \u2028 \"Ünïcode\"",
+            contact_details="line 1\nline 2",
+            address="\u2029 Street",
+            vendor_code="VEND123",
+            on_time_delivery_rate=66.66666666666667,
+            quality_rating_avg=4.5
+        )
+        PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            order_date=timezone.now().replace(microsecond=123456),
+            delivery_date=timezone.now().replace(microsecond=0),
+            items=[{"sku": "Ä-1", "unit_price": 1e-05, "tags": ["x", None, True]}, {"note": "\u2028"}],
+            quantity=3,
+            status="completed",
+            quality_rating=3.3,
+            delivered_date=timezone.now()
+        )
+        PurchaseOrder.objects.create(
+            po_number="PO002",
+            vendor=self.vendor,
+            delivery_date=timezone.now(),
+            items={},
+            quantity=0
+        )
+
+    def assertSameJSON(self, serializer_class, queryset, fields=None):
+        instances = list(queryset.order_by('id'))
+        expected = serializer_class(instances, many=True).data
+        columns, transform = serializer_class().values_reader()
+        rows = [transform(row) for row in queryset.order_by('id').values(*columns)]
+        if fields is not None:
+            expected = [{name: item[name] for name in fields} for item in expected]
+            rows = [{name: row[name] for name in fields} for row in rows]
+        self.assertEqual(FastJSONRenderer().render(rows), JSONRenderer().render(expected))
+
+    def test_purchase_order_rows_match_serializer(self):
+        self.assertSameJSON(PurchaseOrderSerializer, PurchaseOrder.objects.all())
+
+    def test_vendor_rows_match_serializer(self):
+        self.assertSameJSON(VendorSerializer, Vendor.objects.all())
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_datetimes_use_current_time_zone(self):
+        self.assertSameJSON(PurchaseOrderSerializer, PurchaseOrder.objects.all())
+
+    def test_field_order_matches_serializer(self):
+        columns, transform = PurchaseOrderSerializer().values_reader()
+        row = transform(PurchaseOrder.objects.values(*columns).first())
+        self.assertEqual(list(row), list(PurchaseOrderSerializer().fields))
+
+    def test_instance_only_fields_disable_fast_path(self):
+        class DescribedVendorSerializer(VendorSerializer):
+            description = serializers.SerializerMethodField()
+
+            def get_description(self, vendor):
+                return str(vendor)
+
+        self.assertIsNone(DescribedVendorSerializer().values_reader())
+
+    def test_fast_renderer_matches_json_renderer(self):
+        payloads = [
+            {"name": "\u2028\u2029ü", "values": [1, 2.5, 1e+16, -0.0, None, True], "nested": {"a": []}},
+            [],
+            "plain",
+        ]
+        for data in payloads:
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render({"a": 1}, 'application/json; indent=2'),
+            JSONRenderer().render({"a": 1}, 'application/json; indent=2'),
+        )
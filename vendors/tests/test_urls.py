@@ -1,6 +1,12 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import SimpleTestCase
 from django.urls import reverse, resolve
 from rest_framework import status
 from rest_framework.test import APITestCase
+from vendors import async_views
 from vendors.views import VendorViewSet, PurchaseOrderViewSet
 from vendors.models import Vendor, PurchaseOrder
 from django.utils import timezone
@@ -53,4 +59,43 @@ class URLRoutingTest(APITestCase):
             issue_date=timezone.now()
         )
         url = reverse('purchaseorder-detail', args=[po.id])
-        self.assertEqual(resolve(url).func.cls, PurchaseOrderViewSet)
\ No newline at end of file
+        self.assertEqual(resolve(url).func.cls, PurchaseOrderViewSet)
+
+    def test_purchase_order_bulk_url(self):
+        url = reverse('purchaseorder-bulk')
+        self.assertEqual(url, '/api/purchase_orders/bulk/')
+        self.assertEqual(resolve(url).func.cls, PurchaseOrderViewSet)
+
+    def test_async_api_urls(self):
+        self.assertIs(resolve(reverse('async-vendor-list')).func, async_views.vendor_list)
+        self.assertEqual(reverse('async-vendor-list'), '/api/async/vendors/')
+        self.assertEqual(reverse('async-vendor-performance', args=[1]), '/api/async/vendors/1/performance/')
+        self.assertEqual(reverse('async-purchaseorder-detail', args=[1]), '/api/async/purchase_orders/1/')
+
+class APIOnlySettingsTest(SimpleTestCase):
+    # The profile is loaded in a fresh interpreter; settings cannot be
+    # swapped for one test in this process.
+    script = """
+import django
+from django.db import connections
+from django.urls import Resolver404, resolve
+django.setup()
+from vendor_management.wsgi import warm_up
+warm_up()
+assert not any(connection.connection for connection in connections.all())
+assert resolve('/api/vendors/').url_name == 'vendor-list'
+try:
+    resolve('/admin/')
+except Resolver404:
+    print('ok')
+"""
+
+    def test_api_profile_serves_api_without_admin(self):
+        result = subprocess.run(
+            [sys.executable, '-c', self.script],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE='vendor_management.settings_api'),
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.stdout.strip(), "ok", result.stderr)
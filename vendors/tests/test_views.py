@@ -1,8 +1,24 @@
+import csv
+import io
+import json
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
-from vendors.models import Vendor, PurchaseOrder
+from vendors.models import (
+    ArchivedPurchaseOrder, SpendSummaryMonth, Vendor, PurchaseOrder, VendorMetricsMarker, VendorMonthlySpend,
+    VendorRanking,
+)
+from vendors.renderers import FastJSONRenderer
+from vendors.serializers import PurchaseOrderListSerializer, ValuesRowMixin
 from django.utils import timezone
+from django.utils.http import http_date
 
 class VendorAPITest(APITestCase):
 
@@ -32,7 +48,7 @@ class VendorAPITest(APITestCase):
     def test_list_vendors(self):
         response = self.client.get(self.vendor_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_retrieve_vendor(self):
         response = self.client.get(self.vendor_detail_url, format='json')
@@ -125,12 +141,12 @@ class PurchaseOrderAPITest(APITestCase):
     def test_list_purchase_orders(self):
         response = self.client.get(self.po_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_filter_purchase_orders_by_vendor(self):
         response = self.client.get(self.po_url, {'vendor': self.vendor.id}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_retrieve_purchase_order(self):
         response = self.client.get(self.po_detail_url, format='json')
@@ -155,4 +171,1500 @@ class PurchaseOrderAPITest(APITestCase):
     def test_delete_purchase_order(self):
         response = self.client.delete(self.po_detail_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(PurchaseOrder.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(PurchaseOrder.objects.count(), 0)
+
+class VendorArchivalAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.detail_url = reverse('vendor-detail', args=[self.vendor.id])
+
+    def create_orders(self, count):
+        for i in range(count):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=self.vendor,
+                delivery_date=timezone.now(),
+                items={"item": "Test Item"},
+                quantity=1
+            )
+
+    def test_archive_hides_vendor_until_restored(self):
+        response = self.client.post(reverse('vendor-archive', args=[self.vendor.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data['archived_at'])
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('vendor-list')).data['results'], [])
+        response = self.client.get(reverse('vendor-list'), {'archived': 'true'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.vendor.id])
+
+        response = self.client.post(reverse('vendor-restore', args=[self.vendor.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['archived_at'])
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+
+    def test_restore_requires_archived_vendor(self):
+        response = self.client.post(reverse('vendor-restore', args=[self.vendor.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_profile_update_keeps_archive_state(self):
+        self.client.post(reverse('vendor-archive', args=[self.vendor.id]))
+        response = self.client.patch(self.detail_url + '?archived=true', {"name": "Renamed"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.name, "Renamed")
+        self.assertIsNotNone(self.vendor.archived_at)
+
+    def test_archived_vendor_takes_no_new_orders(self):
+        self.vendor.archive()
+        data = {
+            "po_number": "PO999",
+            "vendor": self.vendor.id,
+            "delivery_date": timezone.now().isoformat(),
+            "items": {"item": "Test Item"},
+            "quantity": 1,
+        }
+        response = self.client.post(reverse('purchaseorder-list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('vendor', response.data)
+        response = self.client.post(reverse('purchaseorder-bulk'), [data], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_archived_vendor_orders_are_hidden_and_read_only(self):
+        self.create_orders(1)
+        po = PurchaseOrder.objects.get()
+        self.vendor.archive()
+        other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        detail_url = reverse('purchaseorder-detail', args=[po.id])
+
+        self.assertEqual(self.client.get(reverse('purchaseorder-list')).data['results'], [])
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('purchaseorder-export'), {'format': 'ndjson'})
+        self.assertEqual(b''.join(response.streaming_content), b'')
+        response = self.client.get(reverse('purchaseorder-at-risk'), {'within_hours': 24})
+        self.assertEqual(response.data['vendors'], [])
+
+        response = self.client.patch(detail_url, {"status": "canceled"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(
+            reverse('purchaseorder-transition'), [{"id": po.id, "status": "canceled"}], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        row = {
+            "po_number": po.po_number,
+            "vendor": other_vendor.id,
+            "delivery_date": timezone.now().isoformat(),
+            "items": {"item": "Moved"},
+            "quantity": 2,
+        }
+        response = self.client.post(reverse('purchaseorder-bulk') + '?upsert=true', [row], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('po_number', response.data['errors'][0]['errors'])
+        po.refresh_from_db()
+        self.assertEqual((po.vendor_id, po.status, po.quantity), (self.vendor.id, "pending", 1))
+
+    @override_settings(VENDORS_PURGE_BATCH_SIZE=3)
+    def test_delete_small_vendor_at_once(self):
+        self.create_orders(3)
+        response = self.client.delete(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Vendor.objects.exists())
+        self.assertFalse(PurchaseOrder.objects.exists())
+
+    @override_settings(VENDORS_PURGE_BATCH_SIZE=3)
+    def test_delete_large_vendor_archives_it(self):
+        self.create_orders(4)
+        response = self.client.delete(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.vendor.refresh_from_db()
+        self.assertIsNotNone(self.vendor.archived_at)
+        self.assertEqual(PurchaseOrder.objects.count(), 4)
+        self.assertFalse(ArchivedPurchaseOrder.objects.exists())
+
+class PurchaseOrderListQueryCountTest(APITestCase):
+
+    def create_orders(self, start, count):
+        for i in range(start, start + count):
+            vendor = Vendor.objects.create(
+                name=f"Vendor {i}",
+                contact_details="123 Test Street",
+                address="456 Vendor Avenue",
+                vendor_code=f"VEND{i}"
+            )
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:04}",
+                vendor=vendor,
+                delivery_date=timezone.now(),
+                items={"item": "Test Item"},
+                quantity=1
+            )
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_list_query_count_is_constant(self):
+        self.create_orders(0, 3)
+        small = self.count_queries(reverse('purchaseorder-list'))
+        self.create_orders(3, 30)
+        self.assertEqual(self.count_queries(reverse('purchaseorder-list')), small)
+        self.assertFalse(any('FROM "vendors_vendor"' in query['sql'] for query in self.queries_for_list()))
+
+    def test_filtered_and_sparse_list_never_loads_vendors(self):
+        self.create_orders(0, 5)
+        vendor = Vendor.objects.first()
+        for params in ({"vendor": vendor.id}, {"fields": "po_number,vendor"}):
+            self.assertFalse(any('FROM "vendors_vendor"' in query['sql'] for query in self.queries_for_list(params)))
+
+    def queries_for_list(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('purchaseorder-list'), params)
+        return queries.captured_queries
+
+class PurchaseOrderBulkAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.bulk_url = reverse('purchaseorder-bulk')
+        self.now = timezone.now()
+
+    def row(self, po_number, vendor, **overrides):
+        data = {
+            "po_number": po_number,
+            "vendor": vendor.id,
+            "order_date": self.now.isoformat(),
+            "delivery_date": (self.now + timezone.timedelta(days=3)).isoformat(),
+            "items": {"item": "Bulk Item"},
+            "quantity": 5,
+            "status": "completed",
+            "quality_rating": 4.0,
+            "delivered_date": self.now.isoformat(),
+        }
+        data.update(overrides)
+        return data
+
+    def test_bulk_create_json_array(self):
+        rows = [
+            self.row("PO001", self.vendor),
+            self.row("PO002", self.vendor, quality_rating=2.0),
+            self.row("PO003", self.other_vendor, status="pending", quality_rating=None, delivered_date=None),
+        ]
+        response = self.client.post(self.bulk_url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 3, 'updated': 0, 'errors': []})
+        self.assertEqual(PurchaseOrder.objects.count(), 3)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 2)
+        self.assertEqual(self.vendor.on_time_delivery_rate, 100.0)
+        self.assertEqual(self.vendor.quality_rating_avg, 3.0)
+
+    def test_bulk_create_ndjson_stream(self):
+        body = "\n".join(json.dumps(self.row(f"PO{i:03}", self.vendor)) for i in range(3)) + "\n"
+        response = self.client.post(self.bulk_url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+
+    def test_bulk_reports_row_errors_without_aborting(self):
+        PurchaseOrder.objects.create(
+            po_number="EXISTING",
+            vendor=self.vendor,
+            delivery_date=self.now,
+            items={"item": "Existing"},
+            quantity=1
+        )
+        rows = [
+            self.row("PO001", self.vendor),
+            self.row("PO002", self.vendor, quality_rating=9.0),
+            self.row("PO001", self.vendor),
+            self.row("EXISTING", self.vendor),
+            dict(self.row("PO003", self.vendor), vendor=999999),
+            "not an object",
+        ]
+        response = self.client.post(self.bulk_url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4, 5])
+        self.assertIn('quality_rating', response.data['errors'][0]['errors'])
+        self.assertIn('vendor', response.data['errors'][3]['errors'])
+        self.assertTrue(PurchaseOrder.objects.filter(po_number="PO001").exists())
+
+    def test_bulk_upsert_updates_existing_and_recomputes_old_vendor(self):
+        PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            delivery_date=self.now + timezone.timedelta(days=3),
+            delivered_date=self.now,
+            items={"item": "Original"},
+            quantity=1,
+            status="completed",
+            quality_rating=5.0
+        )
+        rows = [self.row("PO001", self.other_vendor, quality_rating=3.0), self.row("PO002", self.other_vendor)]
+        response = self.client.post(self.bulk_url + '?upsert=true', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 1, 'updated': 1, 'errors': []})
+        self.assertEqual(PurchaseOrder.objects.get(po_number="PO001").vendor_id, self.other_vendor.id)
+        self.vendor.refresh_from_db()
+        self.other_vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 0)
+        self.assertEqual(self.other_vendor.completed_po_count, 2)
+        self.assertEqual(self.other_vendor.quality_rating_avg, 3.5)
+
+    def test_bulk_upsert_keeps_fields_the_row_omits(self):
+        order_date = self.now - timezone.timedelta(days=10)
+        PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            order_date=order_date,
+            delivery_date=self.now + timezone.timedelta(days=3),
+            delivered_date=self.now,
+            items={"item": "Original"},
+            quantity=1,
+            status="completed",
+            quality_rating=5.0
+        )
+        partial = {
+            "po_number": "PO001",
+            "vendor": self.vendor.id,
+            "delivery_date": (self.now + timezone.timedelta(days=4)).isoformat(),
+            "items": {"item": "Changed"},
+            "quantity": 2,
+        }
+        response = self.client.post(
+            self.bulk_url + '?upsert=true', [partial, self.row("PO002", self.vendor)], format='json'
+        )
+        self.assertEqual(response.data, {'created': 1, 'updated': 1, 'errors': []})
+        po = PurchaseOrder.objects.get(po_number="PO001")
+        self.assertEqual((po.status, po.quality_rating, po.order_date), ("completed", 5.0, order_date))
+        self.assertEqual((po.quantity, po.items), (2, {"item": "Changed"}))
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 2)
+
+    def test_bulk_reports_orders_inserted_after_validation(self):
+        PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            delivery_date=self.now,
+            items={"item": "Concurrent"},
+            quantity=1
+        )
+        existing_orders = PurchaseOrderListSerializer._existing_orders
+        calls = []
+
+        def race(serializer, po_numbers):
+            # Validation runs before the concurrent insert commits.
+            calls.append(po_numbers)
+            return {} if len(calls) == 1 else existing_orders(serializer, po_numbers)
+
+        rows = [self.row("PO001", self.vendor), self.row("PO002", self.vendor)]
+        with mock.patch.object(PurchaseOrderListSerializer, '_existing_orders', race):
+            response = self.client.post(self.bulk_url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0])
+        self.assertTrue(PurchaseOrder.objects.filter(po_number="PO002").exists())
+
+    def test_bulk_query_count_is_bounded(self):
+        def post(prefix, count):
+            rows = [self.row(f"{prefix}{i}", self.vendor) for i in range(count)]
+            with self.assertNumQueries(expected):
+                self.client.post(self.bulk_url + '?batch_size=1000', rows, format='json')
+        # Vendor prefetch, existing po_number lookup, savepoint, insert, then
+        # the rebuild: vendor id page, savepoint, vendor row lock, metric
+        # aggregate, metric update, change log insert, rollup delete, rollup
+        # aggregate, rollup insert, release; the change log insert for the
+        # orders and the outer release.
+        expected = 16
+        post("A", 5)
+        post("B", 50)
+
+    def test_bulk_rejects_non_list_payload(self):
+        response = self.client.post(self.bulk_url, self.row("PO001", self.vendor), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PurchaseOrderTransitionAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.url = reverse('purchaseorder-transition')
+        self.now = timezone.now()
+
+    def create(self, po_number, status="pending", **fields):
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            vendor=self.vendor,
+            delivery_date=self.now + timezone.timedelta(days=1),
+            items={"item": "Dock Item"},
+            quantity=1,
+            status=status,
+            **fields
+        )
+
+    def test_transition_by_id_and_po_number(self):
+        first, second, third = self.create("PO001"), self.create("PO002"), self.create("PO003")
+        rows = [
+            {"id": first.id, "status": "completed", "quality_rating": 4.0,
+             "delivered_date": self.now.isoformat()},
+            {"po_number": "PO002", "status": "completed", "quality_rating": 2.0,
+             "delivered_date": (self.now + timezone.timedelta(days=2)).isoformat()},
+            {"po_number": "PO003", "status": "canceled"},
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 3, 'errors': []})
+        third.refresh_from_db()
+        self.assertEqual(third.status, "canceled")
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 2)
+        self.assertEqual(self.vendor.on_time_delivery_rate, 50.0)
+        self.assertEqual(self.vendor.quality_rating_avg, 3.0)
+
+    def test_completion_defaults_delivered_date_and_amends_rating(self):
+        po = self.create("PO001")
+        self.client.post(self.url, [{"id": po.id, "status": "completed"}], format='json')
+        po.refresh_from_db()
+        self.assertIsNotNone(po.delivered_date)
+        self.assertIsNone(po.quality_rating)
+        response = self.client.post(self.url, [{"id": po.id, "status": "completed", "quality_rating": 5.0}],
+                                    format='json')
+        self.assertEqual(response.data['updated'], 1)
+        po.refresh_from_db()
+        self.vendor.refresh_from_db()
+        self.assertEqual(po.quality_rating, 5.0)
+        self.assertEqual(self.vendor.completed_po_count, 1)
+        self.assertEqual(self.vendor.quality_rating_avg, 5.0)
+
+    def test_illegal_and_invalid_rows_are_reported(self):
+        pending = self.create("PO001")
+        canceled = self.create("PO002", status="canceled")
+        completed = self.create("PO003", status="completed", delivered_date=self.now, quality_rating=3.0)
+        rows = [
+            {"id": pending.id, "status": "completed", "quality_rating": 4.0},
+            {"id": canceled.id, "status": "completed"},
+            {"id": completed.id, "status": "canceled"},
+            {"id": completed.id, "po_number": "PO003", "status": "completed"},
+            {"po_number": "PO002", "status": "canceled", "quality_rating": 4.0},
+            {"id": 999999, "status": "canceled"},
+            {"id": pending.id, "status": "canceled"},
+            {"po_number": "PO001", "status": "canceled"},
+            {"id": completed.id, "status": "completed", "quality_rating": 9.0},
+            "not an object",
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], list(range(1, 10)))
+        errors = [error['errors'] for error in response.data['errors']]
+        self.assertIn('status', errors[0])
+        self.assertIn('status', errors[1])
+        self.assertIn('id', errors[4])
+        self.assertIn('id', errors[5])
+        self.assertIn('po_number', errors[6])
+        self.assertIn('quality_rating', errors[7])
+        canceled.refresh_from_db()
+        completed.refresh_from_db()
+        self.assertEqual(canceled.status, "canceled")
+        self.assertEqual(completed.status, "completed")
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 2)
+
+    def test_all_rows_invalid(self):
+        canceled = self.create("PO001", status="canceled")
+        response = self.client.post(self.url, [{"id": canceled.id, "status": "pending"}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['updated'], 0)
+
+    def test_rejects_non_list_payload_and_bad_batch_size(self):
+        response = self.client.post(self.url, {"id": 1, "status": "completed"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url + '?batch_size=0', [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_is_bounded(self):
+        def post(prefix, count):
+            orders = [self.create(f"{prefix}{i}") for i in range(count)]
+            rows = [{"po_number": order.po_number, "status": "completed", "quality_rating": 4.0} for order in orders]
+            with self.assertNumQueries(expected):
+                response = self.client.post(self.url, rows, format='json')
+            self.assertEqual(response.data['updated'], count)
+        # Savepoint, po_number lookup, row locks, bulk update, then one metric
+        # update per vendor: counter update, rollup insert-if-missing and
+        # increment; the change log insert and the release.
+        expected = 9
+        post("A", 5)
+        post("B", 50)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 55)
+
+    @override_settings(VENDORS_METRICS_MODE='deferred')
+    def test_deferred_mode_enqueues_vendor(self):
+        po = self.create("PO001")
+        self.client.post(self.url, [{"id": po.id, "status": "completed"}], format='json')
+        self.assertEqual(VendorMetricsMarker.objects.count(), 1)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 0)
+
+class AtRiskAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.url = reverse('purchaseorder-at-risk')
+        now = timezone.now()
+        for i, (vendor, hours, po_status) in enumerate([
+            (self.vendor, -48, "pending"),
+            (self.vendor, -1, "pending"),
+            (self.vendor, 12, "pending"),
+            (self.vendor, -5, "completed"),
+            (self.other_vendor, 24, "pending"),
+            (self.other_vendor, 24 * 7, "pending"),
+        ]):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=vendor,
+                delivery_date=now + timezone.timedelta(hours=hours),
+                items={"item": "Test Item"},
+                quantity=1,
+                status=po_status
+            )
+
+    def test_at_risk_counts_per_vendor(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['overdue'], response.data['due_soon']), (2, 2))
+        self.assertEqual(response.data['vendors'], [
+            {'vendor': self.vendor.id, 'overdue': 2, 'due_soon': 1},
+            {'vendor': self.other_vendor.id, 'overdue': 0, 'due_soon': 1},
+        ])
+
+    def test_window_vendor_and_limit(self):
+        response = self.client.get(self.url, {'within_hours': 0})
+        self.assertEqual((response.data['overdue'], response.data['due_soon']), (2, 0))
+        response = self.client.get(self.url, {'within_hours': 24 * 8, 'vendor': self.other_vendor.id})
+        self.assertEqual(response.data['vendors'], [{'vendor': self.other_vendor.id, 'overdue': 0, 'due_soon': 2}])
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertEqual(len(response.data['vendors']), 1)
+        self.assertEqual(response.data['due_soon'], 2)
+
+    def test_rejects_invalid_params(self):
+        for params in ({'within_hours': -1}, {'limit': 0}, {'vendor': 'x'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+class ChangeFeedAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.po = PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            delivery_date=timezone.now(),
+            items={"item": "Test Item"},
+            quantity=1
+        )
+        self.url = reverse('change-feed')
+
+    def changes(self, since, **params):
+        response = self.client.get(self.url, {'since': since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync_then_incremental(self):
+        data = self.changes(0)
+        self.assertEqual([(row['kind'], row['id'], row['deleted']) for row in data['results']], [
+            ('vendor', self.vendor.id, False), ('purchase_order', self.po.id, False),
+        ])
+        self.assertEqual(data['results'][1]['data'], self.client.get(
+            reverse('purchaseorder-detail', args=[self.po.id])
+        ).data)
+        self.assertIsNone(data['next'])
+        token = data['token']
+        self.assertEqual(self.changes(token)['results'], [])
+
+        self.client.patch(reverse('purchaseorder-detail', args=[self.po.id]), {"quantity": 5}, format='json')
+        data = self.changes(token)
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(data['results'][0]['data']['quantity'], 5)
+
+    def test_deleted_and_archived_rows_are_tombstones(self):
+        token = self.changes(0)['token']
+        self.client.delete(reverse('purchaseorder-detail', args=[self.po.id]))
+        self.client.post(reverse('vendor-archive', args=[self.vendor.id]))
+        results = self.changes(token)['results']
+        self.assertEqual([(row['kind'], row['id'], row['deleted'], row['data']) for row in results], [
+            ('purchase_order', self.po.id, True, None), ('vendor', self.vendor.id, True, None),
+        ])
+
+    def test_bulk_writes_are_recorded(self):
+        token = self.changes(0)['token']
+        self.client.post(reverse('purchaseorder-bulk'), [{
+            "po_number": "PO002",
+            "vendor": self.vendor.id,
+            "delivery_date": timezone.now().isoformat(),
+            "items": {"item": "Bulk"},
+            "quantity": 1,
+        }], format='json')
+        self.client.post(reverse('purchaseorder-transition'), [{"id": self.po.id, "status": "canceled"}], format='json')
+        results = self.changes(token, kind='purchase_order')['results']
+        self.assertEqual([row['data']['po_number'] for row in results], ["PO002", "PO001"])
+        self.assertEqual(results[1]['data']['status'], "canceled")
+
+    def test_pages_by_sequence(self):
+        for i in range(3):
+            PurchaseOrder.objects.create(
+                po_number=f"PO10{i}",
+                vendor=self.vendor,
+                delivery_date=timezone.now(),
+                items={"item": "Test Item"},
+                quantity=1
+            )
+        first = self.changes(0, limit=3)
+        self.assertIsNotNone(first['next'])
+        second = self.client.get(first['next']).data
+        self.assertIsNone(second['next'])
+        ids = [row['id'] for row in first['results'] + second['results'] if row['kind'] == 'purchase_order']
+        self.assertEqual(ids, list(PurchaseOrder.objects.order_by('pk').values_list('pk', flat=True)))
+
+    def test_rejects_invalid_params(self):
+        for params in ({'since': -1}, {'limit': 0}, {'kind': 'line'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_query_count_does_not_grow_with_page(self):
+        # Change log page, vendor rows, purchase order rows.
+        with self.assertNumQueries(3):
+            self.changes(0)
+
+class SpendAnalyticsAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.march = timezone.datetime(2025, 3, 10, 12, tzinfo=timezone.utc)
+        self.april = timezone.datetime(2025, 4, 5, 12, tzinfo=timezone.utc)
+        for i, (vendor, order_date, unit_price) in enumerate([
+            (self.vendor, self.march, "10.00"),
+            (self.vendor, self.april, "2.50"),
+            (self.other_vendor, self.april, "30.00"),
+        ]):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=vendor,
+                order_date=order_date,
+                delivery_date=order_date + timezone.timedelta(days=7),
+                delivered_date=order_date + timezone.timedelta(days=3),
+                items=[{"sku": "SKU-1", "quantity": 2, "unit_price": unit_price}],
+                quantity=2,
+                status="completed"
+            )
+        self.url = reverse('analytics-spend')
+        self.range = {'from': '2025-03', 'to': '2025-04'}
+
+    def test_vendor_spend_by_month(self):
+        response = self.client.get(reverse('vendor-spend', args=[self.vendor.id]), self.range)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            (response.data['currency'], response.data['from'], response.data['to']), ("USD", "2025-03", "2025-04")
+        )
+        self.assertEqual([(row['month'], row['order_count'], row['spend']) for row in response.data['months']], [
+            ("2025-03", 1, "20.00"), ("2025-04", 1, "5.00"),
+        ])
+        self.assertEqual(response.data['totals']['spend'], "25.00")
+        self.assertEqual(response.data['totals']['avg_lead_time_days'], 3.0)
+
+    def test_group_by_vendor_and_month(self):
+        response = self.client.get(self.url, {**self.range, 'group_by': 'vendor'})
+        self.assertEqual([(row['vendor'], row['spend']) for row in response.data['results']], [
+            (self.vendor.id, "25.00"), (self.other_vendor.id, "60.00"),
+        ])
+        response = self.client.get(self.url, {**self.range, 'group_by': 'month', 'vendor': self.vendor.id})
+        self.assertEqual([(row['month'], row['spend']) for row in response.data['results']], [
+            ("2025-03", "20.00"), ("2025-04", "5.00"),
+        ])
+        response = self.client.get(self.url, {**self.range, 'limit': 2})
+        self.assertEqual(
+            [(row['month'], row['vendor']) for row in response.data['results']],
+            [("2025-03", self.vendor.id), ("2025-04", self.vendor.id)],
+        )
+
+    def test_pages_continue_after_the_last_row(self):
+        for group_by, expected in (
+            ('vendor,month', [
+                ("2025-03", self.vendor.id), ("2025-04", self.vendor.id), ("2025-04", self.other_vendor.id),
+            ]),
+            ('vendor', [(None, self.vendor.id), (None, self.other_vendor.id)]),
+            ('month', [("2025-03", None), ("2025-04", None)]),
+        ):
+            rows, url = [], None
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, {**self.range, 'group_by': group_by, 'limit': 1})
+            # The page size is applied in the aggregate query.
+            self.assertTrue(any("LIMIT 2" in query["sql"] for query in queries))
+            while True:
+                self.assertEqual(len(response.data['results']), 1)
+                rows.extend((row.get('month'), row.get('vendor')) for row in response.data['results'])
+                url = response.data['next']
+                if url is None:
+                    break
+                response = self.client.get(url)
+            self.assertEqual(rows, expected)
+
+    def test_archived_vendors_are_left_out(self):
+        self.other_vendor.archive()
+        response = self.client.get(self.url, {**self.range, 'group_by': 'vendor'})
+        self.assertEqual([row['vendor'] for row in response.data['results']], [self.vendor.id])
+        response = self.client.get(self.url, {**self.range, 'vendor': self.other_vendor.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rejects_invalid_params(self):
+        for params in (
+            {'group_by': 'sku'}, {'from': '2025-13'}, {'from': '2025-05', 'to': '2025-04'}, {'limit': 0},
+            {'after': '2025-03'}, {'after': 'NaN,1', 'group_by': 'vendor'},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_cached_months_skip_the_order_scan(self):
+        for month in (self.march, self.april):
+            VendorMonthlySpend.materialize(month.date().replace(day=1))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, self.range)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any("vendors_purchaseorder" in query["sql"] for query in queries))
+
+    def test_pages_add_up_cached_and_live_months(self):
+        VendorMonthlySpend.materialize(self.march.date().replace(day=1))
+        response = self.client.get(self.url, {**self.range, 'group_by': 'vendor', 'limit': 1})
+        self.assertEqual(
+            [(row['vendor'], row['spend']) for row in response.data['results']], [(self.vendor.id, "25.00")]
+        )
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            [(row['vendor'], row['spend']) for row in response.data['results']], [(self.other_vendor.id, "60.00")]
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_bulk_writes_and_transitions_drop_cached_months(self):
+        march = self.march.date().replace(day=1)
+        VendorMonthlySpend.materialize(march)
+        response = self.client.post(reverse('purchaseorder-bulk'), [{
+            "po_number": "PO100",
+            "vendor": self.vendor.id,
+            "order_date": self.march.isoformat(),
+            "delivery_date": self.april.isoformat(),
+            "items": [{"sku": "SKU-1", "quantity": 1, "unit_price": "1.00"}],
+            "quantity": 1,
+        }], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SpendSummaryMonth.objects.filter(month=march).exists())
+
+        VendorMonthlySpend.materialize(march)
+        response = self.client.post(
+            reverse('purchaseorder-transition'), [{"po_number": "PO100", "status": "canceled"}], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(SpendSummaryMonth.objects.filter(month=march).exists())
+        response = self.client.get(reverse('vendor-spend', args=[self.vendor.id]), self.range)
+        self.assertEqual(response.data['totals']['order_count'], 2)
+
+class LineItemSummaryAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.now = timezone.now()
+        for i, (vendor, status_value, items) in enumerate([
+            (self.vendor, "completed", [{"sku": "BOLT", "quantity": 100, "unit_price": 0.12},
+                                        {"sku": "NUT", "quantity": 50, "unit_price": 0.05}]),
+            (self.vendor, "pending", [{"sku": "BOLT", "quantity": 10, "unit_price": 0.15}]),
+            (self.other_vendor, "canceled", [{"sku": "WIRE", "quantity": 2, "unit_price": 84}]),
+        ]):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=vendor,
+                order_date=self.now - timezone.timedelta(days=i),
+                delivery_date=self.now,
+                items=items,
+                quantity=sum(item["quantity"] for item in items),
+                status=status_value
+            )
+        self.url = reverse('line-item-summary')
+
+    def test_spend_by_vendor_and_sku(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['group_by'], ['vendor', 'sku'])
+        self.assertEqual(
+            [(row['vendor'], row['sku'], row['total_quantity'], row['spend']) for row in response.data['results']],
+            [(self.other_vendor.id, "WIRE", 2, "168.00"), (self.vendor.id, "BOLT", 110, "13.50"),
+             (self.vendor.id, "NUT", 50, "2.50")],
+        )
+
+    def test_group_by_sku_with_filters(self):
+        response = self.client.get(self.url, {'group_by': 'sku', 'status': 'completed,pending'})
+        self.assertEqual([(row['sku'], row['purchase_order_count']) for row in response.data['results']], [
+            ("BOLT", 2), ("NUT", 1),
+        ])
+        self.assertNotIn('vendor', response.data['results'][0])
+
+        response = self.client.get(self.url, {'group_by': 'vendor', 'sku': "BOLT",
+                                              'order_date_after': (self.now - timezone.timedelta(hours=12)).isoformat()})
+        self.assertEqual(response.data['results'], [{
+            'vendor': self.vendor.id, 'line_count': 1, 'purchase_order_count': 1, 'total_quantity': 100,
+            'spend': "12.00",
+        }])
+
+    def test_invalid_parameters(self):
+        for params in ({'group_by': 'status'}, {'group_by': 'sku,sku'}, {'limit': '0'}, {'vendor': 'x'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_bulk_upsert_replaces_lines(self):
+        row = {
+            "po_number": "PO000",
+            "vendor": self.vendor.id,
+            "delivery_date": self.now.isoformat(),
+            "items": [{"sku": "GEAR", "quantity": 3, "unit_price": 10}],
+            "quantity": 3,
+        }
+        response = self.client.post(reverse('purchaseorder-bulk') + '?upsert=true', [row], format='json')
+        self.assertEqual(response.data['updated'], 1)
+        response = self.client.get(self.url, {'group_by': 'sku', 'vendor': self.vendor.id})
+        self.assertEqual([row['sku'] for row in response.data['results']], ["GEAR", "BOLT"])
+
+
+class ListPaginationAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        for i in range(5):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=self.vendor,
+                delivery_date=timezone.now() + timezone.timedelta(days=5),
+                items={"item": f"Item {i}"},
+                quantity=i + 1
+            )
+        self.po_url = reverse('purchaseorder-list')
+
+    def test_cursor_pagination_walks_all_rows_in_id_order(self):
+        response = self.client.get(self.po_url, {'page_size': 2})
+        seen = [po['po_number'] for po in response.data['results']]
+        self.assertIsNone(response.data['previous'])
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen.extend(po['po_number'] for po in response.data['results'])
+        self.assertEqual(seen, [f"PO{i:03}" for i in range(5)])
+
+    def test_cursor_is_stable_under_concurrent_inserts(self):
+        response = self.client.get(self.po_url, {'page_size': 2})
+        PurchaseOrder.objects.create(
+            po_number="PO999",
+            vendor=self.vendor,
+            delivery_date=timezone.now(),
+            items={"item": "Late arrival"},
+            quantity=1
+        )
+        response = self.client.get(response.data['next'])
+        self.assertEqual([po['po_number'] for po in response.data['results']], ["PO002", "PO003"])
+
+    def test_sparse_fieldset_purchase_orders(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.po_url, {'fields': 'id,po_number,status'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0].keys()), {'id', 'po_number', 'status'})
+
+    def test_sparse_fieldset_skips_heavy_columns_in_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.po_url, {'fields': 'po_number'})
+        self.assertNotIn('"items"', queries.captured_queries[0]['sql'])
+
+    def test_sparse_fieldset_vendors(self):
+        response = self.client.get(reverse('vendor-list'), {'fields': 'name,vendor_code'})
+        self.assertEqual(response.data['results'], [{'name': "Test Vendor", 'vendor_code': "VEND123"}])
+        response = self.client.get(reverse('vendor-detail', args=[self.vendor.id]), {'fields': 'name'})
+        self.assertEqual(response.data, {'name': "Test Vendor"})
+
+    def test_sparse_fieldset_unknown_field(self):
+        response = self.client.get(self.po_url, {'fields': 'po_number,bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+
+class ExportAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.other_vendor = Vendor.objects.create(
+            name="Other Vendor",
+            contact_details="1 Other Street",
+            address="2 Other Avenue",
+            vendor_code="VEND456"
+        )
+        self.now = timezone.now()
+        for i, vendor in enumerate([self.vendor, self.vendor, self.other_vendor]):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=vendor,
+                order_date=self.now - timezone.timedelta(days=i),
+                delivery_date=self.now + timezone.timedelta(days=5),
+                items={"item": f"Item, {i}"},
+                quantity=i + 1,
+                status="completed" if i == 0 else "pending",
+                quality_rating=4.0 if i == 0 else None,
+                delivered_date=self.now if i == 0 else None
+            )
+        self.po_export_url = reverse('purchaseorder-export')
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_purchase_orders_csv(self):
+        response = self.client.get(self.po_export_url, {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('purchase_orders.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual([row['po_number'] for row in rows], ["PO000", "PO001", "PO002"])
+        self.assertEqual(rows[0]['items'], '{"item": "Item, 0"}')
+        self.assertEqual(rows[1]['quality_rating'], '')
+
+    def test_export_purchase_orders_ndjson_matches_api_representation(self):
+        response = self.client.get(self.po_export_url, {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        detail = self.client.get(reverse('purchaseorder-detail', args=[rows[0]['id']]), format='json')
+        self.assertEqual(rows[0], json.loads(detail.content))
+
+    def test_export_applies_filters(self):
+        response = self.client.get(self.po_export_url, {
+            'format': 'ndjson',
+            'vendor': self.vendor.id,
+            'status': 'pending',
+        })
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([row['po_number'] for row in rows], ["PO001"])
+
+        response = self.client.get(self.po_export_url, {
+            'format': 'ndjson',
+            'order_date_after': (self.now - timezone.timedelta(hours=12)).isoformat(),
+        })
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([row['po_number'] for row in rows], ["PO000"])
+
+    def test_export_rejects_invalid_filter(self):
+        response = self.client.get(self.po_export_url, {'format': 'ndjson', 'status': 'lost'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_vendor_scorecards(self):
+        response = self.client.get(reverse('vendor-export'), {'format': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['vendor_code'], "VEND123")
+        self.assertEqual(rows[0]['completed_po_count'], '1')
+        self.assertEqual(float(rows[0]['on_time_delivery_rate']), 100.0)
+        self.assertNotIn('address', rows[0])
+
+    def test_export_streams_with_chunked_iterator(self):
+        with mock.patch.object(QuerySet, 'iterator', autospec=True, side_effect=QuerySet.iterator) as iterator:
+            self.content(self.client.get(self.po_export_url, {'format': 'csv'}))
+        self.assertEqual(iterator.call_args.kwargs['chunk_size'], 2000)
+
+    def test_list_status_filter(self):
+        response = self.client.get(reverse('purchaseorder-list'), {'status': 'pending,canceled'})
+        self.assertEqual(len(response.data['results']), 2)
+
+
+
+class ListFilterOrderingAPITest(APITestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.acme = Vendor.objects.create(
+            name="Acme Supplies",
+            contact_details="1 Acme Street",
+            address="2 Acme Avenue",
+            vendor_code="ACM001"
+        )
+        self.globex = Vendor.objects.create(
+            name="Globex",
+            contact_details="1 Globex Street",
+            address="2 Globex Avenue",
+            vendor_code="GLX-ACME"
+        )
+        # PO000 on time, PO001 late, PO002 late, PO003 pending.
+        for i, (vendor, late, rating) in enumerate([
+            (self.acme, False, 5.0), (self.acme, True, 2.0), (self.globex, True, 4.0), (self.globex, None, None),
+        ]):
+            delivery_date = self.now - timezone.timedelta(days=10 - i)
+            PurchaseOrder.objects.create(
+                po_number=f"{'PO' if i < 2 else 'PX'}{i:03}",
+                vendor=vendor,
+                order_date=self.now - timezone.timedelta(days=20 - i),
+                delivery_date=delivery_date,
+                items={"item": f"Item {i}"},
+                quantity=1,
+                status="pending" if late is None else "completed",
+                quality_rating=rating,
+                delivered_date=None if late is None else delivery_date + timezone.timedelta(days=1 if late else -1)
+            )
+        self.po_url = reverse('purchaseorder-list')
+        self.vendor_url = reverse('vendor-list')
+
+    def po_numbers(self, params):
+        response = self.client.get(self.po_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [po['po_number'] for po in response.data['results']]
+
+    def vendor_codes(self, params):
+        response = self.client.get(self.vendor_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [vendor['vendor_code'] for vendor in response.data['results']]
+
+    def test_late_filter(self):
+        self.assertEqual(self.po_numbers({'late': 'true'}), ["PO001", "PX002"])
+        self.assertEqual(self.po_numbers({'late': 'false'}), ["PO000", "PX003"])
+        response = self.client.get(self.po_url, {'late': 'maybe'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('late', response.data)
+
+    def test_date_and_rating_range_filters(self):
+        self.assertEqual(self.po_numbers({
+            'delivery_date_after': (self.now - timezone.timedelta(days=9, hours=12)).isoformat(),
+        }), ["PO001", "PX002", "PX003"])
+        self.assertEqual(self.po_numbers({
+            'delivered_date_before': (self.now - timezone.timedelta(days=7, hours=12)).isoformat(),
+        }), ["PO000", "PO001"])
+        self.assertEqual(self.po_numbers({'quality_rating_min': '3', 'quality_rating_max': '4.5'}), ["PX002"])
+        response = self.client.get(self.po_url, {'quality_rating_min': '9'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_po_number_prefix(self):
+        self.assertEqual(self.po_numbers({'po_number_prefix': 'PX'}), ["PX002", "PX003"])
+        self.assertEqual(self.po_numbers({'po_number_prefix': 'PO00'}), ["PO000", "PO001"])
+        self.assertEqual(self.po_numbers({'po_number_prefix': 'px'}), [])
+
+    def test_ordering_walks_cursor_pages(self):
+        response = self.client.get(self.po_url, {'ordering': '-delivery_date', 'page_size': 3})
+        seen = [po['po_number'] for po in response.data['results']]
+        response = self.client.get(response.data['next'])
+        seen.extend(po['po_number'] for po in response.data['results'])
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(seen, ["PX003", "PX002", "PO001", "PO000"])
+
+    def test_ordering_ties_break_on_id(self):
+        PurchaseOrder.objects.update(delivery_date=self.now)
+        self.assertEqual(self.po_numbers({'ordering': 'delivery_date'}), ["PO000", "PO001", "PX002", "PX003"])
+
+    def test_ordering_rejects_unindexed_fields(self):
+        for ordering in ('quantity', 'vendor__name', 'po_number,-bogus'):
+            response = self.client.get(self.po_url, {'ordering': ordering})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, ordering)
+            self.assertIn('ordering', response.data)
+
+    def test_ordering_with_sparse_fieldset_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.po_url, {'fields': 'po_number', 'ordering': '-order_date', 'page_size': 2})
+        self.assertEqual([po['po_number'] for po in response.data['results']], ["PX003", "PX002"])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_vendor_search_is_case_insensitive_prefix(self):
+        self.assertEqual(self.vendor_codes({'search': 'acme'}), ["ACM001"])
+        self.assertEqual(self.vendor_codes({'search': 'GLX-a'}), ["GLX-ACME"])
+        self.assertEqual(self.vendor_codes({'search': 'a'}), ["ACM001"])
+        self.assertEqual(self.vendor_codes({'search': 'supplies'}), [])
+
+    def test_vendor_score_filters_and_ordering(self):
+        # Acme: 1 of 2 on time, ratings 5 and 2; Globex: 0 of 1, rating 4.
+        self.assertEqual(self.vendor_codes({'on_time_delivery_rate_min': '50'}), ["ACM001"])
+        self.assertEqual(self.vendor_codes({'quality_rating_avg_min': '3.6'}), ["GLX-ACME"])
+        self.assertEqual(self.vendor_codes({'ordering': '-quality_rating_avg'}), ["GLX-ACME", "ACM001"])
+        self.assertEqual(self.vendor_codes({'ordering': 'name'}), ["ACM001", "GLX-ACME"])
+        response = self.client.get(self.vendor_url, {'ordering': 'vendor_code'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ValuesReadPathAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Vendör \u2028",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        for i in range(3):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=self.vendor,
+                delivery_date=timezone.now() + timezone.timedelta(days=i),
+                items=[{"sku": f"SKU-{i}", "quantity": i, "unit_price": 9.99}],
+                quantity=i,
+                status="completed" if i else "pending",
+                quality_rating=4.5 if i else None,
+                delivered_date=timezone.now() if i else None
+            )
+        self.po = PurchaseOrder.objects.first()
+
+    def slow_content(self, url, params):
+        # The same request through the serializer and DRF's JSONRenderer.
+        with mock.patch.object(ValuesRowMixin, 'values_reader', return_value=None), \
+                mock.patch.object(FastJSONRenderer, 'render', JSONRenderer.render):
+            return self.client.get(url, params).content
+
+    def test_responses_are_byte_identical(self):
+        requests = [
+            (reverse('purchaseorder-list'), {}),
+            (reverse('purchaseorder-list'), {'fields': 'po_number,items', 'ordering': '-delivery_date', 'page_size': 2}),
+            (reverse('purchaseorder-detail', args=[self.po.id]), {}),
+            (reverse('purchaseorder-detail', args=[self.po.id]), {'fields': 'vendor,delivered_date'}),
+            (reverse('vendor-list'), {'search': 'vend'}),
+            (reverse('vendor-detail', args=[self.vendor.id]), {}),
+        ]
+        for url, params in requests:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, self.slow_content(url, params), (url, params))
+
+    def test_list_is_one_values_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('purchaseorder-list'), {'fields': 'po_number'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"items"', queries[0]['sql'])
+
+    def test_missing_object_is_404(self):
+        response = self.client.get(reverse('purchaseorder-detail', args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('vendor-detail', args=['abc']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConditionalGetAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.po = self.create("PO001")
+        self.detail_url = reverse('purchaseorder-detail', args=[self.po.id])
+        self.list_url = reverse('purchaseorder-list')
+
+    def create(self, po_number, **fields):
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            vendor=self.vendor,
+            delivery_date=timezone.now() + timezone.timedelta(days=5),
+            items={"item": "Test Item"},
+            quantity=10,
+            **fields
+        )
+
+    def test_detail_not_modified_until_row_changes(self):
+        response = self.client.get(self.detail_url)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(cached['Cache-Control'], 'no-cache')
+
+        self.client.patch(self.detail_url, {"quantity": 20}, format='json')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity'], 20)
+
+    def test_etag_depends_on_representation(self):
+        full = self.client.get(self.detail_url)
+        sparse = self.client.get(self.detail_url, {'fields': 'po_number'})
+        self.assertNotEqual(full['ETag'], sparse['ETag'])
+        response = self.client.get(self.detail_url, {'fields': 'po_number'}, HTTP_IF_NONE_MATCH=full['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_vendor_detail_changes_with_metrics(self):
+        url = reverse('vendor-detail', args=[self.vendor.id])
+        etag = self.client.get(url)['ETag']
+        self.po.status = "completed"
+        self.po.delivered_date = timezone.now()
+        self.po.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['on_time_delivery_rate'], 100.0)
+
+    def test_list_not_modified_until_page_changes(self):
+        params = {'status': 'pending'}
+        etag = self.client.get(self.list_url, params)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other = self.create("PO002")
+        response = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        # Leaving the filtered set without a newer row in it still changes
+        # the page.
+        PurchaseOrder.objects.filter(pk=other.pk).update(status="canceled")
+        response = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_revalidates_after_delete(self):
+        other = self.create("PO002")
+        response = self.client.get(self.list_url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(len(response.data['results']), 2)
+        since = http_date((timezone.now() + timezone.timedelta(minutes=1)).timestamp())
+
+        other.delete()
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.po.id])
+
+    @override_settings(VENDORS_CACHE_CONTROL={'purchaseorder-detail': 'max-age=30'})
+    def test_cache_control_is_configured_per_endpoint(self):
+        self.assertEqual(self.client.get(self.detail_url)['Cache-Control'], 'max-age=30')
+        self.assertNotIn('Cache-Control', self.client.get(self.list_url))
+        self.assertNotIn('Cache-Control', self.client.patch(self.detail_url, {"quantity": 2}, format='json'))
+
+class VendorPerformanceCacheTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.po = PurchaseOrder.objects.create(
+            po_number="PO001",
+            vendor=self.vendor,
+            delivery_date=timezone.now() + timezone.timedelta(days=5),
+            items={"item": "Test Item"},
+            quantity=10
+        )
+        self.performance_url = reverse('vendor-performance', args=[self.vendor.id])
+
+    def test_repeat_reads_are_served_from_cache(self):
+        first = self.client.get(self.performance_url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.performance_url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_conditional_requests_return_not_modified(self):
+        first = self.client.get(self.performance_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.performance_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+        response = self.client.get(self.performance_url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_last_modified_follows_vendor_updates(self):
+        first = self.client.get(self.performance_url)
+        self.vendor.refresh_from_db()
+        self.assertEqual(first['Last-Modified'], http_date(self.vendor.updated_at.timestamp()))
+        cache.clear()
+        response = self.client.get(self.performance_url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_po_metric_change_invalidates(self):
+        first = self.client.get(self.performance_url)
+        self.po.status = "completed"
+        self.po.quality_rating = 4.0
+        self.po.delivered_date = self.po.delivery_date
+        self.po.save()
+        response = self.client.get(self.performance_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'on_time_delivery_rate': 100.0, 'quality_rating_avg': 4.0})
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_po_change_without_metric_effect_keeps_cache(self):
+        self.client.get(self.performance_url)
+        self.po.items = {"item": "Renamed"}
+        self.po.save()
+        with self.assertNumQueries(0):
+            self.client.get(self.performance_url)
+
+    def test_vendor_update_and_delete_invalidate(self):
+        self.client.get(self.performance_url)
+        self.client.patch(reverse('vendor-detail', args=[self.vendor.id]), {"name": "Renamed"}, format='json')
+        with self.assertNumQueries(1):
+            self.client.get(self.performance_url)
+        self.client.delete(reverse('vendor-detail', args=[self.vendor.id]))
+        response = self.client.get(self.performance_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unknown_vendor_is_not_cached(self):
+        url = reverse('vendor-performance', args=[999999])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(cache.get('vendors:performance:999999'))
+
+
+
+class VendorPerformanceWindowAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+        self.now = timezone.now()
+        for i, (days_ago, rating) in enumerate([(1, 5.0), (60, 3.0), (200, 1.0)]):
+            delivered = self.now - timezone.timedelta(days=days_ago)
+            PurchaseOrder.objects.create(
+                po_number=f"PO{i:03}",
+                vendor=self.vendor,
+                delivery_date=delivered,
+                delivered_date=delivered,
+                items={"item": "Windowed"},
+                quantity=1,
+                status="completed",
+                quality_rating=rating
+            )
+        self.performance_url = reverse('vendor-performance', args=[self.vendor.id])
+
+    def test_window_sums_rollups(self):
+        expected = {'30d': (1, 5.0), '90': (2, 4.0), '365d': (3, 3.0)}
+        for window, (count, average) in expected.items():
+            with self.assertNumQueries(2):
+                response = self.client.get(self.performance_url, {'window': window})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['completed_po_count'], count)
+            self.assertEqual(response.data['quality_rating_avg'], average)
+            self.assertEqual(response.data['on_time_delivery_rate'], 100.0)
+
+    def test_explicit_range_with_monthly_series(self):
+        start = (self.now - timezone.timedelta(days=90)).date()
+        response = self.client.get(self.performance_url, {
+            'from': start.isoformat(),
+            'to': self.now.date().isoformat(),
+            'interval': 'month',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['from'], start)
+        self.assertEqual(sum(point['completed_po_count'] for point in response.data['series']), 2)
+        self.assertTrue(all(point['period'].day == 1 for point in response.data['series']))
+
+    def test_invalid_window_parameters(self):
+        for params in ({'window': 'abc'}, {'window': '0'}, {'window': '30', 'from': '2024-01-01'},
+                       {'from': '2024-02-01', 'to': '2024-01-01'}, {'interval': 'hour'}):
+            response = self.client.get(self.performance_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_lifetime_response_unchanged_without_parameters(self):
+        response = self.client.get(self.performance_url)
+        self.assertEqual(set(response.data), {'on_time_delivery_rate', 'quality_rating_avg'})
+
+
+
+@override_settings(VENDORS_METRICS_MODE='deferred')
+class DeferredMetricsAPITest(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="123 Test Street",
+            address="456 Vendor Avenue",
+            vendor_code="VEND123"
+        )
+
+    def test_bulk_ingestion_enqueues_once_per_vendor(self):
+        now = timezone.now()
+        rows = [
+            {
+                "po_number": f"PO{i:03}",
+                "vendor": self.vendor.id,
+                "delivery_date": now.isoformat(),
+                "delivered_date": now.isoformat(),
+                "items": {"item": "Bulk"},
+                "quantity": 1,
+                "status": "completed",
+                "quality_rating": 4.0,
+            }
+            for i in range(5)
+        ]
+        response = self.client.post(reverse('purchaseorder-bulk'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(VendorMetricsMarker.objects.count(), 1)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.completed_po_count, 0)
+
+    def test_metrics_queue_endpoint(self):
+        VendorMetricsMarker.enqueue([self.vendor.id])
+        response = self.client.get(reverse('metrics-queue'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['pending_vendors'], 1)
+        self.assertEqual(response.data['mode'], 'deferred')
+        self.assertIn('lag_seconds', response.data)
+
+class VendorRankingAPITest(APITestCase):
+
+    def setUp(self):
+        # (on-time rate, completed orders, quality average, rated orders)
+        metrics = [(100.0, 2, 3.0, 2), (100.0, 8, 4.0, 8), (50.0, 20, 5.0, 1), (0.0, 0, 0.0, 0)]
+        self.vendors = []
+        for i, (rate, completed, avg, rated) in enumerate(metrics):
+            self.vendors.append(Vendor.objects.create(
+                name=f"Vendor {i}",
+                contact_details="123 Test Street",
+                address="456 Vendor Avenue",
+                vendor_code=f"VEND{i}",
+                on_time_delivery_rate=rate,
+                completed_po_count=completed,
+                quality_rating_avg=avg,
+                quality_rating_count=rated
+            ))
+        VendorRanking.rebuild()
+        self.url = reverse('vendor-rankings')
+
+    def test_rankings_order_ties_and_percentiles(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['metric'], 'on_time_delivery_rate')
+        self.assertEqual(response.data['ranked'], 3)
+        results = response.data['results']
+        self.assertEqual([row['vendor'] for row in results], [self.vendors[1].id, self.vendors[0].id, self.vendors[2].id])
+        self.assertEqual([row['rank'] for row in results], [1, 2, 3])
+        self.assertEqual([row['percentile'] for row in results], [100.0, 50.0, 0.0])
+        self.assertEqual(results[0]['name'], "Vendor 1")
+        self.assertEqual(results[0]['volume'], 8)
+
+    def test_rankings_minimum_volume_and_limit(self):
+        response = self.client.get(self.url, {'min_volume': 5, 'limit': 1})
+        results = response.data['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['vendor'], self.vendors[1].id)
+        response = self.client.get(self.url, {'min_volume': 5})
+        self.assertEqual([row['position'] for row in response.data['results']], [1, 2])
+        self.assertEqual([row['rank'] for row in response.data['results']], [1, 3])
+
+    def test_rankings_by_quality(self):
+        response = self.client.get(self.url, {'metric': 'quality_rating_avg', 'min_volume': 2})
+        self.assertEqual(
+            [row['vendor'] for row in response.data['results']], [self.vendors[1].id, self.vendors[0].id]
+        )
+        self.assertEqual([row['rank'] for row in response.data['results']], [2, 3])
+
+    def test_rankings_rejects_invalid_params(self):
+        for params in ({'metric': 'name'}, {'min_volume': -1}, {'limit': 0}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_rankings_query_count(self):
+        # Ranked count, then the top-K page joined to the vendor names.
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_vendor_ranking(self):
+        response = self.client.get(reverse('vendor-ranking', args=[self.vendors[0].id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['on_time_delivery_rate']['rank'], 2)
+        self.assertEqual(response.data['on_time_delivery_rate']['percentile'], 50.0)
+        self.assertEqual(response.data['quality_rating_avg']['rank'], 3)
+        response = self.client.get(reverse('vendor-ranking', args=[self.vendors[3].id]))
+        self.assertIsNone(response.data['on_time_delivery_rate']['rank'])
+        self.assertIsNone(response.data['on_time_delivery_rate']['percentile'])
+        self.assertEqual(response.data['on_time_delivery_rate']['ranked'], 3)
+
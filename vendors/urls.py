@@ -1,11 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import VendorViewSet, PurchaseOrderViewSet
+from .views import (
+    VendorViewSet, PurchaseOrderViewSet, MetricsQueueView, LineItemSummaryView, ChangeFeedView,
+    SpendAnalyticsView,
+)
 
 router = DefaultRouter()
 router.register(r'vendors', VendorViewSet, basename='vendor')
 router.register(r'purchase_orders', PurchaseOrderViewSet, basename='purchaseorder')
 
 urlpatterns = [
+    path('metrics_queue/', MetricsQueueView.as_view(), name='metrics-queue'),
+    path('line_items/summary/', LineItemSummaryView.as_view(), name='line-item-summary'),
+    path('changes/', ChangeFeedView.as_view(), name='change-feed'),
+    path('analytics/spend/', SpendAnalyticsView.as_view(), name='analytics-spend'),
     path('', include(router.urls)),
 ]
@@ -1,26 +1,569 @@
-from rest_framework import viewsets
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.db import router
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import generics, serializers, status, viewsets
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import Vendor, PurchaseOrder
-from .serializers import VendorSerializer, PurchaseOrderSerializer, PerformanceMetricsSerializer
+from rest_framework.views import APIView
+from vendor_management.metrics import timed
+from .cache import get_vendor_performance, set_vendor_performance
+from .filters import (
+    IndexedOrderingFilter, PurchaseOrderFilterBackend, PurchaseOrderLineFilterBackend, VendorFilterBackend,
+    parse_month_range, parse_performance_window, parse_query_param,
+)
+from .models import (
+    RANKING_METRICS, SPEND_GROUP_BY, SPEND_ORDERING, SPEND_SUM_FIELDS, ChangeLog, Vendor, PurchaseOrder,
+    PurchaseOrderLine, VendorMonthlySpend, VendorPerformanceDaily, VendorMetricsMarker, VendorRanking, add_spend,
+    spend_position, spend_summary,
+)
+from .pagination import IdCursorPagination
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import (
+    VendorSerializer, PurchaseOrderSerializer, PerformanceMetricsSerializer, SparseFieldsetMixin,
+    LineItemSummarySerializer, VendorRankingSerializer, PurchaseOrderTransitionSerializer, AtRiskVendorSerializer,
+    ChangeSerializer, SpendSummarySerializer,
+)
+
+class SparseFieldsetViewMixin:
+    # Defers the columns a ?fields= request leaves out, so heavy text/JSON
+    # columns are never read from the database.
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = SparseFieldsetMixin.requested_fields(self.request)
+        if requested and self.action in ('list', 'retrieve'):
+            opts = queryset.model._meta
+            columns = (requested | self.ordering_columns()) & {field.name for field in opts.concrete_fields}
+            queryset = queryset.only(opts.pk.name, *columns)
+        return queryset
+
+    def ordering_columns(self):
+        # The cursor paginator reads the ordering field off each row.
+        value = self.request.query_params.get('ordering', '')
+        return {term.strip().lstrip('-') for term in value.split(',') if term.strip()}
+
+class ValuesReadMixin:
+    # list/retrieve read plain rows with queryset.values() and serialize them
+    # through the serializer's compiled transformer (ValuesRowMixin) instead
+    # of building model instances and running to_representation() per field.
+    # Responses carry an ETag derived from the rows' ``version_field`` (a
+    # list page's pks and versions), and details a Last-Modified as well.
+    # Conditional requests first read only those columns and get a 304
+    # without the full read and serialization when unchanged.
+    version_field = 'updated_at'
+
+    def values_reader(self):
+        reader = self.get_serializer().values_reader()
+        if reader is None:
+            return None
+        columns, transform = reader
+        return list(dict.fromkeys([*self.validator_columns(), *columns])), transform
+
+    def validator_columns(self):
+        opts = self.get_queryset().model._meta
+        return list(dict.fromkeys([opts.pk.name, self.version_field, *self.ordering_columns()]))
+
+    def list(self, request, *args, **kwargs):
+        reader = self.values_reader()
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+        columns, transform = reader
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.is_conditional(request):
+            page = self.paginate_queryset(queryset.values(*self.validator_columns()))
+            not_modified = self.not_modified(request, self.page_validators(page))
+            if not_modified is not None:
+                return not_modified
+        page = self.paginate_queryset(queryset.values(*columns))
+        validators = self.page_validators(page)
+        with timed('serializer'):
+            data = [transform(row) for row in page]
+        return self.set_validators(self.get_paginated_response(data), validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        reader = self.values_reader()
+        if reader is None:
+            return super().retrieve(request, *args, **kwargs)
+        columns, transform = reader
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        if self.is_conditional(request):
+            row = get_object_or_404(queryset.values(*self.validator_columns()), **lookup)
+            not_modified = self.not_modified(request, self.page_validators([row]))
+            if not_modified is not None:
+                return not_modified
+        row = get_object_or_404(queryset.values(*columns), **lookup)
+        self.check_object_permissions(request, row)
+        validators = self.page_validators([row])
+        with timed('serializer'):
+            return self.set_validators(Response(transform(row)), validators)
+
+    def is_conditional(self, request):
+        if self.action == 'list':
+            return 'HTTP_IF_NONE_MATCH' in request.META
+        return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+    def page_validators(self, rows):
+        # (etag, last_modified). The ETag covers the URL (filters, cursor,
+        # ?fields=), the negotiated format, the rows' versions and whether
+        # the cursor has further pages. Lists get no last_modified: a row
+        # deleted from the page leaves the newest version unchanged.
+        pk_name = self.get_queryset().model._meta.pk.name
+        paginator = self.paginator if self.action == 'list' else None
+        digest = hashlib.md5(usedforsecurity=False)
+        digest.update(f'{self.request.get_full_path()}|{self.request.accepted_media_type}'.encode())
+        if paginator is not None:
+            digest.update(f'|{paginator.has_next}|{paginator.has_previous}'.encode())
+        versions = [row[self.version_field] for row in rows]
+        for row, version in zip(rows, versions):
+            digest.update(f'|{row[pk_name]}:{version.isoformat()}'.encode())
+        last_modified = int(max(versions).timestamp()) if versions and paginator is None else None
+        return f'W/{quote_etag(digest.hexdigest())}', last_modified
+
+    def not_modified(self, request, validators):
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            self.set_validators(response, validators)
+        return response
 
-class VendorViewSet(viewsets.ModelViewSet):
+    @staticmethod
+    def set_validators(response, validators):
+        etag, last_modified = validators
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+class VendorViewSet(ValuesReadMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Vendor.objects.all()
     serializer_class = VendorSerializer
+    pagination_class = IdCursorPagination
+    filter_backends = [IndexedOrderingFilter, VendorFilterBackend]
+    ordering_fields = ('id', 'name', 'on_time_delivery_rate', 'quality_rating_avg')
+    export_fields = (
+        'id', 'name', 'vendor_code', 'on_time_delivery_rate', 'quality_rating_avg',
+        'completed_po_count', 'on_time_po_count', 'quality_rating_count',
+    )
+
+    def get_queryset(self):
+        # Archived vendors are only visible with ?archived=true (and to restore).
+        archived = self.action == 'restore' or parse_query_param(
+            serializers.BooleanField(), 'archived', self.request.query_params.get('archived', False)
+        )
+        return super().get_queryset().filter(archived_at__isnull=not archived)
+
+    def destroy(self, request, *args, **kwargs):
+        # Deleting cascades through the vendor's purchase orders in one
+        # transaction; vendors with long histories are archived instead and
+        # purge_archived_vendors moves their orders out in batches.
+        vendor = self.get_object()
+        if vendor.has_large_history():
+            vendor.archive()
+            return Response(
+                {'detail': 'Vendor archived; its purchase orders will be purged in the background.'},
+                status=status.HTTP_202_ACCEPTED,
+            )
+        vendor.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'], url_path='archive')
+    def archive(self, request, pk=None):
+        vendor = self.get_object()
+        vendor.archive()
+        return Response({'id': vendor.pk, 'archived_at': vendor.archived_at})
+
+    @action(detail=True, methods=['post'], url_path='restore')
+    def restore(self, request, pk=None):
+        vendor = self.get_object()
+        vendor.restore()
+        return Response({'id': vendor.pk, 'archived_at': vendor.archived_at})
 
     @action(detail=True, methods=['get'], url_path='performance')
     def performance(self, request, pk=None):
+        window = parse_performance_window(request.query_params)
+        if window is not None:
+            vendor = self.get_object()
+            return Response(VendorPerformanceDaily.summarize(vendor.pk, **window))
+
+        # Cache hits, including 304 revalidations, never touch the database.
+        # Misses read the primary: a lagging replica's numbers would be
+        # cached after the write's invalidation and outlive it.
+        entry = get_vendor_performance(pk) if pk.isdigit() else None
+        if entry is None:
+            vendor = get_object_or_404(self.get_queryset().using(router.db_for_write(Vendor)), pk=pk)
+            self.check_object_permissions(request, vendor)
+            serializer = PerformanceMetricsSerializer(vendor)
+            entry = set_vendor_performance(vendor.pk, serializer.data, vendor.updated_at)
+
+        response = Response(entry['data'], headers={
+            'ETag': entry['etag'],
+            'Last-Modified': http_date(entry['last_modified']),
+        })
+        return get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'], response=response
+        )
+
+    @action(detail=True, methods=['get'], url_path='spend')
+    def spend(self, request, pk=None):
+        # Monthly spend in the base currency for ?from=&to= (YYYY-MM), plus
+        # the totals over the range.
+        vendor = self.get_object()
+        start, end = parse_month_range(request.query_params)
+        months = sorted(
+            VendorMonthlySpend.summarize(start, end, ['month'], vendor_id=vendor.pk), key=lambda row: row['month']
+        )
+        totals = dict.fromkeys(SPEND_SUM_FIELDS)
+        for row in months:
+            add_spend(totals, row)
+        return Response({
+            'vendor': vendor.pk,
+            'currency': settings.VENDORS_BASE_CURRENCY,
+            'from': start.strftime('%Y-%m'),
+            'to': end.strftime('%Y-%m'),
+            'totals': SpendSummarySerializer(spend_summary(totals)).data,
+            'months': SpendSummarySerializer([spend_summary(row) for row in months], many=True).data,
+        })
+
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        rows = queryset.values(*self.export_fields).iterator(chunk_size=settings.VENDORS_EXPORT_CHUNK_SIZE)
+        return request.accepted_renderer.streaming_response(rows, self.export_fields, 'vendor_scorecards')
+
+    @action(detail=False, methods=['get'], url_path='rankings')
+    def rankings(self, request):
+        # Top-K read straight off the rank index of the materialized ranking.
+        params = request.query_params
+        metric = parse_query_param(
+            serializers.ChoiceField(choices=list(RANKING_METRICS)), 'metric',
+            params.get('metric', 'on_time_delivery_rate'),
+        )
+        min_volume = parse_query_param(serializers.IntegerField(min_value=0), 'min_volume', params.get('min_volume', 0))
+        limit = parse_query_param(
+            serializers.IntegerField(min_value=1, max_value=settings.VENDORS_MAX_PAGE_SIZE),
+            'limit',
+            params.get('limit', settings.VENDORS_PAGE_SIZE),
+        )
+        rank_field, volume = RANKING_METRICS[metric]
+        ranked = VendorRanking.ranked_counts()[metric]
+        rows = (
+            VendorRanking.objects
+            .filter(**{f'{rank_field}__isnull': False, f'{volume}__gte': min_volume})
+            .order_by(rank_field)
+            .values('vendor_id', 'vendor__name', 'vendor__vendor_code', metric, volume, rank_field)[:limit]
+        )
+        results = [
+            {
+                'position': position,
+                'vendor': row['vendor_id'],
+                'name': row['vendor__name'],
+                'vendor_code': row['vendor__vendor_code'],
+                'value': row[metric],
+                'volume': row[volume],
+                'rank': row[rank_field],
+                'percentile': VendorRanking.percentile(row[rank_field], ranked),
+            }
+            for position, row in enumerate(rows, start=1)
+        ]
+        return Response({
+            'metric': metric,
+            'min_volume': min_volume,
+            'ranked': ranked,
+            'results': VendorRankingSerializer(results, many=True).data,
+        })
+
+    @action(detail=True, methods=['get'], url_path='ranking')
+    def ranking(self, request, pk=None):
         vendor = self.get_object()
-        serializer = PerformanceMetricsSerializer(vendor)
-        return Response(serializer.data)
+        ranking = VendorRanking.objects.filter(vendor=vendor).first()
+        counts = VendorRanking.ranked_counts()
+        data = {}
+        for metric, (rank_field, volume) in RANKING_METRICS.items():
+            rank = getattr(ranking, rank_field, None)
+            data[metric] = {
+                'value': getattr(vendor, metric),
+                'volume': getattr(vendor, volume),
+                'rank': rank,
+                'ranked': counts[metric],
+                'percentile': VendorRanking.percentile(rank, counts[metric]),
+            }
+        return Response(data)
 
-class PurchaseOrderViewSet(viewsets.ModelViewSet):
+class PurchaseOrderViewSet(ValuesReadMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PurchaseOrder.objects.all()
     serializer_class = PurchaseOrderSerializer
+    pagination_class = IdCursorPagination
+    filter_backends = [IndexedOrderingFilter, PurchaseOrderFilterBackend]
+    ordering_fields = ('id', 'po_number', 'order_date', 'issue_date', 'delivery_date')
+    export_fields = (
+        'id', 'po_number', 'vendor', 'order_date', 'delivery_date', 'items', 'quantity',
+        'status', 'quality_rating', 'issue_date', 'delivered_date', 'updated_at', 'currency', 'total_amount',
+    )
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        vendor_id = self.request.query_params.get('vendor', None)
+        # Orders of archived vendors are hidden, and so read-only, until
+        # purge_archived_vendors moves them out.
+        return super().get_queryset().filter(vendor__archived_at__isnull=True)
+
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        rows = queryset.values(*self.export_fields).iterator(chunk_size=settings.VENDORS_EXPORT_CHUNK_SIZE)
+        return request.accepted_renderer.streaming_response(rows, self.export_fields, 'purchase_orders')
+
+    @action(detail=False, methods=['get'], url_path='at_risk')
+    def at_risk(self, request):
+        # Per-vendor counts of pending orders past or near their delivery
+        # date, read off the partial po_pending_delivery_idx. List the orders
+        # themselves with ?status=pending&delivery_date_before=.
+        params = request.query_params
+        within_hours = parse_query_param(
+            serializers.IntegerField(min_value=0, max_value=24 * 366), 'within_hours',
+            params.get('within_hours', settings.VENDORS_AT_RISK_WINDOW_HOURS),
+        )
+        limit = parse_query_param(
+            serializers.IntegerField(min_value=1, max_value=settings.VENDORS_MAX_PAGE_SIZE),
+            'limit',
+            params.get('limit', settings.VENDORS_PAGE_SIZE),
+        )
+        queryset = self.get_queryset()
+        vendor_id = params.get('vendor')
+        if vendor_id is not None:
+            vendor_id = parse_query_param(serializers.IntegerField(), 'vendor', vendor_id)
+            queryset = queryset.filter(vendor_id=vendor_id)
+        now = timezone.now()
+        horizon = now + datetime.timedelta(hours=within_hours)
+        rows = list(PurchaseOrder.at_risk_counts(now, horizon, queryset))
+        rows.sort(key=lambda row: (-row['overdue'], -row['due_soon'], row['vendor']))
+        return Response({
+            'as_of': now,
+            'due_before': horizon,
+            'overdue': sum(row['overdue'] for row in rows),
+            'due_soon': sum(row['due_soon'] for row in rows),
+            'vendors': AtRiskVendorSerializer(rows[:limit], many=True).data,
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Expected a JSON array or NDJSON stream of purchase orders.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        upsert = request.query_params.get('upsert', '').lower() in ('1', 'true', 'yes')
+        batch_size = self.bulk_batch_size(request)
+        if batch_size is None:
+            return Response({'detail': 'batch_size must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        rows, errors = serializer.validate_rows(upsert=upsert)
+        created = updated = 0
+        if rows:
+            created, updated, conflicts = serializer.save_rows(rows, upsert=upsert, batch_size=batch_size)
+            errors = sorted(errors + conflicts, key=lambda error: error['index'])
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif created or updated:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'created': created, 'updated': updated, 'errors': errors}, status=response_status)
+
+    @action(detail=False, methods=['post'], url_path='transition', parser_classes=[JSONParser, NDJSONParser])
+    def transition(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Expected a JSON array or NDJSON stream of status transitions.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        batch_size = self.bulk_batch_size(request)
+        if batch_size is None:
+            return Response({'detail': 'batch_size must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = PurchaseOrderTransitionSerializer(data=request.data, many=True)
+        rows, errors = serializer.validate_rows()
+        updated = 0
+        if rows:
+            updated, transition_errors = serializer.save_rows(rows, batch_size=batch_size)
+            errors = sorted(errors + transition_errors, key=lambda error: error['index'])
+
+        if not errors:
+            response_status = status.HTTP_200_OK
+        elif updated:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'updated': updated, 'errors': errors}, status=response_status)
+
+    def bulk_batch_size(self, request):
+        try:
+            batch_size = int(request.query_params.get('batch_size', settings.VENDORS_BULK_BATCH_SIZE))
+        except ValueError:
+            return None
+        return batch_size if batch_size > 0 else None
+
+class MetricsQueueView(APIView):
+    # Staleness of deferred vendor metrics, for monitoring the worker.
+    def get(self, request):
+        return Response(VendorMetricsMarker.queue_status())
+
+class ChangeFeedView(APIView):
+    """
+    Vendors and purchase orders created, updated or deleted after the
+    ?since= token, in change sequence order; pass the returned token back
+    to continue. Each row appears once, at its latest change, with its
+    current data; rows no longer served by the API (deleted or archived)
+    come back as deletions. Reads the primary only: the entries and the
+    rows they point to must come from the same database.
+    """
+    sources = {
+        ChangeLog.VENDOR: (Vendor.objects.filter(archived_at__isnull=True), VendorSerializer),
+        ChangeLog.PURCHASE_ORDER: (
+            PurchaseOrder.objects.filter(vendor__archived_at__isnull=True), PurchaseOrderSerializer
+        ),
+    }
+    lookup_chunk_size = 500
+
+    def get(self, request):
+        params = request.query_params
+        since = parse_query_param(serializers.IntegerField(min_value=0), 'since', params.get('since', 0))
+        limit = parse_query_param(
+            serializers.IntegerField(min_value=1, max_value=settings.VENDORS_MAX_PAGE_SIZE),
+            'limit',
+            params.get('limit', settings.VENDORS_PAGE_SIZE),
+        )
+        kind = params.get('kind')
+        if kind is not None:
+            kind = parse_query_param(serializers.ChoiceField(choices=ChangeLog.KIND_CHOICES), 'kind', kind)
+
+        entries, token, more = ChangeLog.changes(since, limit, kind)
+        rows = self.current_rows(entries)
+        results = []
+        for entry in entries:
+            data = None if entry['deleted'] else rows[entry['kind']].get(entry['object_id'])
+            results.append({
+                'seq': entry['seq'],
+                'kind': entry['kind'],
+                'id': entry['object_id'],
+                'deleted': data is None,
+                'data': data,
+            })
+        next_url = None
+        if more:
+            next_params = params.copy()
+            next_params['since'] = token
+            next_url = request.build_absolute_uri(f'{request.path}?{next_params.urlencode()}')
+        return Response({'token': token, 'next': next_url, 'results': ChangeSerializer(results, many=True).data})
+
+    def current_rows(self, entries):
+        # One values() read per kind (and chunk), serialized through the
+        # list endpoint's compiled transformer.
+        rows = {}
+        for kind, (queryset, serializer_class) in self.sources.items():
+            ids = [entry['object_id'] for entry in entries if entry['kind'] == kind and not entry['deleted']]
+            columns, transform = serializer_class().values_reader()
+            rows[kind] = {}
+            for start in range(0, len(ids), self.lookup_chunk_size):
+                chunk = queryset.filter(pk__in=ids[start:start + self.lookup_chunk_size]).values('pk', *columns)
+                rows[kind].update((row['pk'], transform(row)) for row in chunk)
+        return rows
+
+class SpendAnalyticsView(APIView):
+    """
+    Spend in the base currency, order counts and average lead time
+    (delivered_date - order_date) for ?from=&to= (YYYY-MM), grouped by
+    ?group_by=vendor, month or vendor,month and aggregated in SQL. Closed
+    months cached by refresh_spend_summary are read from the summary table.
+    Pages of ?limit= rows continue from the ?after= position of the last row.
+    """
+    def get(self, request):
+        params = request.query_params
+        group_by = [name.strip() for name in params.get('group_by', 'vendor,month').split(',')]
+        if not group_by or set(group_by) - set(SPEND_GROUP_BY) or len(set(group_by)) != len(group_by):
+            raise serializers.ValidationError({'group_by': [
+                f"Use a comma-separated subset of {', '.join(SPEND_GROUP_BY)}."
+            ]})
+        start, end = parse_month_range(params)
+        vendor_id = params.get('vendor')
         if vendor_id is not None:
-            queryset = queryset.filter(vendor__id=vendor_id)
-        return queryset
\ No newline at end of file
+            vendor_id = parse_query_param(serializers.IntegerField(), 'vendor', vendor_id)
+            get_object_or_404(Vendor.objects.filter(archived_at__isnull=True), pk=vendor_id)
+        limit = parse_query_param(
+            serializers.IntegerField(min_value=1, max_value=settings.VENDORS_MAX_PAGE_SIZE),
+            'limit',
+            params.get('limit', settings.VENDORS_PAGE_SIZE),
+        )
+        after = self.parse_position(params['after'], group_by) if 'after' in params else None
+        rows = VendorMonthlySpend.summarize(start, end, group_by, vendor_id, after=after, limit=limit + 1)
+
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_params = params.copy()
+            next_params['after'] = self.format_position(rows[-1], group_by)
+            next_url = request.build_absolute_uri(f'{request.path}?{next_params.urlencode()}')
+        return Response({
+            'currency': settings.VENDORS_BASE_CURRENCY,
+            'from': start.strftime('%Y-%m'),
+            'to': end.strftime('%Y-%m'),
+            'group_by': group_by,
+            'next': next_url,
+            'results': SpendSummarySerializer([spend_summary(row) for row in rows], many=True).data,
+        })
+
+    @staticmethod
+    def format_position(row, group_by):
+        # ?after= value: "YYYY-MM,vendor", "YYYY-MM" or "vendor".
+        return ','.join(
+            f'{value:%Y-%m}' if isinstance(value, datetime.date) else str(value)
+            for value in spend_position(row, group_by)
+        )
+
+    @staticmethod
+    def parse_position(value, group_by):
+        parts = value.split(',')
+        columns = [column for column in SPEND_ORDERING if column in group_by]
+        try:
+            if len(parts) != len(columns):
+                raise ValueError(value)
+            return tuple(
+                datetime.datetime.strptime(part, '%Y-%m').date() if column == 'month' else int(part)
+                for column, part in zip(columns, parts)
+            )
+        except ValueError:
+            raise serializers.ValidationError({'after': ['Not a position returned in "next".']})
+
+class LineItemSummaryView(generics.GenericAPIView):
+    """
+    Quantity and spend (quantity x unit_price) from purchase order lines,
+    grouped by ?group_by=vendor, sku or vendor,sku and aggregated in SQL.
+    """
+    queryset = PurchaseOrderLine.objects.all()
+    serializer_class = LineItemSummarySerializer
+    filter_backends = [PurchaseOrderLineFilterBackend]
+    group_by_choices = ('vendor', 'sku')
+
+    def get(self, request):
+        group_by = [name.strip() for name in request.query_params.get('group_by', 'vendor,sku').split(',')]
+        if not group_by or set(group_by) - set(self.group_by_choices) or len(set(group_by)) != len(group_by):
+            raise serializers.ValidationError({'group_by': [
+                f"Use a comma-separated subset of {', '.join(self.group_by_choices)}."
+            ]})
+        limit = parse_query_param(
+            serializers.IntegerField(min_value=1, max_value=settings.VENDORS_MAX_PAGE_SIZE),
+            'limit',
+            request.query_params.get('limit', settings.VENDORS_PAGE_SIZE),
+        )
+        rows = PurchaseOrderLine.summarize(group_by, self.filter_queryset(self.get_queryset()))[:limit]
+        return Response({'group_by': group_by, 'results': self.get_serializer(rows, many=True).data})